@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*
+""" Compare local ABI serialization with the abi_json_to_bin round trip.
+
+Without a node only the local serializer is measured, against the
+``eosio.token`` ABI below::
+
+    python -m benchmarks.abi_bench
+    python -m benchmarks.abi_bench --node https://eosnode.com
+
+With a node the ABI is fetched from it, and every locally packed action is
+checked to be byte-identical to what the node returns.
+"""
+import argparse
+import time
+
+from eosbase.abi import AbiSerializer
+
+TOKEN_ABI = {
+    'version': 'eosio::abi/1.0',
+    'types': [{'new_type_name': 'account_name', 'type': 'name'}],
+    'structs': [{'name': 'transfer', 'base': '', 'fields': [
+        {'name': 'from', 'type': 'account_name'},
+        {'name': 'to', 'type': 'account_name'},
+        {'name': 'quantity', 'type': 'asset'},
+        {'name': 'memo', 'type': 'string'}]}],
+    'actions': [{'name': 'transfer', 'type': 'transfer',
+                 'ricardian_contract': ''}],
+}
+
+
+def transfers(count):
+    return [{'from': 'alice', 'to': 'bob%s' % 'abcde'[i % 5],
+             'quantity': '%d.%04d EOS' % (i // 10000, i % 10000),
+             'memo': 'payment %d' % i} for i in range(count)]
+
+
+def bench(name, fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    took = time.perf_counter() - start
+    print('%-24s %10.1f us/action %10.0f actions/s' % (
+        name, took / len(items) * 1e6, len(items) / took))
+    return took, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--node', metavar='NODE_URL')
+    parser.add_argument('--code', default='eosio.token')
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--rpc-count', type=int, default=200)
+    args = parser.parse_args()
+
+    abi = TOKEN_ABI
+    client = None
+    if args.node:
+        from eosapi.httpapi.client import Client
+
+        client = Client([args.node], local_abi=False)
+        abi = client.get_code(args.code)['abi']
+    serializer = AbiSerializer(abi)
+    actions = transfers(args.count)
+
+    print('pack')
+    local, packed = bench(
+        'local', lambda a: serializer.pack_action('transfer', a), actions)
+    print('\nunpack')
+    bench('local', lambda d: serializer.unpack_action('transfer', d), packed)
+
+    if client is None:
+        return
+
+    sample = actions[:args.rpc_count]
+    print('\npack, %d actions' % len(sample))
+    rpc, binargs = bench('abi_json_to_bin', lambda a: client.abi_json_to_bin(
+        args.code, 'transfer', a)['binargs'], sample)
+    print('%-24s %10.0fx' % ('local speedup', rpc / len(sample) /
+                             (local / len(actions))))
+    mismatches = sum(1 for data, remote in zip(packed, binargs)
+                     if data.hex() != remote)
+    print('%d of %d actions differ from the node' % (mismatches, len(sample)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*
+""" Compare the legacy and codec based JSON paths of HttpClient.
+
+Record real block payloads once, then benchmark against them::
+
+    python -m benchmarks.codec_bench --record https://eosnode.com --count 200
+    python -m benchmarks.codec_bench
+
+Recorded payloads are stored as the raw response bytes, one block per line,
+so the benchmark sees exactly what ``HttpClient._return`` gets from urllib3.
+"""
+import argparse
+import json
+import os
+import timeit
+
+from eosapi.httpapi.codec import CODECS, StdlibCodec
+
+DEFAULT_PAYLOADS = os.path.join(os.path.dirname(__file__), 'blocks.jsonl')
+
+
+def record(node, count, path):
+    from eosapi.httpapi.client import Client
+
+    client = Client([node])
+    head = client.get_info()['last_irreversible_block_num']
+    with open(path, 'wb') as f:
+        for block_num in range(head - count + 1, head + 1):
+            response = client.http.urlopen(
+                'POST', f"{node}/v1/chain/get_block",
+                body=json.dumps({'block_num_or_id': block_num}))
+            f.write(response.data.replace(b'\n', b'') + b'\n')
+
+
+def load(path):
+    with open(path, 'rb') as f:
+        return [line.rstrip(b'\n') for line in f if line.strip()]
+
+
+def legacy_loads(data):
+    """ The decode path HttpClient used before codecs. """
+    return json.loads(data.decode('utf-8'))
+
+
+def legacy_dumps(obj):
+    return json.dumps(obj)
+
+
+def bench(name, fn, payloads, number):
+    seconds = min(timeit.repeat(
+        lambda: [fn(p) for p in payloads], number=number, repeat=3))
+    per_item = seconds / number / len(payloads) * 1e6
+    print('%-24s %10.1f us/payload' % (name, per_item))
+    return per_item
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--payloads', default=DEFAULT_PAYLOADS)
+    parser.add_argument('--record', metavar='NODE_URL')
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.count, args.payloads)
+
+    if not os.path.exists(args.payloads):
+        parser.error('no recorded payloads at %s, use --record first' %
+                     args.payloads)
+
+    payloads = load(args.payloads)
+    objects = [StdlibCodec.loads(p) for p in payloads]
+    size = sum(map(len, payloads)) / len(payloads)
+    print('%d payloads, %.1f KiB on average' % (len(payloads), size / 1024))
+
+    print('\ndecode')
+    baseline = bench('legacy (str + json)', legacy_loads, payloads, args.number)
+    for name, codec in sorted(CODECS.items()):
+        took = bench(name, codec.loads, payloads, args.number)
+        print('%-24s %10.2fx' % ('', baseline / took))
+
+    print('\nencode')
+    baseline = bench('legacy (json.dumps)', legacy_dumps, objects, args.number)
+    for name, codec in sorted(CODECS.items()):
+        took = bench(name, codec.dumps, objects, args.number)
+        print('%-24s %10.2fx' % ('', baseline / took))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# coding=utf-8
+import logging
+import threading
+import time
+
+from eosbase.abi import AbiSerializer, UnknownAbiType
+
+logger = logging.getLogger(__name__)
+
+
+class AbiCache(object):
+    """ Compiled ABI serializers per contract, fetched once per ``ttl``.
+
+    A contract can change its ABI at any time, so serializers are refetched
+    after ``ttl`` seconds, or right away after :meth:`invalidate`.
+
+    Args:
+        fetch (callable): Returns the ABI of an account.
+        ttl (float): Seconds a fetched ABI is used for.
+    """
+
+    def __init__(self, fetch, ttl=300):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.fetches = 0
+
+        self._lock = threading.Lock()
+        self._serializers = {}
+
+    def get(self, account_name):
+        entry = self._serializers.get(account_name)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        abi = self.fetch(account_name)
+        if not abi:
+            raise UnknownAbiType('Account %s has no ABI' % account_name)
+        serializer = AbiSerializer(abi)
+        with self._lock:
+            self.fetches += 1
+            self._serializers[account_name] = (
+                serializer, time.monotonic() + self.ttl)
+        return serializer
+
+    def invalidate(self, account_name):
+        with self._lock:
+            self._serializers.pop(account_name, None)
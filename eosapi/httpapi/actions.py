@@ -0,0 +1,131 @@
+# coding=utf-8
+from collections import namedtuple
+
+# An action, where it is in its transaction, and the transaction and block
+# it came in.
+MatchedAction = namedtuple(
+    'MatchedAction', 'action index trx_id transaction block')
+
+
+def _names(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset([value])
+    return frozenset(value)
+
+
+class ActionFilter(object):
+    """ Compiled filter on the actions of a block.
+
+    Every argument takes a name or a list of names; an action matches if it
+    matches any of the names of every argument that was given.
+
+    Blocks carry actions as they were signed, not their execution traces,
+    so inline actions and notifications are not seen: the receiver of an
+    action is its contract.
+
+    Args:
+        contract (str): Account of the contract the action belongs to.
+        action (str): Action name, e.g. ``transfer``.
+        authorizer (str): Account, or ``account@permission``, that signed
+            the action.
+        receiver (str): Account the action is executed by.
+    """
+
+    def __init__(self, contract=None, action=None, authorizer=None,
+                 receiver=None):
+        contracts = _names(contract)
+        receivers = _names(receiver)
+        if contracts is not None and receivers is not None:
+            contracts = contracts & receivers
+        elif receivers is not None:
+            contracts = receivers
+        self.contracts = contracts
+        self.actions = _names(action)
+        self.authorizers = _names(authorizer)
+        self.match = self._compile()
+
+    def _compile(self):
+        """ Build the cheapest function that applies the given filters. """
+        checks = []
+        if self.contracts is not None:
+            contracts = self.contracts
+            checks.append(lambda act: act.get('account') in contracts)
+        if self.actions is not None:
+            actions = self.actions
+            checks.append(lambda act: act.get('name') in actions)
+        if self.authorizers is not None:
+            authorizers = self.authorizers
+
+            def signed(act):
+                for auth in act.get('authorization') or ():
+                    if auth['actor'] in authorizers or '%s@%s' % (
+                            auth['actor'], auth['permission']) in authorizers:
+                        return True
+                return False
+
+            checks.append(signed)
+
+        if not checks:
+            return lambda act: True
+        if len(checks) == 1:
+            return checks[0]
+        return lambda act: all(check(act) for check in checks)
+
+
+class ActionStream(object):
+    """ Actions of a block stream that pass an :class:`ActionFilter`.
+
+    Yields :data:`MatchedAction` tuples in chain order. Deferred
+    transactions are only referenced by id in a block and are skipped.
+
+    Args:
+        blocks (iterable): Blocks, typically a :class:`BlockStream`.
+        action_filter (ActionFilter): Filter the actions must pass.
+    """
+
+    def __init__(self, blocks, action_filter):
+        self.blocks = blocks
+        self.filter = action_filter
+        self.scanned = 0
+        self.matched = 0
+        self._actions = self._scan()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._actions)
+
+    def _scan(self):
+        match = self.filter.match
+        for block in self.blocks:
+            for receipt in block.get('transactions') or ():
+                trx = receipt.get('trx')
+                if not isinstance(trx, dict):
+                    continue
+                actions = trx.get('transaction', {}).get('actions') or ()
+                self.scanned += len(actions)
+                for index, act in enumerate(actions):
+                    if match(act):
+                        self.matched += 1
+                        yield MatchedAction(act, index, trx.get('id'), trx, block)
+
+    def close(self):
+        self._actions.close()
+        if hasattr(self.blocks, 'close'):
+            self.blocks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        """ Actions scanned and matched, along with the block stream stats. """
+        stats = self.blocks.stats() if hasattr(self.blocks, 'stats') else {}
+        return dict(stats,
+                    actions_scanned=self.scanned,
+                    actions_matched=self.matched)
@@ -6,8 +6,7 @@ method_template = """
 def {method_name}(self{method_arguments}){return_hints}:
     \"\"\" {docstring} \"\"\"
 
-    body = dict({body_args}
-    )
+    body = {body}
 
     return self.exec(
         api='{api}',
@@ -31,6 +30,16 @@ def api_codegen(api_name, api_spec):
 
             return ''.join(fn(params.keys()))
 
+        def parse_body(endpoint):
+            # "body" names a param that is sent as the request body itself
+            name = endpoint.get('body')
+            if name is None:
+                return 'dict(%s\n    )' % parse_params(
+                    endpoint.get('params', {}), body_arg_mapper)
+            if str(endpoint['params'][name]).endswith('[]'):
+                return f'list({name})'
+            return name
+
         return_hints = ' -> dict'
 
         # generate method code
@@ -38,7 +47,7 @@ def api_codegen(api_name, api_spec):
             method_name=endpoint_name,
             method_arguments=parse_params(endpoint.get('params', {}), call_arg_mapper),
             call_arguments=parse_params(endpoint.get('params', {}), call_arg_mapper),
-            body_args=parse_params(endpoint.get('params', {}), body_arg_mapper),
+            body=parse_body(endpoint),
             return_hints=return_hints,
             api=api_name,
             docstring=endpoint.get('brief', endpoint_name)
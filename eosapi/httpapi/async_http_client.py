@@ -0,0 +1,272 @@
+# coding=utf-8
+import asyncio
+import logging
+import ssl
+import time
+from collections import namedtuple
+from urllib.parse import urlparse
+
+import certifi
+from eosapi.httpapi.codec import get_codec
+from eosapi.httpapi.http_client import HttpClient
+from eosapi.httpapi.metrics import Metrics
+from eosapi.httpapi.retry import (
+    RETRY_STATUSES,
+    SAFE_RETRY_STATUSES,
+    RetryBudget,
+    RetryPolicy,
+    is_idempotent,
+)
+from eosapi.httpapi.scheduler import NodeScheduler
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+_Response = namedtuple('_Response', 'status data headers')
+
+# features of HttpClient that the async client does not have
+UNSUPPORTED = ('hedge', 'broadcast', 'coalesce', 'rate_limit',
+               'adaptive_concurrency')
+
+
+class AsyncHttpClient(object):
+    """ asyncio based http client for handling eosd connections.
+
+    This is the coroutine counterpart of :class:`HttpClient`. Every node gets
+    its own bounded connection pool, so a single event loop can keep
+    thousands of requests in flight without a thread per request.
+
+    Args:
+      nodes (list): A list of Eos HTTP RPC nodes to connect to.
+
+    .. code-block:: python
+
+       from eosapi.httpapi.async_http_client import AsyncHttpClient
+
+       async with AsyncHttpClient(['https://eosnode.com']) as rpc:
+           info = await rpc.exec('chain', 'get_info')
+
+    Takes the keyword arguments of :class:`HttpClient` that configure the
+    codec, metrics, timeouts, retries, the retry budget and node failover.
+    Hedging, broadcasting, coalescing and rate limiting are not supported,
+    enabling them raises :class:`TypeError`. ``maxsize`` is the number of
+    connections kept open per node; when all of them are busy further
+    requests wait for a free connection instead of opening new ones.
+
+    """
+
+    # request and response bodies are handled exactly like the blocking client
+    _body = HttpClient._body
+    _return = HttpClient._return
+    _retry_after = staticmethod(HttpClient._retry_after)
+
+    def __init__(self, nodes, **kwargs):
+        unsupported = [name for name in UNSUPPORTED if kwargs.get(name)]
+        if unsupported:
+            raise TypeError('AsyncHttpClient does not support %s' %
+                            ', '.join(unsupported))
+        if aiohttp is None:
+            raise ImportError('AsyncHttpClient requires the aiohttp package.')
+
+        self.api_version = kwargs.get('api_version', 'v1')
+        self.max_retries = kwargs.get('max_retries', 10)
+        self.deadline = kwargs.get('deadline', 60)
+        self.codec = get_codec(kwargs.get('json_codec'))
+        self.metrics = kwargs.get('metrics') or Metrics()
+        self.retry_policy = RetryPolicy(
+            max_retries=self.max_retries,
+            base_delay=kwargs.get('retry_base_delay', 0.1),
+            max_delay=kwargs.get('retry_max_delay', 5))
+        self.retry_budget = RetryBudget(
+            ratio=kwargs.get('retry_budget', 0.2),
+            min_retries_per_sec=kwargs.get('min_retries_per_sec', 10))
+        self.maxsize = kwargs.get('maxsize', 10)
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=kwargs.get('connect_timeout', 15),
+            sock_read=kwargs.get('timeout', 30))
+        self.ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self.keepalive_timeout = 15 if kwargs.get('tcp_keepalive', True) else None
+        self._sessions = {}
+
+        # without a probe, an ejected node is re-admitted by a trial request
+        self.scheduler = NodeScheduler(
+            HttpClient._nodes(nodes),
+            failure_threshold=kwargs.get('node_failure_threshold', 3),
+            cooldown=kwargs.get('node_cooldown', 30))
+        self.node_url = self.scheduler.nodes[0]
+        self._pinned_node = None
+
+        log_level = kwargs.get('log_level', logging.INFO)
+        logger.setLevel(log_level)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """ Close the connection pools of all nodes. """
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    def next_node(self):
+        """ Switch to the next available node. """
+        self._pinned_node = None
+        self.metrics.observe_node_switch(self.node_url)
+        self.scheduler.eject(self.node_url)
+        self.node_url = self.scheduler.peek(exclude=(self.node_url,))
+
+    def set_node(self, node_url):
+        """ Stick to the provided node URL until it fails. """
+        node_url = node_url.rstrip('/')
+        self.scheduler.add_node(node_url)
+        self.node_url = self._pinned_node = node_url
+
+    def metrics_snapshot(self):
+        """ Latency histograms, byte, status, retry and failover counts. """
+        return self.metrics.snapshot()
+
+    def prometheus_metrics(self):
+        """ :meth:`metrics_snapshot` in Prometheus text exposition format. """
+        return self.metrics.prometheus()
+
+    def node_scores(self):
+        """ Latency, error rate and circuit state of every node. """
+        return self.scheduler.scores()
+
+    @property
+    def hostname(self):
+        return urlparse(self.node_url).hostname
+
+    def _session(self, node_url):
+        """ Return the session (and thus connection pool) of a node. """
+        session = self._sessions.get(node_url)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.maxsize,
+                ssl=self.ssl_context,
+                keepalive_timeout=self.keepalive_timeout,
+                force_close=self.keepalive_timeout is None)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={'Content-Type': 'application/json'})
+            self._sessions[node_url] = session
+        return session
+
+    async def exec(self, api, endpoint, body=None, deadline=None):
+        """ Execute a method against eosd RPC.
+
+        Retries follow the same rules as :meth:`HttpClient.exec`: jittered
+        exponential backoff within the call deadline and the retry budget,
+        and pushes are only retried if they never reached a node.
+        """
+
+        path = f"/{self.api_version}/{api}/{endpoint}"
+        body = self._body(body)
+        method = 'POST' if body else 'GET'
+        idempotent = is_idempotent(endpoint)
+        expires = time.monotonic() + (deadline or self.deadline)
+        self.retry_budget.deposit()
+
+        failed = []
+        retries = 0
+        while True:
+            node_url = self._select_node(exclude=failed)
+            try:
+                response = await self._request(
+                    node_url, method, path, body, expires)
+            except (aiohttp.ClientConnectionError,
+                    aiohttp.ClientPayloadError,
+                    asyncio.TimeoutError) as e:
+                if node_url not in failed:
+                    failed.append(node_url)
+                if self._pinned_node == node_url:
+                    self._pinned_node = None
+                unsent = isinstance(e, aiohttp.ClientConnectorError)
+                if not idempotent and not unsent:
+                    raise e
+                error, response = e, None
+            except Exception as e:
+                extra = dict(err=e, url=node_url + path, body=body, method=method)
+                logger.info('Request error', extra=extra)
+                raise e
+            else:
+                retry_statuses = RETRY_STATUSES if idempotent \
+                    else SAFE_RETRY_STATUSES
+                if response.status not in retry_statuses:
+                    return self._return(
+                        response=response, body=body, endpoint=endpoint)
+                if node_url not in failed:
+                    failed.append(node_url)
+                error, unsent = None, False
+
+            retries += 1
+            backoff = self.retry_policy.backoff(retries)
+            if response is not None:
+                backoff = max(backoff, self._retry_after(response) or 0)
+            # a request that never left adds no load, so it costs no budget
+            if retries > self.retry_policy.max_retries or \
+                    time.monotonic() + backoff >= expires or \
+                    not (unsent or self.retry_budget.withdraw()):
+                if error:
+                    raise error
+                return self._return(
+                    response=response, body=body, endpoint=endpoint)
+
+            self.metrics.observe_retry(endpoint)
+            if len(self.scheduler.nodes) > 1:
+                self.metrics.observe_node_switch(node_url)
+            logger.debug('Retry %d of %s on another node after %s' % (
+                retries, endpoint,
+                error.__class__.__name__ if error else response.status))
+            await asyncio.sleep(backoff)
+
+    def _select_node(self, exclude=()):
+        if self._pinned_node:
+            node_url = self.scheduler.acquire(self._pinned_node)
+        else:
+            node_url = self.scheduler.select(exclude=exclude)
+        self.node_url = node_url
+        return node_url
+
+    async def _request(self, node_url, method, path, body, expires):
+        """ Issue a single request against a node, score the node and
+        record the request metrics. """
+        endpoint = path.rpartition('/')[2]
+        start = time.monotonic()
+        timeout = aiohttp.ClientTimeout(
+            total=max(expires - start, 0.001),
+            sock_connect=self.timeout.sock_connect,
+            sock_read=self.timeout.sock_read)
+        try:
+            session = self._session(node_url)
+            async with session.request(method, node_url + path, data=body,
+                                       timeout=timeout) as response:
+                response = _Response(response.status, await response.read(),
+                                     response.headers)
+        except (aiohttp.ClientConnectionError,
+                aiohttp.ClientPayloadError,
+                asyncio.TimeoutError) as e:
+            self.scheduler.record_failure(node_url)
+            self.metrics.observe_error(node_url, endpoint, e)
+            raise
+        except BaseException:
+            self.scheduler.release(node_url)
+            raise
+
+        latency = time.monotonic() - start
+        if response.status in RETRY_STATUSES:
+            self.scheduler.record_failure(node_url)
+        else:
+            self.scheduler.record_success(node_url, latency)
+        self.metrics.observe_request(
+            node_url, endpoint, latency, response.status,
+            len(body) if body else 0, len(response.data))
+        return response
@@ -0,0 +1,237 @@
+# coding=utf-8
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+from eosapi.httpapi.exceptions import TransactionRejected
+from eosapi.httpapi.metrics import LATENCY_BUCKETS, Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _rejection(result):
+    """ Why a node did not accept a transaction of a batch, if it did not. """
+    if not isinstance(result, dict):
+        return 'unexpected result %r' % (result,)
+    if result.get('error'):
+        return result['error']
+    processed = result.get('processed')
+    if isinstance(processed, dict):
+        if processed.get('except'):
+            return processed['except']
+        if processed.get('error'):
+            return processed['error']
+    # nodes answer with an all-zero id for transactions they did not take
+    if not (result.get('transaction_id') or '').strip('0'):
+        return 'no transaction id'
+    return None
+
+
+class _Item(object):
+    __slots__ = ('transaction', 'future', 'size', 'queued')
+
+    def __init__(self, transaction, size):
+        self.transaction = transaction
+        self.future = Future()
+        self.size = size
+        self.queued = time.monotonic()
+
+
+class TransactionBatcher(object):
+    """ Groups signed transactions into ``push_transactions`` calls.
+
+    :meth:`submit` queues a transaction and returns a future of its result.
+    A batch is sent once it holds ``max_count`` transactions or
+    ``max_bytes`` of JSON, or once its first transaction waited ``linger``
+    seconds. Up to ``concurrency`` batches are in flight; while they are,
+    the next batch keeps filling up. Each future gets the result of its own
+    transaction, or :class:`TransactionRejected` if the node did not accept
+    it, or the exception of the whole call if it failed.
+
+    .. code-block:: python
+
+       with client.batcher(linger=0.01) as batcher:
+           futures = [batcher.submit(trx) for trx in signer.sign_many(trxs)]
+       ids = [f.result()['transaction_id'] for f in futures]
+
+    Args:
+        client (Client): Client the batches are pushed with.
+        max_count (int): Most transactions per call.
+        max_bytes (int): Most bytes of transactions per call.
+        linger (float): Most seconds a transaction waits for a batch to fill.
+        concurrency (int): Calls in flight at once.
+    """
+
+    def __init__(self, client, max_count=100, max_bytes=512 * 1024,
+                 linger=0.005, concurrency=4):
+        self.client = client
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.linger = linger
+        self.concurrency = concurrency
+
+        self.batches = 0
+        self.transactions = 0
+        self.rejected = 0
+        self.failed_batches = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.linger_times = Histogram(LATENCY_BUCKETS)
+        self.flush_latency = Histogram(LATENCY_BUCKETS)
+
+        self._items = []
+        self._bytes = 0
+        self._flush = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._slots = threading.Semaphore(concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='eosapi-batcher')
+        self._thread = threading.Thread(target=self._run,
+                                        name='eosapi-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, signed_transaction):
+        """ Queue a signed transaction, as :class:`Signer` returns them.
+
+        Returns:
+            Future: Result of ``push_transaction`` for the transaction.
+        """
+        item = _Item(signed_transaction,
+                     len(self.client.codec.dumps(signed_transaction)))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('Batcher is closed')
+            self._items.append(item)
+            self._bytes += item.size
+            if len(self._items) == 1 or self._full():
+                self._cond.notify()
+        return item.future
+
+    def _full(self):
+        return len(self._items) >= self.max_count or \
+            self._bytes >= self.max_bytes
+
+    def _run(self):
+        while True:
+            self._slots.acquire()
+            with self._cond:
+                while True:
+                    if self._items and (self._full() or self._flush or
+                                        self._closed):
+                        break
+                    if not self._items:
+                        if self._closed:
+                            self._slots.release()
+                            return
+                        self._cond.wait()
+                        continue
+                    remaining = self._items[0].queued + self.linger - \
+                        time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take()
+                if not self._items:
+                    self._flush = False
+            self._executor.submit(self._send, batch)
+
+    def _take(self):
+        """ Take the next batch off the queue, one transaction at least. """
+        count, size = 0, 0
+        for item in self._items:
+            if count and (count >= self.max_count or
+                          size + item.size > self.max_bytes):
+                break
+            count += 1
+            size += item.size
+        batch, self._items = self._items[:count], self._items[count:]
+        self._bytes -= size
+        return batch
+
+    def _send(self, batch):
+        try:
+            batch = [item for item in batch
+                     if item.future.set_running_or_notify_cancel()]
+            if not batch:
+                return
+            start = time.monotonic()
+            try:
+                results = self.client.push_transactions(
+                    [item.transaction for item in batch])
+            except Exception as e:
+                self._observe(batch, start, failed=True)
+                for item in batch:
+                    item.future.set_exception(e)
+                return
+
+            if not isinstance(results, list):
+                results = []
+            outcomes = []
+            for i, item in enumerate(batch):
+                result = results[i] if i < len(results) else None
+                reason = _rejection(result)
+                outcomes.append((item, result, reason))
+            self._observe(batch, start,
+                          rejected=sum(1 for o in outcomes if o[2] is not None))
+            for item, result, reason in outcomes:
+                if reason is None:
+                    item.future.set_result(result)
+                else:
+                    item.future.set_exception(
+                        TransactionRejected(result, reason))
+        except Exception:
+            logger.exception('Failed to push a batch of transactions')
+        finally:
+            self._slots.release()
+
+    def _observe(self, batch, start, failed=False, rejected=0):
+        with self._stats_lock:
+            self.batches += 1
+            self.transactions += len(batch)
+            self.failed_batches += failed
+            self.rejected += rejected
+            self.batch_sizes.observe(len(batch))
+            self.linger_times.observe(start - batch[0].queued)
+            self.flush_latency.observe(time.monotonic() - start)
+
+    def flush(self, timeout=None):
+        """ Send what is queued right away and wait for the results. """
+        with self._cond:
+            futures = [item.future for item in self._items]
+            self._flush = True
+            self._cond.notify()
+        wait_futures(futures, timeout)
+
+    def close(self):
+        """ Send what is queued, then stop. """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(
+                batches=self.batches,
+                transactions=self.transactions,
+                rejected=self.rejected,
+                failed_batches=self.failed_batches,
+                queued=len(self._items),
+                mean_batch_size=self.transactions / self.batches
+                if self.batches else 0,
+                batch_sizes=self.batch_sizes.as_dict(),
+                linger_times=self.linger_times.as_dict(),
+                flush_latency=self.flush_latency.as_dict(),
+            )
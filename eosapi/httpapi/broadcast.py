@@ -0,0 +1,87 @@
+# coding=utf-8
+import threading
+from collections import defaultdict
+
+from eosapi.httpapi.metrics import LATENCY_BUCKETS, Histogram
+
+BROADCAST_ENDPOINTS = frozenset([
+    'push_transaction',
+])
+
+# tx_duplicate: the node already has the transaction
+DUPLICATE_ERROR_CODE = 3040008
+
+ACCEPTED = 'accepted'
+DUPLICATE = 'duplicate'
+REJECTED = 'rejected'
+
+
+def is_duplicate(result):
+    """ Whether a parsed error response reports a duplicate transaction. """
+    error = result.get('error') if isinstance(result, dict) else None
+    if not isinstance(error, dict):
+        return False
+    return error.get('code') == DUPLICATE_ERROR_CODE or \
+        error.get('name') == 'tx_duplicate'
+
+
+class BroadcastPolicy(object):
+    """ Sends each transaction to several nodes at once.
+
+    Relaying is only as fast as the node a transaction is pushed to, so a
+    push goes out to ``fanout`` nodes concurrently and returns with the
+    first node that accepts it. The other nodes either accept it too or,
+    having received it from a peer in the meantime, reject it as a
+    duplicate; both count as success.
+
+    Args:
+        fanout (int): Nodes each push is sent to, all nodes if None.
+        endpoints (iterable): Endpoints that are broadcast.
+    """
+
+    def __init__(self, fanout=3, endpoints=BROADCAST_ENDPOINTS):
+        self.fanout = fanout
+        self.endpoints = frozenset(endpoints)
+
+        self._lock = threading.Lock()
+        self.broadcasts = 0
+        self.first_acks = defaultdict(int)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+        self.ack_latency = Histogram(LATENCY_BUCKETS)
+        self.last_ack = None
+
+    def applies(self, endpoint):
+        return endpoint in self.endpoints
+
+    def width(self, nodes):
+        """ Nodes to send a push to, out of ``nodes`` known ones. """
+        return min(self.fanout or nodes, nodes)
+
+    def started(self):
+        with self._lock:
+            self.broadcasts += 1
+
+    def record(self, node_url, outcome):
+        with self._lock:
+            self.outcomes[node_url][outcome] += 1
+
+    def acknowledged(self, node_url, latency):
+        """ ``node_url`` was the first to accept, ``latency`` seconds in. """
+        with self._lock:
+            self.first_acks[node_url] += 1
+            self.ack_latency.observe(latency)
+            self.last_ack = dict(node=node_url, latency=latency)
+
+    def stats(self):
+        """ Which nodes acknowledge first, how fast, and what the others
+        answer. """
+        with self._lock:
+            return dict(
+                broadcasts=self.broadcasts,
+                fanout=self.fanout,
+                first_acks=dict(self.first_acks),
+                outcomes={node: dict(counts)
+                          for node, counts in self.outcomes.items()},
+                ack_latency=self.ack_latency.as_dict(),
+                last_ack=self.last_ack,
+            )
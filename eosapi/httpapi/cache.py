@@ -0,0 +1,93 @@
+# coding=utf-8
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+# Seconds a mutable read may be served from cache.
+DEFAULT_TTLS = {
+    'get_info': 0.5,
+    'get_account': 3,
+    'get_code_hash': 3,
+}
+
+
+class ResponseCache(object):
+    """ LRU cache of API results, bounded by their total size in bytes.
+
+    Keys are ``(endpoint, argument)`` tuples, which lets the cache keep hit
+    and miss counts per endpoint. Entries without a TTL never expire and
+    only leave the cache when it runs out of room.
+
+    Note:
+        Cached results are shared between callers, treat them as read-only.
+
+    Args:
+        max_bytes (int): Upper bound of the summed entry sizes.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """ Return ``(True, value)`` on a hit and ``(False, None)`` on a miss. """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits[key[0]] += 1
+                    return True, value
+                self._remove(key)
+            self._misses[key[0]] += 1
+            return False, None
+
+    def put(self, key, value, size, ttl=None):
+        """ Store a value that takes up ``size`` bytes, optionally for ``ttl`` seconds. """
+        if size > self.max_bytes:
+            return
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            endpoints = set(self._hits) | set(self._misses)
+            return dict(
+                hits=hits,
+                misses=misses,
+                hit_rate=hits / (hits + misses) if hits + misses else 0.0,
+                entries=len(self._entries),
+                bytes=self.size,
+                max_bytes=self.max_bytes,
+                evictions=self.evictions,
+                endpoints={e: dict(hits=self._hits[e], misses=self._misses[e])
+                           for e in sorted(endpoints)},
+            )
@@ -0,0 +1,90 @@
+# coding=utf-8
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint(object):
+    """ Last fully processed block, persisted to a local file.
+
+    :meth:`mark` is cheap and only remembers the block; it is written out
+    once ``interval`` blocks were marked or ``max_age`` seconds passed since
+    the last write, and by :meth:`flush`. A write goes to a temporary file
+    that is fsynced and then renamed over the checkpoint, so a crash leaves
+    either the old or the new checkpoint behind, never a torn one. At most
+    the blocks marked since the last write are processed again after a
+    crash.
+
+    Args:
+        path (str): Checkpoint file.
+        interval (int): Blocks marked between writes.
+        max_age (float): Seconds a marked block may wait to be written.
+    """
+
+    def __init__(self, path, interval=100, max_age=1.0):
+        self.path = path
+        self.interval = interval
+        self.max_age = max_age
+
+        self.block_num = None
+        self.block_id = None
+        self.writes = 0
+        self._pending = 0
+        self._written = time.monotonic()
+        self.load()
+
+    def load(self):
+        """ Read the checkpoint file, returns ``(block_num, block_id)``. """
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        self.block_num = state['block_num']
+        self.block_id = state['block_id']
+        return self.block_num, self.block_id
+
+    def mark(self, block_num, block_id):
+        """ Record a block as processed, writing it out if it is time to. """
+        self.block_num = block_num
+        self.block_id = block_id
+        self._pending += 1
+        if self._pending >= self.interval or \
+                time.monotonic() - self._written >= self.max_age:
+            self.flush()
+
+    def flush(self):
+        """ Write the last marked block to disk. """
+        if not self._pending:
+            return
+        state = dict(block_num=self.block_num, block_id=self.block_id,
+                     updated=time.time())
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+
+        self.writes += 1
+        self._pending = 0
+        self._written = time.monotonic()
+        logger.debug('Checkpoint at block %d', self.block_num)
+
+
+def _fsync_dir(path):
+    """ Persist a rename; not supported (nor needed) on Windows. """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -1,39 +1,32 @@
-import time
-
+import logging
+import struct
+import threading
+
+from eosapi.httpapi.abi import AbiCache
+from eosapi.httpapi.actions import ActionFilter, ActionStream
+from eosapi.httpapi.async_http_client import AsyncHttpClient
+from eosapi.httpapi.batcher import TransactionBatcher
+from eosapi.httpapi.cache import DEFAULT_TTLS, ResponseCache
+from eosapi.httpapi.finality import FinalityTracker
+from eosapi.httpapi.history import ActionHistory
 from eosapi.httpapi.http_client import HttpClient
+from eosapi.httpapi.streaming import BlockStream, ForkAwareStream
+from eosapi.httpapi.tables import TableRows
+from eosapi.store.blocks import BlockStore, batches
+from eosapi.store.snapshot import TableSnapshot
+from eosapi.store.transactions import TransactionIndex, transaction_ids
+from eosbase.abi import UnknownAbiType, format_time, parse_time
+from eosbase.signer import Signer
 
+logger = logging.getLogger(__name__)
 
-class Client(HttpClient):
-    def __init__(self, nodes=None, **kwargs):
-        nodes = nodes or ['http://localhost:8888']
-        super().__init__(nodes=nodes, **kwargs)
-
-    def stream_blocks(self, start_block=None, mode='irreversible'):
-        """ Stream raw blocks.
-
-        Args:
-             start_block (int): Block number to start streaming from. If None,
-                                head block is used.
-             mode (str): `irreversible` or `head`.
-        """
-        mode = 'last_irreversible_block_num' if mode == 'irreversible' \
-            else 'head_block_num'
-
-        # convert block id to block number
-        if type(start_block) == str:
-            start_block = int(start_block[:8], base=16)
-
-        if not start_block:
-            start_block = self.get_info()[mode]
 
-        block_interval = 3  # todo: confirm this assumption trough api
+class Api(object):
+    """ Endpoint methods shared by :class:`Client` and :class:`AsyncClient`.
 
-        while True:
-            head_block = self.get_info()[mode]
-            for block_num in range(start_block, head_block + 1):
-                yield self.get_block(block_num)
-            start_block = head_block + 1
-            time.sleep(block_interval)
+    Every method hands its request to ``self.exec``, so on an
+    :class:`AsyncClient` they return coroutines instead of results.
+    """
 
     ##############################
     # apigen.py generated methods
@@ -123,6 +116,32 @@ class Client(HttpClient):
             body=body
         )
 
+    def get_code_hash(self, account_name) -> dict:
+        """ Fetch the hash of an account's smart contract code """
+
+        body = dict(
+            account_name=account_name,
+        )
+
+        return self.exec(
+            api='chain',
+            endpoint='get_code_hash',
+            body=body
+        )
+
+    def get_abi(self, account_name) -> dict:
+        """ Fetch the ABI of an account's smart contract """
+
+        body = dict(
+            account_name=account_name,
+        )
+
+        return self.exec(
+            api='chain',
+            endpoint='get_abi',
+            body=body
+        )
+
     def get_table_rows(self, json, code, scope, table, table_key, lower_bound,
                        upper_bound, limit) -> dict:
         """ Fetch smart contract data from an account. """
@@ -204,9 +223,7 @@ class Client(HttpClient):
     def push_transaction(self, signed_transaction) -> dict:
         """ Attempts to push the transaction into the pending queue. """
 
-        body = dict(
-            signed_transaction=signed_transaction,
-        )
+        body = signed_transaction
 
         return self.exec(
             api='chain',
@@ -217,9 +234,7 @@ class Client(HttpClient):
     def push_transactions(self, signed_transactions) -> dict:
         """ Attempts to push transactions into the pending queue. """
 
-        body = dict(
-            signed_transactions=signed_transactions,
-        )
+        body = list(signed_transactions)
 
         return self.exec(
             api='chain',
@@ -259,6 +274,418 @@ class Client(HttpClient):
         )
 
 
+class Client(Api, HttpClient):
+    """ Eos HTTP API client.
+
+    Passing ``cache=True`` keeps results that can not change any more
+    (irreversible blocks and transactions, contract code by code hash) in an
+    LRU cache of ``cache_max_bytes``. ``get_info``, ``get_account`` and
+    ``get_code_hash`` are cached for a few seconds; ``cache_ttls`` overrides
+    those TTLs per endpoint. Hit and miss counts are in ``cache_stats()``.
+
+    ``block_store`` (a :class:`BlockStore` or its directory) is consulted by
+    ``get_block`` before any node; irreversible blocks fetched from a node
+    are added to it. ``transaction_index`` (a :class:`TransactionIndex` or
+    its file) is what :meth:`locate_transaction` looks transactions up in;
+    it is fed the same way. Fill both in bulk with :meth:`archive_blocks`.
+
+    ``abi_json_to_bin`` and ``abi_bin_to_json`` run locally against the
+    contract ABI, fetched once per ``abi_ttl`` seconds. Anything the local
+    serializer can not handle is passed on to the node; ``local_abi=False``
+    always asks the node.
+
+    Transactions are built with :meth:`transaction`, signed in process by
+    the :class:`Signer` of :meth:`signer` and pushed as they come out of it,
+    one by one or grouped into ``push_transactions`` calls by the
+    :class:`TransactionBatcher` of :meth:`batcher`.
+    """
+
+    def __init__(self, nodes=None, **kwargs):
+        nodes = nodes or ['http://localhost:8888']
+        super().__init__(nodes=nodes, **kwargs)
+
+        self.cache = None
+        if kwargs.get('cache', False):
+            self.cache = ResponseCache(
+                max_bytes=kwargs.get('cache_max_bytes', 64 * 1024 * 1024))
+        self.cache_ttls = dict(DEFAULT_TTLS, **kwargs.get('cache_ttls', {}))
+        self._responses = threading.local()
+        self.last_irreversible_block_num = 0
+
+        self.block_store = kwargs.get('block_store')
+        if isinstance(self.block_store, str):
+            self.block_store = BlockStore(
+                self.block_store, json_codec=kwargs.get('json_codec'))
+        self.abis = None
+        if kwargs.get('local_abi', True):
+            self.abis = AbiCache(lambda account: self.get_abi(account).get('abi'),
+                                 ttl=kwargs.get('abi_ttl', 300))
+
+        self.transaction_index = kwargs.get('transaction_index')
+        if isinstance(self.transaction_index, str):
+            self.transaction_index = TransactionIndex(self.transaction_index)
+
+    def cache_stats(self):
+        """ Hit and miss counts of the response cache. """
+        return self.cache.stats() if self.cache else None
+
+    def _return(self, response=None, body=None, endpoint=None):
+        result = super()._return(response, body, endpoint)
+        # what the node sent is what a cached result is charged for
+        self._responses.size = len(response.data)
+        return result
+
+    def _cached(self, key, fetch, ttl=None, immutable=None):
+        """ Serve ``key`` from cache or fetch and store it.
+
+        An entry takes up the size of the response body it was parsed from.
+        A result that did not come from a response parsed on this thread,
+        e.g. one shared by single-flight, is left to the thread that
+        fetched it.
+
+        Args:
+            key (tuple): ``(endpoint, argument)`` cache key.
+            fetch (callable): Fetches the result on a miss.
+            ttl (float): Cache the result for this many seconds.
+            immutable (callable): Without a ttl, the result is only cached
+                (for good) if ``immutable(result)`` is true.
+        """
+        if self.cache is None:
+            return fetch()
+
+        hit, result = self.cache.get(key)
+        if hit:
+            return result
+
+        self._responses.size = None
+        result = fetch()
+        size = self._responses.size
+        if size is not None and (ttl is not None or immutable(result)):
+            self.cache.put(key, result, size, ttl=ttl)
+        return result
+
+    def get_info(self, cached=True) -> dict:
+        if cached:
+            info = self._cached(
+                ('get_info', None), super().get_info,
+                ttl=self.cache_ttls['get_info'])
+        else:
+            info = super().get_info()
+        self.last_irreversible_block_num = max(
+            self.last_irreversible_block_num,
+            info.get('last_irreversible_block_num', 0))
+        return info
+
+    def get_account(self, account_name) -> dict:
+        return self._cached(
+            ('get_account', account_name),
+            lambda: super(Client, self).get_account(account_name),
+            ttl=self.cache_ttls['get_account'])
+
+    def get_block(self, block_num_or_id, archive=True) -> dict:
+        """ Fetch a block, from the ``block_store`` if it has it.
+
+        Irreversible blocks fetched from a node are archived, one at a time,
+        unless ``archive`` is False.
+        """
+        if self.block_store is not None:
+            block = self.block_store.get(block_num_or_id)
+            if block is not None:
+                return block
+
+        # a block id is the hash of the block, so whatever it resolves to
+        # never changes; a number only stops changing once irreversible
+        if type(block_num_or_id) == str and len(block_num_or_id) == 64:
+            key, immutable = ('get_block', block_num_or_id), bool
+        else:
+            key = ('get_block', int(block_num_or_id))
+            immutable = self._irreversible
+        block = self._cached(
+            key, lambda: super(Client, self).get_block(block_num_or_id),
+            immutable=immutable)
+
+        if archive and self._irreversible(block):
+            self._archive([block])
+        return block
+
+    def _archive(self, blocks):
+        if self.block_store is not None:
+            self.block_store.put_many(blocks)
+        if self.transaction_index is not None:
+            self.transaction_index.add_blocks(blocks)
+
+    def archive_blocks(self, start_block, end_block, prefetch=32):
+        """ Copy irreversible blocks into the ``block_store`` and index their
+        transactions in the ``transaction_index``.
+
+        Args:
+            start_block (int): First block to store.
+            end_block (int): Last block to store, at most the last
+                irreversible block.
+            prefetch (int): Blocks requested concurrently.
+
+        Returns:
+            int: Number of blocks stored.
+        """
+        count = 0
+        # archived here a batch at a time, not by get_block one by one
+        with BlockStream(self, start_block=start_block, mode='irreversible',
+                         prefetch=prefetch,
+                         fetch=lambda num: self.get_block(num, archive=False)
+                         ) as blocks:
+            for batch in batches(blocks, until=end_block):
+                self._archive(batch)
+                count += len(batch)
+        return count
+
+    def locate_transaction(self, id) -> dict:
+        """ Find the block a transaction is in.
+
+        The ``transaction_index`` is tried first; on a miss the history
+        plugin's ``get_transaction`` is asked instead.
+
+        Returns:
+            dict: ``block_num``, ``block_id`` and the ``position`` of the
+            transaction in the block, or None if the block does not hold it.
+        """
+        if self.transaction_index is not None:
+            location = self.transaction_index.get(id)
+            if location is not None:
+                return location
+
+        block = self.get_block(self.get_transaction(id)['block_num'])
+        for position, trx_id in enumerate(transaction_ids(block)):
+            if trx_id == id:
+                return dict(block_num=block['block_num'], block_id=block['id'],
+                            position=position)
+        return None
+
+    def get_transaction(self, id) -> dict:
+        return self._cached(
+            ('get_transaction', id),
+            lambda: super(Client, self).get_transaction(id),
+            immutable=lambda trx: trx.get('block_num', float('inf')) <=
+            trx.get('last_irreversible_block', 0))
+
+    def get_code_hash(self, account_name) -> dict:
+        return self._cached(
+            ('get_code_hash', account_name),
+            lambda: super(Client, self).get_code_hash(account_name),
+            ttl=self.cache_ttls['get_code_hash'])
+
+    def get_code(self, account_name) -> dict:
+        if self.cache is None:
+            return super().get_code(account_name)
+
+        # the code hash is cheap to look up and identifies the contract
+        code_hash = self.get_code_hash(account_name)['code_hash']
+        fetched = []
+
+        def fetch():
+            fetched.append(super(Client, self).get_code(account_name))
+            # the ABI can change while the code stays the same
+            return {k: v for k, v in fetched[0].items() if k != 'abi'}
+
+        code = self._cached(
+            ('get_code', code_hash), fetch,
+            immutable=lambda code: code.get('code_hash') == code_hash)
+        if fetched:
+            return fetched[0]
+        return dict(code, account_name=account_name,
+                    abi=self.get_abi(account_name).get('abi'))
+
+    def iter_actions(self, account_name, start=0, **kwargs):
+        """ Iterate over the action history of an account.
+
+        .. code-block:: python
+
+           history = client.iter_actions('eosio.token', start=resume_at)
+           for action in history:
+               process(action)
+               resume_at = history.next_seq
+
+        See :class:`ActionHistory` for the keyword arguments.
+        """
+        return ActionHistory(self, account_name, start=start, **kwargs)
+
+    def iter_table_rows(self, code, scope, table, **kwargs):
+        """ Iterate over all rows of a table, following ``more``.
+
+        .. code-block:: python
+
+           rows = client.iter_table_rows('eosio', 'eosio', 'producers',
+                                         key='owner', partitions=4)
+           producers = list(rows)
+
+        See :class:`TableRows` for the keyword arguments.
+        """
+        return TableRows(self, code, scope, table, **kwargs)
+
+    def snapshot_table(self, code, table, scopes, key, **kwargs):
+        """ Columnar snapshot of a table over many scopes.
+
+        See :class:`TableSnapshot`; keyword arguments are passed on to
+        :meth:`TableSnapshot.fetch`.
+        """
+        return TableSnapshot.fetch(self, code, table, scopes, key, **kwargs)
+
+    def abi_json_to_bin(self, code, action, args) -> dict:
+        if self.abis is not None:
+            try:
+                data = self.abis.get(code).pack_action(action, args)
+                return dict(binargs=data.hex())
+            except UnknownAbiType as e:
+                # maybe an ABI update, the node knows for sure; a value
+                # the ABI can not pack is an error either way
+                logger.debug('Packing %s::%s on the node: %s', code, action, e)
+                self.abis.invalidate(code)
+        return super().abi_json_to_bin(code, action, args)
+
+    def abi_bin_to_json(self, code, action, binargs) -> dict:
+        if self.abis is not None:
+            try:
+                return dict(args=self.abis.get(code).unpack_action(
+                    action, binargs))
+            except UnknownAbiType as e:
+                logger.debug('Unpacking %s::%s on the node: %s', code, action, e)
+                self.abis.invalidate(code)
+        return super().abi_bin_to_json(code, action, binargs)
+
+    def transaction(self, actions, expires_in=30, **header) -> dict:
+        """ Unsigned transaction of ``actions``, ready for a :class:`Signer`.
+
+        The reference block is the last irreversible one and the expiration
+        ``expires_in`` seconds after the head block, both from ``get_info``.
+        Action ``data`` given as a dict is packed with the contract ABI.
+        """
+        info = self.get_info()
+        head_time = parse_time(info['head_block_time']) // 1000000
+        ref_block_id = bytes.fromhex(info['last_irreversible_block_id'])
+        packed = []
+        for action in actions:
+            if isinstance(action['data'], dict):
+                action = dict(action, data=self.abi_json_to_bin(
+                    action['account'], action['name'],
+                    action['data'])['binargs'])
+            packed.append(action)
+        return dict(
+            expiration=format_time((head_time + int(expires_in)) * 1000000,
+                                   fraction=False),
+            ref_block_num=info['last_irreversible_block_num'] & 0xffff,
+            ref_block_prefix=struct.unpack_from('<I', ref_block_id, 8)[0],
+            actions=packed, **header)
+
+    def signer(self, keys, processes=None) -> Signer:
+        """ :class:`Signer` for the chain of the nodes. """
+        return Signer(keys, chain_id=self.get_info()['chain_id'],
+                      processes=processes)
+
+    def batcher(self, **kwargs) -> TransactionBatcher:
+        """ :class:`TransactionBatcher` pushing with this client. """
+        return TransactionBatcher(self, **kwargs)
+
+    def get_blocks(self, block_nums_or_ids, concurrency=None) -> list:
+        """ Fetch many blocks concurrently.
+
+        Returns:
+            list: Blocks in input order; a block that could not be fetched is
+            replaced by the exception that was raised.
+        """
+        return self.map(self.get_block, block_nums_or_ids, concurrency)
+
+    def get_accounts(self, account_names, concurrency=None) -> list:
+        """ Fetch many accounts concurrently, see :meth:`get_blocks`. """
+        return self.map(self.get_account, account_names, concurrency)
+
+    def _irreversible(self, block):
+        return block.get('block_num', float('inf')) <= \
+            self.last_irreversible_block_num
+
+    def stream_blocks(self, start_block=None, mode='irreversible',
+                      prefetch=16, buffer=None, **kwargs):
+        """ Stream raw blocks.
+
+        Blocks are fetched ``prefetch`` at a time across the nodes and
+        yielded strictly in order, see :class:`BlockStream`.
+
+        .. code-block:: python
+
+           with client.stream_blocks(start_block=1, prefetch=32) as blocks:
+               for block in blocks:
+                   process(block)
+               print(blocks.stats())
+
+        Args:
+             start_block (int): Block number to start streaming from. If None,
+                                head block is used.
+             mode (str): `irreversible` or `head`.
+             prefetch (int): Blocks requested concurrently.
+             buffer (int): Blocks fetched ahead of the consumer at most.
+
+        Further keyword arguments tune how the head is followed, see
+        :class:`BlockStream`.
+        """
+        return BlockStream(self, start_block=start_block, mode=mode,
+                           prefetch=prefetch, buffer=buffer, **kwargs)
+
+    def stream_actions(self, contract=None, action=None, authorizer=None,
+                       receiver=None, start_block=None, mode='irreversible',
+                       **kwargs):
+        """ Stream the actions that match the given filters.
+
+        .. code-block:: python
+
+           for matched in client.stream_actions(contract='eosio.token',
+                                                action='transfer'):
+               print(matched.block['block_num'], matched.trx_id,
+                     matched.action['data'])
+
+        Yields ``(action, index, trx_id, transaction, block)`` tuples, see
+        :class:`ActionFilter` for the filters and :class:`ActionStream`.
+        Further keyword arguments are passed on to :meth:`stream_blocks`.
+        """
+        return ActionStream(
+            self.stream_blocks(start_block=start_block, mode=mode, **kwargs),
+            ActionFilter(contract=contract, action=action,
+                         authorizer=authorizer, receiver=receiver))
+
+    def stream_block_events(self, start_block=None, window=1024, **kwargs):
+        """ Stream head blocks as ``(action, block)`` events.
+
+        ``action`` is ``apply`` for a new block and ``undo`` for a block
+        that a fork took out of the chain. See :class:`ForkAwareStream`.
+
+        Args:
+             start_block (int): Block number to start streaming from. If None,
+                                head block is used.
+             window (int): Reversible blocks kept to undo at most.
+        """
+        return ForkAwareStream(self, start_block=start_block, window=window,
+                               **kwargs)
+
+    def finality_tracker(self, start_block=None, **kwargs):
+        """ :class:`FinalityTracker` confirming transactions off this
+        client's block stream. Use it as a context manager, or call
+        ``start()``. """
+        return FinalityTracker(self, start_block=start_block, **kwargs)
+
+
+class AsyncClient(Api, AsyncHttpClient):
+    """ Coroutine based :class:`Client`.
+
+    .. code-block:: python
+
+       async with AsyncClient(['https://eosnode.com']) as client:
+           blocks = await asyncio.gather(
+               *(client.get_block(num) for num in range(1, 1001)))
+
+    """
+
+    def __init__(self, nodes=None, **kwargs):
+        nodes = nodes or ['http://localhost:8888']
+        super().__init__(nodes=nodes, **kwargs)
+
+
 class WalletClient(HttpClient):
     def __init__(self, host='localhost', port=8888, **kwargs):
         hostname = host.split('//')[-1].split(':')[0]
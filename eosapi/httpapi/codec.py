@@ -0,0 +1,96 @@
+# coding=utf-8
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# an integer literal that may not fit in 64 bits
+_WIDE_INT = re.compile(rb'[\[:,]\s*-?\d{20}')
+
+
+class StdlibCodec(object):
+    """ JSON codec backed by the standard library. """
+
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        # the stdlib parser only works on str; json.loads(bytes) decodes
+        # internally anyway, after sniffing the encoding first
+        return json.loads(data.decode('utf-8'))
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonCodec(object):
+    """ JSON codec backed by orjson, which parses from and to bytes. """
+
+    name = 'orjson'
+
+    @staticmethod
+    def loads(data):
+        # orjson turns integers wider than 64 bits into floats, stdlib
+        # keeps them exact; finding one is cheap next to parsing
+        if _WIDE_INT.search(data):
+            return json.loads(data)
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return StdlibCodec.dumps(obj)
+
+
+class UjsonCodec(object):
+    """ JSON codec backed by ujson. """
+
+    name = 'ujson'
+
+    @staticmethod
+    def loads(data):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+    @staticmethod
+    def dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+CODECS = {StdlibCodec.name: StdlibCodec}
+if ujson is not None:
+    CODECS[UjsonCodec.name] = UjsonCodec
+if orjson is not None:
+    CODECS[OrjsonCodec.name] = OrjsonCodec
+
+
+def get_codec(codec=None):
+    """ Resolve a JSON codec.
+
+    Args:
+        codec: A codec name (``'orjson'``, ``'ujson'`` or ``'json'``), an
+            object with ``loads(bytes)`` and ``dumps(obj) -> bytes``, or None
+            for the fastest installed library.
+    """
+    if codec is None:
+        for name in ('orjson', 'ujson', 'json'):
+            if name in CODECS:
+                return CODECS[name]
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError('JSON codec %s is not available' % codec)
+        return CODECS[codec]
+    return codec
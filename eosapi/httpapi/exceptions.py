@@ -4,7 +4,7 @@ class EosdNoResponse(BaseException):
 
 class HttpAPIError(Exception):
     def __init__(self, status_code, response):
-        if status_code != 200:
+        if not 200 <= status_code < 300:
             msg = 'API returned status code: %s' % status_code
         elif not response:
             msg = 'API returned without response body.'
@@ -14,3 +14,51 @@ class HttpAPIError(Exception):
         super().__init__(msg)
         self.status_code = status_code
         self.response = response
+
+
+class ThrottledAPIError(HttpAPIError):
+    """ The node rejected the request because we are sending too much. """
+
+    def __init__(self, status_code, response, retry_after=None):
+        super().__init__(status_code, response)
+        self.retry_after = retry_after
+
+
+class RateLimitTimeout(Exception):
+    """ A node had no request capacity left before the call deadline. """
+    pass
+
+
+class TransactionRejected(Exception):
+    """ A node did not accept a transaction of a ``push_transactions`` call. """
+
+    def __init__(self, result, reason):
+        super().__init__('Transaction rejected: %s' % (reason,))
+        self.result = result
+        self.reason = reason
+
+
+class TransactionExpired(Exception):
+    """ A transaction was not included in a block before it expired. """
+
+    def __init__(self, transaction_id, expiration):
+        super().__init__('Transaction %s expired' % transaction_id)
+        self.transaction_id = transaction_id
+        self.expiration = expiration
+
+
+class ForkTooDeep(Exception):
+    """ A fork replaced more blocks than the stream keeps to undo. """
+    pass
+
+
+class CheckpointMismatch(Exception):
+    """ The checkpointed block is no longer part of the chain. """
+
+    def __init__(self, block_num, block_id, previous):
+        super().__init__(
+            'Checkpoint %d (%s) does not link to the next block, whose '
+            'previous is %s' % (block_num, block_id, previous))
+        self.block_num = block_num
+        self.block_id = block_id
+        self.previous = previous
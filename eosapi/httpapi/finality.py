@@ -0,0 +1,300 @@
+# coding=utf-8
+import heapq
+import logging
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+from eosapi.httpapi.exceptions import TransactionExpired
+from eosapi.httpapi.metrics import Histogram
+from eosapi.httpapi.streaming import (
+    APPLY,
+    PRODUCTION_LAG_BUCKETS,
+    ForkAwareStream,
+    _timestamp,
+)
+from eosapi.store.transactions import transaction_ids
+from eosbase.encoding import transaction_id
+
+logger = logging.getLogger(__name__)
+
+INCLUDED = 'included'
+UNDONE = 'undone'
+IRREVERSIBLE = 'irreversible'
+EXPIRED = 'expired'
+
+
+class Tracked(object):
+    """ A transaction a :class:`FinalityTracker` waits for.
+
+    ``included`` resolves when the transaction is first seen in a block,
+    ``irreversible`` when the block holding it becomes irreversible. Both
+    resolve to ``dict(transaction_id, block_num, block_id)``, or fail with
+    :class:`TransactionExpired`.
+
+    A future resolves only once, so after a fork undid the first block,
+    ``included`` keeps naming that block. ``block_num`` and ``block_id``
+    always name the block currently holding the transaction (None while it
+    waits again), and ``irreversible`` names the block that became final;
+    use those where the block matters.
+    """
+
+    __slots__ = ('id', 'expiration', 'callback', 'included', 'irreversible',
+                 'block_num', 'block_id', 'tracked_at')
+
+    def __init__(self, trx_id, expiration, callback):
+        self.id = trx_id
+        self.expiration = expiration
+        self.callback = callback
+        self.included = Future()
+        self.irreversible = Future()
+        self.block_num = None
+        self.block_id = None
+        self.tracked_at = time.monotonic()
+
+    def result(self):
+        return dict(transaction_id=self.id, block_num=self.block_num,
+                    block_id=self.block_id)
+
+
+class FinalityTracker(object):
+    """ Confirms many transactions off a single stream of head blocks.
+
+    Instead of polling every transaction, the tracker follows the chain
+    once, with a :class:`ForkAwareStream`, and looks the transactions of
+    each block up in the set of tracked ids. A tracked transaction is
+    resolved twice: when a block includes it, and when that block becomes
+    irreversible. A fork that undoes the block puts it back to waiting, with
+    an ``undone`` event for the callback; see :class:`Tracked`. A
+    transaction still waiting once the head block is past its expiration
+    fails with :class:`TransactionExpired`.
+
+    Callbacks are called with the event (``included``, ``undone``,
+    ``irreversible`` or ``expired``) and the :class:`Tracked` transaction,
+    on the tracker's thread.
+
+    Transactions have to be tracked before they can be included, so track
+    them before pushing them, or start the tracker at an earlier block.
+
+    .. code-block:: python
+
+       with client.finality_tracker() as tracker:
+           tracked = [tracker.track_transaction(trx) for trx in signed]
+           client.push_transactions(signed)
+           blocks = [t.irreversible.result()['block_num'] for t in tracked]
+
+    Args:
+        client (Client): Client the blocks are fetched with.
+        start_block (int): First block to look at, head block if None.
+        window (int): Reversible blocks kept to undo at most.
+
+    Further keyword arguments are passed on to :class:`BlockStream`.
+    """
+
+    def __init__(self, client, start_block=None, window=1024, **kwargs):
+        self.client = client
+        self.events = ForkAwareStream(client, start_block=start_block,
+                                      window=window, **kwargs)
+
+        self.head_block_num = None
+        self.head_time = None
+        self.blocks = 0
+        self.counts = dict.fromkeys(
+            (INCLUDED, UNDONE, IRREVERSIBLE, EXPIRED), 0)
+        self.inclusion_latency = Histogram(PRODUCTION_LAG_BUCKETS)
+        self.finality_latency = Histogram(PRODUCTION_LAG_BUCKETS)
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._expiring = []
+        self._finalizing = []
+        self._closed = False
+        self._thread = None
+
+    def track(self, trx_id, expiration=None, callback=None):
+        """ Wait for a transaction.
+
+        Args:
+            trx_id (str): Transaction id.
+            expiration (float|str): Expiration of the transaction, as unix
+                time or as in the transaction header. Never expires if None.
+            callback (callable): Called as ``callback(event, tracked)``.
+
+        Returns:
+            Tracked: The futures of the transaction.
+        """
+        if isinstance(expiration, str):
+            expiration = _timestamp(expiration)
+        tracked = Tracked(trx_id, expiration, callback)
+        with self._lock:
+            if self.error is not None:
+                raise self.error
+            if self._closed:
+                raise RuntimeError('Tracker is closed')
+            self._pending[trx_id] = tracked
+            if expiration is not None:
+                heapq.heappush(self._expiring, (expiration, trx_id))
+        return tracked
+
+    def track_transaction(self, packed_transaction, callback=None):
+        """ Wait for a transaction in the form :class:`Signer` returns. """
+        packed_trx = bytes.fromhex(packed_transaction['packed_trx'])
+        expiration, = struct.unpack_from('<I', packed_trx)
+        return self.track(transaction_id(packed_transaction), expiration,
+                          callback)
+
+    def untrack(self, trx_id):
+        with self._lock:
+            return self._pending.pop(trx_id, None)
+
+    def process(self, event):
+        """ Update the tracked transactions with a :data:`BlockEvent`. """
+        action, block = event
+        with self._lock:
+            notes = []
+            if action == APPLY:
+                self._apply(block, notes)
+            else:
+                self._undo(block, notes)
+            self._finalize(notes)
+            self._expire(notes)
+            for tracked, note in notes:
+                self._count(tracked, note)
+        for tracked, note in notes:
+            self._notify(tracked, note)
+
+    def _apply(self, block, notes):
+        self.blocks += 1
+        self.head_block_num = block['block_num']
+        self.head_time = _timestamp(block.get('timestamp')) or self.head_time
+        for trx_id in transaction_ids(block):
+            tracked = self._pending.get(trx_id)
+            if tracked is None or tracked.block_num is not None:
+                continue
+            tracked.block_num = block['block_num']
+            tracked.block_id = block['id']
+            heapq.heappush(self._finalizing, (tracked.block_num, trx_id))
+            notes.append((tracked, INCLUDED))
+
+    def _undo(self, block, notes):
+        self.head_block_num = block['block_num'] - 1
+        for trx_id in transaction_ids(block):
+            tracked = self._pending.get(trx_id)
+            if tracked is None or tracked.block_id != block['id']:
+                continue
+            tracked.block_num = tracked.block_id = None
+            if tracked.expiration is not None:
+                heapq.heappush(self._expiring, (tracked.expiration, trx_id))
+            notes.append((tracked, UNDONE))
+
+    def _finalize(self, notes):
+        # blocks the stream has not linked yet may still be on another fork
+        irreversible = min(self.client.last_irreversible_block_num,
+                           self.head_block_num or 0)
+        while self._finalizing and self._finalizing[0][0] <= irreversible:
+            block_num, trx_id = heapq.heappop(self._finalizing)
+            tracked = self._pending.get(trx_id)
+            if tracked is None or tracked.block_num != block_num:
+                continue
+            del self._pending[trx_id]
+            notes.append((tracked, IRREVERSIBLE))
+
+    def _expire(self, notes):
+        if self.head_time is None:
+            return
+        while self._expiring and self._expiring[0][0] < self.head_time:
+            _, trx_id = heapq.heappop(self._expiring)
+            tracked = self._pending.get(trx_id)
+            if tracked is None or tracked.block_num is not None:
+                continue
+            del self._pending[trx_id]
+            notes.append((tracked, EXPIRED))
+
+    def _count(self, tracked, event):
+        self.counts[event] += 1
+        elapsed = time.monotonic() - tracked.tracked_at
+        if event == INCLUDED and not tracked.included.done():
+            self.inclusion_latency.observe(elapsed)
+        elif event == IRREVERSIBLE:
+            self.finality_latency.observe(elapsed)
+
+    def _notify(self, tracked, event):
+        if event == INCLUDED and not tracked.included.done():
+            tracked.included.set_result(tracked.result())
+        elif event == IRREVERSIBLE:
+            if not tracked.included.done():
+                tracked.included.set_result(tracked.result())
+            if not tracked.irreversible.done():
+                tracked.irreversible.set_result(tracked.result())
+        elif event == EXPIRED:
+            self._fail(tracked, TransactionExpired(tracked.id,
+                                                   tracked.expiration))
+        if tracked.callback is not None:
+            try:
+                tracked.callback(event, tracked)
+            except Exception:
+                logger.exception('Finality callback of %s failed', tracked.id)
+
+    @staticmethod
+    def _fail(tracked, error):
+        for future in (tracked.included, tracked.irreversible):
+            if not future.done():
+                future.set_exception(error)
+
+    def run(self):
+        """ Follow the chain until :meth:`close` is called.
+
+        An error of the stream fails every tracked transaction with it.
+        """
+        try:
+            for event in self.events:
+                if self._closed:
+                    break
+                self.process(event)
+        except Exception as e:
+            if self._closed:
+                return
+            logger.exception('Finality tracking stopped')
+            with self._lock:
+                self.error = e
+                pending, self._pending = list(self._pending.values()), {}
+            for tracked in pending:
+                self._fail(tracked, e)
+
+    def start(self):
+        """ Run the tracker on a thread of its own. """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self.run, name='eosapi-finality', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """ Stop tracking; transactions still tracked are cancelled. """
+        with self._lock:
+            self._closed = True
+            pending, self._pending = list(self._pending.values()), {}
+        self.events.close()
+        for tracked in pending:
+            tracked.included.cancel()
+            tracked.irreversible.cancel()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self.counts,
+                pending=len(self._pending),
+                blocks=self.blocks,
+                head_block_num=self.head_block_num,
+                inclusion_latency=self.inclusion_latency.as_dict(),
+                finality_latency=self.finality_latency.as_dict(),
+                stream=self.events.stats(),
+            )
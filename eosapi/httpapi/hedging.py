@@ -0,0 +1,99 @@
+# coding=utf-8
+import threading
+from collections import deque
+
+HEDGE_ENDPOINTS = frozenset([
+    'get_info',
+    'get_block',
+    'get_account',
+    'get_table_rows',
+    'get_actions',
+])
+
+# broadcasting twice is never safe, whatever the caller configures
+NEVER_HEDGE = frozenset([
+    'push_transaction',
+    'push_transactions',
+    'push_block',
+])
+
+
+class HedgePolicy(object):
+    """ Decides when a read request is duplicated onto a second node.
+
+    Args:
+        endpoints (iterable): Endpoints that may be hedged.
+        delay (float|str): Seconds to wait for the first node before firing
+            the hedge, or a percentile such as ``'p95'`` of the observed
+            latencies.
+        window (int): Number of recent latencies the percentile is taken from.
+        min_samples (int): Latencies needed before a percentile delay is
+            trusted. Until then ``fallback_delay`` is used.
+        fallback_delay (float): Delay used while the window fills up.
+    """
+
+    def __init__(self, endpoints=HEDGE_ENDPOINTS, delay='p95', window=512,
+                 min_samples=20, fallback_delay=0.1):
+        endpoints = frozenset(endpoints)
+        if endpoints & NEVER_HEDGE:
+            raise ValueError('Refusing to hedge %s' %
+                             ', '.join(sorted(endpoints & NEVER_HEDGE)))
+
+        self.endpoints = endpoints
+        if isinstance(delay, str):
+            self.percentile = float(delay.lstrip('p')) / 100
+            self.fixed_delay = None
+        else:
+            self.percentile = None
+            self.fixed_delay = delay
+        self.min_samples = min_samples
+        self.fallback_delay = fallback_delay
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._observed = 0
+        self._cached_delay = fallback_delay
+        self.requests = 0
+        self.fired = 0
+        self.wins = 0
+
+    def applies(self, endpoint):
+        return endpoint in self.endpoints
+
+    def delay(self):
+        """ Seconds to wait before the hedge request is sent. """
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        return self._cached_delay
+
+    def observe(self, latency):
+        """ Feed the latency of a completed request into the window. """
+        with self._lock:
+            self._latencies.append(latency)
+            self._observed += 1
+            # sorting the window on every request would dominate the hot path
+            if self.percentile is not None and \
+                    len(self._latencies) >= self.min_samples and \
+                    self._observed % 16 == 0:
+                ordered = sorted(self._latencies)
+                index = min(len(ordered) - 1,
+                            int(self.percentile * len(ordered)))
+                self._cached_delay = ordered[index]
+
+    def record(self, fired, won):
+        with self._lock:
+            self.requests += 1
+            self.fired += fired
+            self.wins += won
+
+    def stats(self):
+        """ How often hedges fire and how often the hedge answers first. """
+        with self._lock:
+            return dict(
+                requests=self.requests,
+                fired=self.fired,
+                wins=self.wins,
+                fire_rate=self.fired / self.requests if self.requests else 0.0,
+                win_rate=self.wins / self.fired if self.fired else 0.0,
+                delay=self.delay(),
+            )
@@ -0,0 +1,137 @@
+# coding=utf-8
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class ActionHistory(object):
+    """ Iterator over the action history of an account, fetched in parallel.
+
+    The last ``account_action_seq`` is looked up first, then the history is
+    requested in windows of ``window`` actions, ``concurrency`` windows at a
+    time. Actions are yielded in sequence order, each once, even where
+    windows overlap or a node returns more than was asked for. When a node
+    returns less, the rest of the window is requested again.
+
+    :attr:`next_seq` is the sequence number to pass as ``start`` to pick up
+    where an interrupted iteration left off. If a call fails, iteration
+    raises its exception; iterating again continues from there.
+
+    Args:
+        client (Client): Client the history is fetched with.
+        account_name (str): Account whose history to fetch.
+        start (int): First ``account_action_seq`` to yield.
+        end (int): Last ``account_action_seq`` to yield, the latest one if
+            None.
+        window (int): Actions requested per call.
+        concurrency (int): Calls in flight at once.
+    """
+
+    def __init__(self, client, account_name, start=0, end=None, window=100,
+                 concurrency=8):
+        self.client = client
+        self.account_name = account_name
+        self.next_seq = start
+        self.end = end
+        self.window = window
+        self.concurrency = concurrency
+
+        self.requests = 0
+        self.duplicates = 0
+        self._windows = deque()
+        self._executor = None
+        self._pending = deque()
+        self._next_window = start
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._pending:
+            if self.end is None:
+                self.end = self.last_seq()
+            if self.next_seq > self.end:
+                raise StopIteration
+            self._fill()
+            if not self._windows:
+                raise StopIteration
+            first, last, future = self._windows[0]
+            try:
+                actions = future.result()
+            except Exception:
+                # start over from the first action not yielded yet
+                self._cancel()
+                self._next_window = self.next_seq
+                raise
+            self._windows.popleft()
+            received = self._collect(actions)
+            if received is not None and received < last:
+                # a short window, e.g. a node capping the actions per call
+                self._windows.appendleft(self._submit(received + 1, last))
+        action = self._pending.popleft()
+        self.next_seq = action['account_action_seq'] + 1
+        return action
+
+    def last_seq(self):
+        """ Sequence number of the latest action of the account. """
+        actions = self._get(-1, -1)
+        return actions[-1]['account_action_seq'] if actions else -1
+
+    def _get(self, pos, offset):
+        self.requests += 1
+        return self.client.get_actions(
+            self.account_name, pos, offset).get('actions') or []
+
+    def _fill(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix='eosapi-history')
+        while len(self._windows) < self.concurrency and \
+                self._next_window <= self.end:
+            count = min(self.window, self.end - self._next_window + 1)
+            self._windows.append(self._submit(
+                self._next_window, self._next_window + count - 1))
+            self._next_window += count
+
+    def _submit(self, first, last):
+        """ Request the actions ``first`` to ``last``. """
+        return first, last, self._executor.submit(
+            self._get, first, last - first)
+
+    def _collect(self, actions):
+        """ Queue the new actions of a window, in order. Returns the
+        sequence number of the last one, None if none were new. """
+        last = self.next_seq - 1
+        if self._pending:
+            last = self._pending[-1]['account_action_seq']
+        received = None
+        for action in sorted(actions, key=lambda a: a['account_action_seq']):
+            seq = action['account_action_seq']
+            if seq <= last or seq > self.end:
+                self.duplicates += 1
+                continue
+            self._pending.append(action)
+            last = received = seq
+        return received
+
+    def _cancel(self):
+        while self._windows:
+            self._windows.pop()[2].cancel()
+
+    def close(self):
+        self._cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        return dict(next_seq=self.next_seq, end=self.end,
+                    requests=self.requests, duplicates=self.duplicates)
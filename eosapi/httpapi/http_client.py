@@ -1,28 +1,69 @@
 # coding=utf-8
-import json
 import logging
 import socket
+import threading
 import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
 from http.client import RemoteDisconnected
-from itertools import cycle
-from json import JSONDecodeError
 from urllib.parse import urlparse
 
 import certifi
 import urllib3
+from eosapi.httpapi.broadcast import (
+    ACCEPTED,
+    DUPLICATE,
+    REJECTED,
+    BroadcastPolicy,
+    is_duplicate,
+)
+from eosapi.httpapi.codec import get_codec
 from eosapi.httpapi.exceptions import (
     EosdNoResponse,
     HttpAPIError,
+    ThrottledAPIError,
+)
+from eosapi.httpapi.hedging import HEDGE_ENDPOINTS, HedgePolicy
+from eosapi.httpapi.metrics import Metrics
+from eosapi.httpapi.ratelimit import (
+    FAILED,
+    SUCCESS,
+    THROTTLE_STATUSES,
+    THROTTLED,
+    RateLimiter,
 )
+from eosapi.httpapi.retry import (
+    RETRY_STATUSES,
+    SAFE_RETRY_STATUSES,
+    RetryBudget,
+    RetryPolicy,
+    is_idempotent,
+)
+from eosapi.httpapi.scheduler import NodeScheduler
+from eosapi.httpapi.singleflight import COALESCE_ENDPOINTS, SingleFlight
+from eosbase.encoding import transaction_id
 from urllib3.connection import HTTPConnection
 from urllib3.exceptions import (
+    ConnectTimeoutError,
     MaxRetryError,
+    NewConnectionError,
     ReadTimeoutError,
     ProtocolError,
 )
 
 logger = logging.getLogger(__name__)
 
+NETWORK_ERRORS = (
+    MaxRetryError,
+    ConnectionResetError,
+    ReadTimeoutError,
+    RemoteDisconnected,
+    ProtocolError,
+)
+
 
 class HttpClient(object):
     """ Http client for handling eosd connections.
@@ -40,11 +81,57 @@ class HttpClient(object):
     any call available to that port can be issued using the instance
     via the syntax ``rpc.exec('command', *parameters)``.
 
+    Requests are routed by a :class:`NodeScheduler` to the node with the
+    best latency and error record; ``node_scores()`` shows its live view.
+    ``node_cooldown`` and ``node_failure_threshold`` tune how long and after
+    how many consecutive failures a node is taken out of rotation.
+
+    Passing ``hedge=True`` enables hedged reads: when the node serving a read
+    only endpoint has not answered within ``hedge_delay`` seconds (or the
+    observed latency percentile, e.g. ``'p95'``), the same request is sent to
+    a second node and the first answer wins. Transactions are never hedged.
+
+    ``broadcast=K`` sends every ``push_transaction`` to K nodes at once
+    (all of them with ``broadcast=True``) and returns with the first one
+    that accepts it; nodes that answer it is a duplicate count as accepting.
+    ``broadcast_stats()`` tells which nodes acknowledge first and how fast.
+
+    Every call is bounded by ``deadline`` seconds, retries included. Retries
+    back off exponentially with jitter and draw from a client wide budget
+    of ``retry_budget`` retries per request, so an outage does not turn into
+    a retry storm.
+
+    With ``coalesce=True`` concurrent identical calls to ``get_info``,
+    ``get_account`` and a few other hot reads share a single request; pass
+    a list of endpoints instead to choose which ones. ``coalesce_stats()``
+    counts the requests saved.
+
+    ``rate_limit`` caps the requests per second sent to each node and
+    ``adaptive_concurrency=True`` adapts the requests in flight per node:
+    the limit grows while a node keeps up and halves when it answers with
+    429 or 503 or times out. A ``Retry-After`` header pauses the node.
+
+    Request metrics are collected in ``metrics``; pass a shared
+    :class:`Metrics` instance to aggregate several clients.
+
+    JSON is handled by the fastest installed library (orjson, then ujson,
+    then the standard library); pass ``json_codec`` to pick one explicitly.
+
     """
 
     def __init__(self, nodes, **kwargs):
         self.api_version = kwargs.get('api_version', 'v1')
         self.max_retries = kwargs.get('max_retries', 10)
+        self.deadline = kwargs.get('deadline', 60)
+        self.codec = get_codec(kwargs.get('json_codec'))
+        self.metrics = kwargs.get('metrics') or Metrics()
+        self.retry_policy = RetryPolicy(
+            max_retries=self.max_retries,
+            base_delay=kwargs.get('retry_base_delay', 0.1),
+            max_delay=kwargs.get('retry_max_delay', 5))
+        self.retry_budget = RetryBudget(
+            ratio=kwargs.get('retry_budget', 0.2),
+            min_retries_per_sec=kwargs.get('min_retries_per_sec', 10))
 
         if kwargs.get('tcp_keepalive', True):
             socket_options = HTTPConnection.default_socket_options + \
@@ -52,16 +139,25 @@ class HttpClient(object):
         else:
             socket_options = HTTPConnection.default_socket_options
 
-        timeout = urllib3.Timeout(
-            connect=kwargs.get('connect_timeout', 15),
-            read=kwargs.get('timeout', 30))
+        self.connect_timeout = kwargs.get('connect_timeout', 15)
+        self.read_timeout = kwargs.get('timeout', 30)
+        self.timeout = urllib3.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout)
+
+        # exec() owns retries and failover; urllib3 only follows redirects
+        http_retries = kwargs.get('http_retries', 0)
+        retries = urllib3.Retry(
+            total=None, connect=http_retries, read=http_retries,
+            status=0, other=0, redirect=5)
 
+        self.maxsize = kwargs.get('maxsize', 10)
         self.http = urllib3.poolmanager.PoolManager(
             num_pools=kwargs.get('num_pools', 50),
-            maxsize=kwargs.get('maxsize', 10),
+            maxsize=self.maxsize,
             block=kwargs.get('pool_block', False),
-            retries=kwargs.get('http_retries', 10),
-            timeout=timeout,
+            retries=retries,
+            timeout=self.timeout,
             socket_options=socket_options,
             headers={'Content-Type': 'application/json'},
             cert_reqs='CERT_REQUIRED',
@@ -73,9 +169,43 @@ class HttpClient(object):
             **response_kw)
         '''
 
-        self.nodes = cycle(self._nodes(nodes))
-        self.node_url = ''
-        self.next_node()
+        self.scheduler = NodeScheduler(
+            self._nodes(nodes),
+            probe=self._probe,
+            failure_threshold=kwargs.get('node_failure_threshold', 3),
+            cooldown=kwargs.get('node_cooldown', 30))
+        self.probe_timeout = kwargs.get('probe_timeout', 5)
+        self.node_url = self.scheduler.nodes[0]
+        self._pinned_node = None
+
+        self.hedging = None
+        if kwargs.get('hedge', False):
+            self.hedging = HedgePolicy(
+                endpoints=kwargs.get('hedge_endpoints', HEDGE_ENDPOINTS),
+                delay=kwargs.get('hedge_delay', 'p95'))
+        self.broadcasting = None
+        broadcast = kwargs.get('broadcast', False)
+        if broadcast:
+            self.broadcasting = BroadcastPolicy(
+                fanout=None if broadcast is True else broadcast)
+        self.pool_workers = kwargs.get('pool_workers', 32)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+        self.rate_limiter = None
+        if kwargs.get('rate_limit') or kwargs.get('adaptive_concurrency'):
+            self.rate_limiter = RateLimiter(
+                rate=kwargs.get('rate_limit'),
+                burst=kwargs.get('rate_burst'),
+                adaptive=kwargs.get('adaptive_concurrency', False),
+                initial_concurrency=kwargs.get('initial_concurrency', 4),
+                max_concurrency=kwargs.get('max_concurrency', self.maxsize))
+
+        coalesce = kwargs.get('coalesce', False)
+        self.single_flight = None
+        if coalesce:
+            self.single_flight = SingleFlight(
+                COALESCE_ENDPOINTS if coalesce is True else coalesce)
 
         log_level = kwargs.get('log_level', logging.INFO)
         logger.setLevel(log_level)
@@ -85,66 +215,421 @@ class HttpClient(object):
 
         This method will change base URL of our requests.
         Use it when the current node goes down to change to a fallback node. """
-        self.set_node(next(self.nodes))
+        self._pinned_node = None
+        self.metrics.observe_node_switch(self.node_url)
+        self.scheduler.eject(self.node_url)
+        self.node_url = self.scheduler.peek(exclude=(self.node_url,))
 
     def set_node(self, node_url):
-        """ Change current node to provided node URL. """
+        """ Change current node to provided node URL.
+
+        Requests stick to this node until it fails, after which the
+        scheduler takes over again. """
+        node_url = node_url.rstrip('/')
+        self.scheduler.add_node(node_url)
+        self.node_url = self._pinned_node = node_url
+
+    def node_scores(self):
+        """ Latency, error rate and circuit state of every node. """
+        return self.scheduler.scores()
+
+    def _select_node(self, exclude=()):
+        if self._pinned_node:
+            node_url = self.scheduler.acquire(self._pinned_node)
+        else:
+            node_url = self.scheduler.select(exclude=exclude)
         self.node_url = node_url
+        return node_url
+
+    def _probe(self, node_url):
+        """ Check whether a node answers ``get_info``. """
+        timeout = urllib3.Timeout(self.probe_timeout)
+        response = self.http.urlopen(
+            'POST', f"{node_url}/{self.api_version}/chain/get_info",
+            body=b'{}', retries=False, timeout=timeout)
+        return response.status == 200
 
     @property
     def hostname(self):
         return urlparse(self.node_url).hostname
 
-    def exec(self, api, endpoint, body=None, _ret_cnt=0):
+    def exec(self, api, endpoint, body=None, deadline=None):
         """ Execute a method against eosd RPC.
 
+        Failed attempts are retried on other nodes with jittered exponential
+        backoff, until ``max_retries``, the call deadline or the client wide
+        retry budget runs out. Whatever comes first ends the call with the
+        last error.
+
         Warnings:
-            This command will auto-retry in case of node failure, as well as handle
-            node fail-over, unless we are broadcasting a transaction.
-            In latter case, the exception is **re-raised**.
+            Transactions and blocks are never replayed blindly. A push is
+            only retried if the request provably never reached a node;
+            otherwise the exception is **re-raised**.
+
+        Args:
+            deadline (float): Seconds the whole call, retries included, may
+                take. Defaults to the ``deadline`` the client was created with.
         """
 
-        url = f"{self.node_url}/{self.api_version}/{api}/{endpoint}"
         body = self._body(body)
+        if self.single_flight and self.single_flight.applies(endpoint):
+            return self.single_flight.do(
+                (api, endpoint, body),
+                lambda: self._exec(api, endpoint, body, deadline))
+        return self._exec(api, endpoint, body, deadline)
+
+    def _exec(self, api, endpoint, body, deadline):
+        path = f"/{self.api_version}/{api}/{endpoint}"
         method = 'POST' if body else 'GET'
-        try:
-            response = self.http.urlopen(method, url, body=body)
-        except (MaxRetryError,
-                ConnectionResetError,
-                ReadTimeoutError,
-                RemoteDisconnected,
-                ProtocolError) as e:
-
-            if _ret_cnt >= self.max_retries:
+        idempotent = is_idempotent(endpoint)
+        expires = time.monotonic() + (deadline or self.deadline)
+        self.retry_budget.deposit()
+        if self.broadcasting and self.broadcasting.applies(endpoint):
+            return self._broadcast(method, path, body, endpoint, expires)
+
+        failed = []
+        retries = 0
+        while True:
+            node_url = self._select_node(exclude=failed)
+            try:
+                if self.hedging and self.hedging.applies(endpoint):
+                    response = self._hedged_urlopen(
+                        node_url, method, path, body, failed, expires)
+                else:
+                    response = self._urlopen(
+                        node_url, method, path, body, expires)
+            except NETWORK_ERRORS as e:
+                if node_url not in failed:
+                    failed.append(node_url)
+                if self._pinned_node in failed:
+                    self._pinned_node = None
+                unsent = self._unsent(e)
+                if not idempotent and not unsent:
+                    raise e
+                error, response = e, None
+            except Exception as e:
+                extra = dict(err=e, url=node_url + path, body=body, method=method)
+                logger.info('Request error', extra=extra)
                 raise e
+            else:
+                retry_statuses = RETRY_STATUSES if idempotent \
+                    else SAFE_RETRY_STATUSES
+                if response.status not in retry_statuses:
+                    return self._return(
+                        response=response, body=body, endpoint=endpoint)
+                if node_url not in failed:
+                    failed.append(node_url)
+                error, unsent = None, False
+
+            retries += 1
+            backoff = self.retry_policy.backoff(retries)
+            if response is not None:
+                backoff = max(backoff, self._retry_after(response) or 0)
+            # a request that never left adds no load, so it costs no budget
+            if retries > self.retry_policy.max_retries or \
+                    time.monotonic() + backoff >= expires or \
+                    not (unsent or self.retry_budget.withdraw()):
+                if error:
+                    raise error
+                return self._return(
+                    response=response, body=body, endpoint=endpoint)
+
+            self.metrics.observe_retry(endpoint)
+            if len(self.scheduler.nodes) > 1:
+                self.metrics.observe_node_switch(node_url)
+            logger.debug('Retry %d of %s on another node after %s' % (
+                retries, endpoint,
+                error.__class__.__name__ if error else response.status))
+            time.sleep(backoff)
+
+    def exec_many(self, requests, concurrency=None):
+        """ Execute many independent requests concurrently.
+
+        Requests share the client's connection pools, so ``concurrency``
+        should not exceed ``maxsize`` by much.
+
+        .. code-block:: python
+
+           results = rpc.exec_many(
+               [('chain', 'get_block', {'block_num_or_id': n})
+                for n in range(1, 101)], concurrency=10)
+           failed = [r for r in results if isinstance(r, Exception)]
+
+        Args:
+            requests (iterable): ``(api, endpoint, body)`` tuples, or dicts
+                with the keyword arguments of :meth:`exec`.
+            concurrency (int): Requests in flight at once, ``maxsize`` by default.
+
+        Returns:
+            list: One entry per request, in input order: the parsed response,
+            or the exception raised by that request. A failing request does
+            not cancel the others.
+        """
 
-            # try switching nodes before giving up
-            time.sleep(_ret_cnt)
-            self.next_node()
-            logging.debug('Switched node to %s due to exception: %s' %
-                          (self.hostname, e.__class__.__name__))
-            return self.exec(api, endpoint, body, _ret_cnt=_ret_cnt + 1)
-        except Exception as e:
-            extra = dict(err=e, url=url, body=body, method=method)
-            logger.info('Request error', extra=extra)
-            raise e
+        def run(request):
+            if isinstance(request, dict):
+                return self.exec(**request)
+            return self.exec(*request)
 
+        return self.map(run, requests, concurrency)
+
+    def map(self, fn, items, concurrency=None):
+        """ Apply ``fn`` to every item with bounded parallelism.
+
+        Returns what ``fn`` returned or the exception it raised, one entry
+        per item, in input order.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        workers = min(concurrency or self.maxsize, len(items))
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix='eosapi-batch') as executor:
+            futures = [executor.submit(fn, item) for item in items]
+
+        results = []
+        for future in futures:
+            error = future.exception()
+            results.append(future.result() if error is None else error)
+        return results
+
+    def _timeout(self, expires):
+        """ Per attempt timeout, clamped to what is left of the deadline. """
+        remaining = max(expires - time.monotonic(), 0.001)
+        return urllib3.Timeout(
+            connect=min(self.connect_timeout, remaining),
+            read=min(self.read_timeout, remaining))
+
+    @staticmethod
+    def _unsent(error):
+        """ True if the request never made it to the node. """
+        return isinstance(error, MaxRetryError) and \
+            isinstance(error.reason, (NewConnectionError, ConnectTimeoutError))
+
+    def _urlopen(self, node_url, method, path, body, expires=None):
+        """ Issue a single request against a node, score the node and
+        record the request metrics. """
+        endpoint = path.rpartition('/')[2]
+        expires = expires or time.monotonic() + self.deadline
+        try:
+            if self.rate_limiter:
+                self.rate_limiter.acquire(node_url, expires)
+        except Exception:
+            self.scheduler.release(node_url)
+            raise
+
+        outcome, retry_after = FAILED, None
+        start = time.monotonic()
+        try:
+            response = self.http.urlopen(
+                method, node_url + path, body=body,
+                timeout=self._timeout(expires))
+        except NETWORK_ERRORS as e:
+            self.scheduler.record_failure(node_url)
+            self.metrics.observe_error(node_url, endpoint, e)
+            if self._timed_out(e):
+                outcome = THROTTLED
+            raise
+        except Exception:
+            self.scheduler.release(node_url)
+            raise
         else:
-            return self._return(
-                response=response,
-                body=body)
+            latency = time.monotonic() - start
+            if response.status in RETRY_STATUSES:
+                self.scheduler.record_failure(node_url)
+            else:
+                self.scheduler.record_success(node_url, latency)
+            self.metrics.observe_request(
+                node_url, endpoint, latency, response.status,
+                len(body) if body else 0, len(response.data))
+
+            if response.status in THROTTLE_STATUSES:
+                outcome, retry_after = THROTTLED, self._retry_after(response)
+            else:
+                outcome = SUCCESS
+            return response
+        finally:
+            if self.rate_limiter:
+                self.rate_limiter.release(node_url, outcome, retry_after)
+
+    @staticmethod
+    def _timed_out(error):
+        return isinstance(error, ReadTimeoutError) or \
+            isinstance(getattr(error, 'reason', None), ReadTimeoutError)
 
     @staticmethod
-    def _return(response=None, body=None):
+    def _retry_after(response):
+        """ Seconds from a ``Retry-After`` header, if it holds any. """
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def _hedged_urlopen(self, node_url, method, path, body, failed, expires):
+        """ Race the request against a second node if the first one is slow.
+
+        The hedge is only sent once the first node has been silent for
+        ``hedging.delay()`` seconds. The first response to arrive wins; the
+        loser still completes in the background and feeds the scheduler.
+        """
+
+        def attempt(url):
+            start = time.monotonic()
+            response = self._urlopen(url, method, path, body, expires)
+            self.hedging.observe(time.monotonic() - start)
+            return response
+
+        executor = self._executor()
+        primary = executor.submit(attempt, node_url)
+        attempts = {primary: node_url}
+
+        done, _ = wait([primary], timeout=self.hedging.delay())
+        if not done:
+            hedge_url = self.scheduler.select(exclude=[node_url] + failed)
+            if hedge_url == node_url:
+                self.scheduler.release(hedge_url)
+            else:
+                attempts[executor.submit(attempt, hedge_url)] = hedge_url
+
+        error = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except NETWORK_ERRORS as e:
+                    failed.append(attempts[future])
+                    error = error or e
+                    continue
+                self.hedging.record(
+                    fired=len(attempts) > 1, won=future is not primary)
+                return response
+
+        self.hedging.record(fired=len(attempts) > 1, won=False)
+        raise error
+
+    def _broadcast(self, method, path, body, endpoint, expires):
+        """ Push to several nodes at once and return with the first that
+        accepts.
+
+        A node that already has the transaction answers with a duplicate
+        error, which only counts as failure if no node accepts. If every
+        answer is a duplicate, the transaction is known to the chain and its
+        id is returned. Nodes answering after the first are still recorded.
+        """
+        nodes = [self._select_node()]
+        for _ in range(self.broadcasting.width(len(self.scheduler.nodes)) - 1):
+            node_url = self.scheduler.select(exclude=nodes)
+            if node_url in nodes:
+                self.scheduler.release(node_url)
+                break
+            nodes.append(node_url)
+
+        executor = self._executor()
+        start = time.monotonic()
+        attempts = {executor.submit(self._urlopen, node_url, method, path,
+                                    body, expires): node_url
+                    for node_url in nodes}
+        self.broadcasting.started()
+
+        def outcome(future):
+            try:
+                response = future.result()
+            except NETWORK_ERRORS:
+                return REJECTED, None
+            if 200 <= response.status < 300:
+                return ACCEPTED, response
+            try:
+                duplicate = is_duplicate(self.codec.loads(response.data))
+            except ValueError:
+                duplicate = False
+            return DUPLICATE if duplicate else REJECTED, response
+
+        def late(future):
+            self.broadcasting.record(attempts[future], outcome(future)[0])
+
+        duplicate = rejected = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            done = list(done)
+            for i, future in enumerate(done):
+                node_url = attempts[future]
+                result, response = outcome(future)
+                self.broadcasting.record(node_url, result)
+                if result == ACCEPTED:
+                    self.broadcasting.acknowledged(
+                        node_url, time.monotonic() - start)
+                    # answers that came in together are recorded right away
+                    for other in done[i + 1:] + list(pending):
+                        other.add_done_callback(late)
+                    return self._return(
+                        response=response, body=body, endpoint=endpoint)
+                if result == DUPLICATE:
+                    duplicate = duplicate or (
+                        node_url, time.monotonic() - start)
+                elif rejected is None or (rejected.exception() and
+                                          response is not None):
+                    # a node's own answer says more than a network error
+                    rejected = future
+
+        if duplicate:
+            self.broadcasting.acknowledged(*duplicate)
+            try:
+                trx_id = transaction_id(self.codec.loads(body))
+            except (KeyError, TypeError, ValueError):
+                trx_id = None
+            return dict(transaction_id=trx_id, processed=None, duplicate=True)
+        error = rejected.exception()
+        if error:
+            raise error
+        return self._return(
+            response=rejected.result(), body=body, endpoint=endpoint)
+
+    def _executor(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.pool_workers,
+                        thread_name_prefix='eosapi')
+        return self._pool
+
+    def metrics_snapshot(self):
+        """ Latency histograms, byte, status, retry and failover counts. """
+        return self.metrics.snapshot()
+
+    def prometheus_metrics(self):
+        """ :meth:`metrics_snapshot` in Prometheus text exposition format. """
+        return self.metrics.prometheus()
+
+    def rate_limit_stats(self):
+        """ Current rate and concurrency limits of every node. """
+        return self.rate_limiter.stats() if self.rate_limiter else None
+
+    def coalesce_stats(self):
+        """ Requests saved by coalescing identical concurrent calls. """
+        return self.single_flight.stats() if self.single_flight else None
+
+    def hedge_stats(self):
+        """ How often hedged reads fire and how often the hedge wins. """
+        return self.hedging.stats() if self.hedging else None
+
+    def broadcast_stats(self):
+        """ Which nodes acknowledge broadcast pushes first, and how fast. """
+        return self.broadcasting.stats() if self.broadcasting else None
+
+    def _return(self, response=None, body=None, endpoint=None):
         """ Process the response status code and body (json).
 
-        Note:
-            If re_raise flag is set, this method will raise an
-            exception instead of returning None.
+        The body is parsed straight from the response bytes by the client's
+        JSON codec; it is only decoded to text when it has to be reported.
 
         Exceptions:
             EosdNoResponse on no response.
-            HttpAPIError on non-200 response.
+            HttpAPIError on non-2xx response.
 
         Returns:
             Parsed response body.
@@ -154,31 +639,40 @@ class HttpClient(object):
             raise EosdNoResponse(
                 'eosd nodes have failed to respond, all retries exhausted.')
 
-        result = response.data.decode('utf-8')
-        if response.status != 200 or not result:
+        data = response.data
+        # nodes answer pushes with 202 Accepted
+        if not 200 <= response.status < 300 or not data:
+            result = data.decode('utf-8', errors='replace')
             extra = dict(result=result, response=response, request_body=body)
             logger.info('non ok response: %s',
                         response.status,
                         extra=extra)
+            if response.status in THROTTLE_STATUSES:
+                raise ThrottledAPIError(
+                    response.status, result,
+                    retry_after=self._retry_after(response))
             raise HttpAPIError(response.status, result)
 
+        start = time.perf_counter()
         try:
-            response_json = json.loads(result)
-        except JSONDecodeError as e:
+            result = self.codec.loads(data)
+        except ValueError as e:
             extra = dict(response=response, request_body=body, err=e)
             logger.info('failed to parse response', extra=extra)
-        else:
-            result = response_json
+            result = data.decode('utf-8', errors='replace')
+        self.metrics.observe_decode(endpoint, time.perf_counter() - start)
 
         return result
 
-    @staticmethod
-    def _body(body):
-        if type(body) not in [str, dict, type(None)]:
+    def _body(self, body):
+        """ Serialize a request body straight to bytes. """
+        if type(body) not in [bytes, str, dict, list, type(None)]:
             raise ValueError(
                 'Request body is of an invalid type %s' % type(body))
-        if type(body) == dict:
-            return json.dumps(body)
+        if type(body) in (dict, list):
+            return self.codec.dumps(body)
+        if type(body) == str:
+            return body.encode('utf-8')
         return body
 
     @staticmethod
@@ -0,0 +1,201 @@
+# coding=utf-8
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DECODE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+
+class Histogram(object):
+    """ Fixed bucket histogram, cumulative only when exported. """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def as_dict(self):
+        return dict(
+            count=self.count,
+            sum=self.sum,
+            buckets={'+Inf' if bound == float('inf') else bound: total
+                     for bound, total in self.cumulative()},
+        )
+
+
+class _EndpointMetrics(object):
+    __slots__ = ('latency', 'decode', 'request_bytes', 'response_bytes',
+                 'statuses', 'errors', 'retries')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.decode = Histogram(DECODE_BUCKETS)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.retries = 0
+
+
+class Metrics(object):
+    """ In-process client metrics.
+
+    Tracks latency histograms per node and per endpoint, request and
+    response bytes, HTTP status counts, network errors, retries, node
+    switches and JSON decode time. Read them with :meth:`snapshot` or
+    :meth:`prometheus`; nothing is pushed anywhere.
+
+    Recording is a lock plus a handful of integer updates, which is noise
+    next to the HTTP round trip it measures.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self._endpoints = defaultdict(_EndpointMetrics)
+        self._node_errors = defaultdict(int)
+        self._node_switches = defaultdict(int)
+
+    def observe_request(self, node_url, endpoint, latency, status,
+                        request_bytes, response_bytes):
+        with self._lock:
+            self._nodes[node_url].observe(latency)
+            metrics = self._endpoints[endpoint]
+            metrics.latency.observe(latency)
+            metrics.statuses[status] += 1
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+
+    def observe_error(self, node_url, endpoint, error):
+        name = error.__class__.__name__
+        with self._lock:
+            self._endpoints[endpoint].errors[name] += 1
+            self._node_errors[node_url] += 1
+
+    def observe_retry(self, endpoint):
+        with self._lock:
+            self._endpoints[endpoint].retries += 1
+
+    def observe_node_switch(self, node_url):
+        """ Traffic moved away from ``node_url``. """
+        with self._lock:
+            self._node_switches[node_url] += 1
+
+    def observe_decode(self, endpoint, seconds):
+        with self._lock:
+            self._endpoints[endpoint].decode.observe(seconds)
+
+    def snapshot(self):
+        """ All metrics as a plain dict. """
+        with self._lock:
+            urls = set(self._nodes) | set(self._node_errors) | \
+                set(self._node_switches)
+            return dict(
+                nodes={url: dict(latency=self._nodes[url].as_dict(),
+                                 errors=self._node_errors[url],
+                                 switched_away=self._node_switches[url])
+                       for url in urls},
+                endpoints={name: dict(latency=m.latency.as_dict(),
+                                      decode=m.decode.as_dict(),
+                                      request_bytes=m.request_bytes,
+                                      response_bytes=m.response_bytes,
+                                      statuses=dict(m.statuses),
+                                      errors=dict(m.errors),
+                                      retries=m.retries)
+                           for name, m in self._endpoints.items()},
+                node_switches=sum(self._node_switches.values()),
+            )
+
+    def prometheus(self, prefix='eosapi'):
+        """ All metrics in the Prometheus text exposition format. """
+        lines = []
+
+        def family(name, kind, doc):
+            lines.append(f'# HELP {prefix}_{name} {doc}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+
+        def sample(name, labels, value):
+            lines.append(f'{prefix}_{name}{{{_labels(labels)}}} {value}')
+
+        def histogram(name, labels, hist):
+            for bound, total in hist.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                sample(f'{name}_bucket', labels + [('le', le)], total)
+            sample(f'{name}_sum', labels, hist.sum)
+            sample(f'{name}_count', labels, hist.count)
+
+        with self._lock:
+            nodes = sorted(self._nodes.items())
+            endpoints = sorted(self._endpoints.items())
+
+            family('node_request_duration_seconds', 'histogram',
+                   'Request latency per node.')
+            for url, hist in nodes:
+                histogram('node_request_duration_seconds', [('node', url)], hist)
+
+            family('request_duration_seconds', 'histogram',
+                   'Request latency per endpoint.')
+            for name, m in endpoints:
+                histogram('request_duration_seconds', [('endpoint', name)], m.latency)
+
+            family('decode_duration_seconds', 'histogram',
+                   'JSON decode time per endpoint.')
+            for name, m in endpoints:
+                histogram('decode_duration_seconds', [('endpoint', name)], m.decode)
+
+            family('request_bytes_total', 'counter', 'Request body bytes sent.')
+            for name, m in endpoints:
+                sample('request_bytes_total', [('endpoint', name)], m.request_bytes)
+
+            family('response_bytes_total', 'counter', 'Response body bytes received.')
+            for name, m in endpoints:
+                sample('response_bytes_total', [('endpoint', name)], m.response_bytes)
+
+            family('responses_total', 'counter', 'Responses by HTTP status.')
+            for name, m in endpoints:
+                for status, count in sorted(m.statuses.items()):
+                    sample('responses_total',
+                           [('endpoint', name), ('status', status)], count)
+
+            family('errors_total', 'counter', 'Requests that got no response.')
+            for name, m in endpoints:
+                for error, count in sorted(m.errors.items()):
+                    sample('errors_total',
+                           [('endpoint', name), ('error', error)], count)
+
+            family('node_errors_total', 'counter',
+                   'Requests per node that got no response.')
+            for url, count in sorted(self._node_errors.items()):
+                sample('node_errors_total', [('node', url)], count)
+
+            family('retries_total', 'counter', 'Retried requests.')
+            for name, m in endpoints:
+                sample('retries_total', [('endpoint', name)], m.retries)
+
+            family('node_switches_total', 'counter',
+                   'Times traffic was moved away from a node.')
+            for url, count in sorted(self._node_switches.items()):
+                sample('node_switches_total', [('node', url)], count)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    return ','.join('%s="%s"' % (key, str(value).replace('\\', '\\\\')
+                                 .replace('"', '\\"').replace('\n', '\\n'))
+                    for key, value in labels)
@@ -0,0 +1,188 @@
+# coding=utf-8
+import logging
+import threading
+import time
+
+from eosapi.httpapi.exceptions import RateLimitTimeout
+
+logger = logging.getLogger(__name__)
+
+# Responses a node sends when it wants us to slow down.
+THROTTLE_STATUSES = frozenset([429, 503])
+
+SUCCESS = 'success'
+THROTTLED = 'throttled'
+FAILED = 'failed'
+
+
+class TokenBucket(object):
+    """ Classic token bucket: ``rate`` requests per second, bursts of ``burst``. """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self.tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, expires):
+        """ Take a token, waiting for one until ``expires`` at the latest. """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > expires:
+                return False
+            time.sleep(wait)
+
+
+class AIMDLimiter(object):
+    """ Adaptive concurrency limit, additive increase / multiplicative decrease.
+
+    Every successful request raises the limit by ``increase / limit``, so a
+    full window of successes adds ``increase``. A throttled request cuts it by
+    ``backoff``, at most once per ``decrease_interval`` so that one burst of
+    rejections only counts once.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=64, increase=1.0,
+                 backoff=0.5, decrease_interval=1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.backoff = backoff
+        self.decrease_interval = decrease_interval
+        self.in_flight = 0
+
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, expires):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self, outcome):
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == SUCCESS:
+                self.limit = min(self.maximum,
+                                 self.limit + self.increase / self.limit)
+            elif outcome == THROTTLED:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_interval:
+                    self._last_decrease = now
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+            self._cond.notify()
+
+
+class NodeLimiter(object):
+    """ Rate and concurrency limits of a single node. """
+
+    def __init__(self, bucket=None, concurrency=None):
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def acquire(self, expires):
+        start = time.monotonic()
+        if self.blocked_until > start:
+            if self.blocked_until > expires:
+                return False
+            time.sleep(self.blocked_until - start)
+        if self.bucket and not self.bucket.acquire(expires):
+            return False
+        if self.concurrency and not self.concurrency.acquire(expires):
+            return False
+        self.waited += time.monotonic() - start
+        return True
+
+    def release(self, outcome, retry_after=None):
+        if outcome == THROTTLED:
+            self.throttled += 1
+            if retry_after:
+                self.blocked_until = max(
+                    self.blocked_until, time.monotonic() + retry_after)
+        if self.concurrency:
+            self.concurrency.release(outcome)
+
+    def stats(self):
+        return dict(
+            rate=self.bucket.rate if self.bucket else None,
+            concurrency_limit=self.concurrency.limit if self.concurrency else None,
+            in_flight=self.concurrency.in_flight if self.concurrency else None,
+            throttled=self.throttled,
+            waited=self.waited,
+            blocked_for=max(0.0, self.blocked_until - time.monotonic()),
+        )
+
+
+class RateLimiter(object):
+    """ Per node token bucket and adaptive concurrency limits.
+
+    Args:
+        rate (float): Requests per second allowed per node, None for no cap.
+        burst (int): Token bucket size, defaults to one second of ``rate``.
+        adaptive (bool): Enable the AIMD concurrency limit.
+        initial_concurrency (int): Starting concurrency limit per node.
+        max_concurrency (int): Ceiling of the adaptive limit.
+    """
+
+    def __init__(self, rate=None, burst=None, adaptive=True,
+                 initial_concurrency=4, max_concurrency=64):
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+
+        self._lock = threading.Lock()
+        self._nodes = {}
+
+    def node(self, node_url):
+        limiter = self._nodes.get(node_url)
+        if limiter is None:
+            with self._lock:
+                limiter = self._nodes.get(node_url)
+                if limiter is None:
+                    limiter = self._nodes[node_url] = NodeLimiter(
+                        bucket=TokenBucket(self.rate, self.burst)
+                        if self.rate else None,
+                        concurrency=AIMDLimiter(
+                            initial=self.initial_concurrency,
+                            maximum=self.max_concurrency)
+                        if self.adaptive else None)
+        return limiter
+
+    def acquire(self, node_url, expires):
+        """ Wait for capacity on a node, until ``expires`` at the latest.
+
+        Raises:
+            RateLimitTimeout: The node had no capacity before the deadline.
+        """
+        if not self.node(node_url).acquire(expires):
+            raise RateLimitTimeout(
+                'No capacity on %s before the deadline' % node_url)
+
+    def release(self, node_url, outcome, retry_after=None):
+        if outcome == THROTTLED:
+            logger.debug('Node %s is throttling us', node_url)
+        self.node(node_url).release(outcome, retry_after)
+
+    def stats(self):
+        with self._lock:
+            return {url: limiter.stats() for url, limiter in self._nodes.items()}
@@ -0,0 +1,109 @@
+# coding=utf-8
+import random
+import threading
+import time
+
+IDEMPOTENT = 'idempotent'
+NON_IDEMPOTENT = 'non_idempotent'
+
+# Everything not listed here only reads chain state and is safe to replay.
+ENDPOINT_CLASSES = {
+    'push_block': NON_IDEMPOTENT,
+    'push_transaction': NON_IDEMPOTENT,
+    'push_transactions': NON_IDEMPOTENT,
+}
+
+# Answers after which a read may be retried: throttling, and gateway
+# errors in front of a node that may itself be fine.
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+# A 429 is sent before the request is processed, so even writes may retry.
+SAFE_RETRY_STATUSES = frozenset([429])
+
+
+def idempotency_class(endpoint):
+    return ENDPOINT_CLASSES.get(endpoint, IDEMPOTENT)
+
+
+def is_idempotent(endpoint):
+    return idempotency_class(endpoint) == IDEMPOTENT
+
+
+class RetryPolicy(object):
+    """ Exponential backoff with full jitter.
+
+    Args:
+        max_retries (int): Retries allowed per call, on top of the first attempt.
+        base_delay (float): Backoff ceiling of the first retry, in seconds.
+        max_delay (float): Upper bound of any single backoff, in seconds.
+    """
+
+    def __init__(self, max_retries=10, base_delay=0.1, max_delay=5.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, retry):
+        """ Seconds to sleep before the given (1-based) retry. """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return random.uniform(0, ceiling)
+
+
+class RetryBudget(object):
+    """ Caps retries to a share of the recent request volume.
+
+    Over the last ``ttl`` seconds at most ``ratio`` retries are allowed per
+    request, plus ``min_retries_per_sec`` so that a quiet client can still
+    recover from an isolated failure. When a node browns out, this keeps
+    every caller from multiplying the load on the remaining nodes.
+
+    Args:
+        ratio (float): Retries allowed per request.
+        min_retries_per_sec (float): Retries always allowed, regardless of volume.
+        ttl (int): Length of the sliding window, in seconds.
+    """
+
+    def __init__(self, ratio=0.2, min_retries_per_sec=10, ttl=10):
+        self.ratio = ratio
+        self.min_retries_per_sec = min_retries_per_sec
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._requests = [0] * ttl
+        self._retries = [0] * ttl
+        self._second = int(time.monotonic())
+        self.rejected = 0
+
+    def _advance(self):
+        now = int(time.monotonic())
+        for second in range(self._second + 1, min(now, self._second + self.ttl) + 1):
+            self._requests[second % self.ttl] = 0
+            self._retries[second % self.ttl] = 0
+        self._second = max(self._second, now)
+
+    def deposit(self):
+        """ Account a new (first attempt) request. """
+        with self._lock:
+            self._advance()
+            self._requests[self._second % self.ttl] += 1
+
+    def withdraw(self):
+        """ Ask for permission to retry. Returns False if the budget is spent. """
+        with self._lock:
+            self._advance()
+            allowed = self.min_retries_per_sec * self.ttl + \
+                self.ratio * sum(self._requests)
+            if sum(self._retries) >= allowed:
+                self.rejected += 1
+                return False
+            self._retries[self._second % self.ttl] += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            self._advance()
+            return dict(
+                requests=sum(self._requests),
+                retries=sum(self._retries),
+                rejected=self.rejected,
+            )
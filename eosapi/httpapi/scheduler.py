@@ -0,0 +1,226 @@
+# coding=utf-8
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class NodeStats(object):
+    """ Live health record of a single node. """
+
+    def __init__(self, url):
+        self.url = url
+        self.latency = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_sample = 0.0
+        self.state = CLOSED
+        self.ejected_until = 0.0
+        self.probing = False
+
+    def as_dict(self, score, now):
+        return dict(
+            latency=self.latency,
+            error_rate=self.error_rate,
+            in_flight=self.in_flight,
+            requests=self.requests,
+            failures=self.failures,
+            state=self.state,
+            ejected_for=max(0.0, self.ejected_until - now),
+            score=score,
+        )
+
+
+class NodeScheduler(object):
+    """ Latency aware node selection with a per node circuit breaker.
+
+    Every request goes to the node with the lowest score, where the score is
+    the EWMA latency of the node, scaled up by the requests it currently has
+    in flight and by its EWMA error rate. Nodes without recent samples score
+    zero, so they are tried again instead of starving forever.
+
+    After ``failure_threshold`` consecutive failures a node is ejected for
+    ``cooldown`` seconds. Once the cooldown is over the node is probed with
+    ``probe(url)`` in the background and re-admitted only if the probe
+    succeeds. Without a probe the node is half-open: the next request it gets
+    decides whether it is re-admitted.
+
+    Args:
+        nodes (list): Node URLs.
+        probe (callable): ``probe(url) -> bool`` health check.
+        alpha (float): EWMA smoothing factor, 0 < alpha <= 1.
+        error_penalty (float): Score multiplier applied per unit of error rate.
+        failure_threshold (int): Consecutive failures that eject a node.
+        cooldown (float): Seconds an ejected node stays out of rotation.
+        stale_after (float): Seconds after which a node's samples are
+            considered outdated and the node is re-explored.
+    """
+
+    def __init__(self, nodes, probe=None, alpha=0.3, error_penalty=10.0,
+                 failure_threshold=3, cooldown=30.0, stale_after=10.0):
+        self.probe = probe
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.stale_after = stale_after
+
+        self._lock = threading.Lock()
+        self._nodes = {}
+        for url in nodes:
+            self.add_node(url)
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+    def add_node(self, url):
+        with self._lock:
+            if url not in self._nodes:
+                self._nodes[url] = NodeStats(url)
+
+    def _score(self, node, now):
+        if node.latency is None or now - node.last_sample > self.stale_after:
+            latency = 0.0
+        else:
+            latency = node.latency
+        return latency * (1 + node.in_flight) * \
+            (1 + self.error_penalty * node.error_rate)
+
+    def _admissible(self, node, now):
+        if node.state == CLOSED:
+            return True
+        if now < node.ejected_until:
+            return False
+        if self.probe is None:
+            if node.state == OPEN:
+                node.state = HALF_OPEN
+            # let a single trial request through
+            return node.in_flight == 0
+        if not node.probing:
+            node.probing = True
+            threading.Thread(
+                target=self._probe, args=(node,), daemon=True).start()
+        return False
+
+    def _probe(self, node):
+        try:
+            healthy = self.probe(node.url)
+        except Exception:
+            healthy = False
+
+        with self._lock:
+            node.probing = False
+            if healthy:
+                logger.info('Re-admitting node %s', node.url)
+                self._close(node)
+            else:
+                node.ejected_until = time.monotonic() + self.cooldown
+
+    def _pick(self, exclude):
+        now = time.monotonic()
+        candidates = [n for n in self._nodes.values()
+                      if n.url not in exclude and self._admissible(n, now)]
+        if candidates:
+            return min(candidates, key=lambda n: self._score(n, now))
+
+        # everything is ejected; use whichever node comes back first
+        pool = [n for n in self._nodes.values()
+                if n.url not in exclude] or list(self._nodes.values())
+        return min(pool, key=lambda n: n.ejected_until)
+
+    def peek(self, exclude=()):
+        """ Return the node :meth:`select` would pick, without using it. """
+        with self._lock:
+            return self._pick(exclude).url
+
+    def select(self, exclude=()):
+        """ Pick the best scoring node and account a request to it.
+
+        Every call must be paired with :meth:`record_success`,
+        :meth:`record_failure` or :meth:`release`.
+
+        Args:
+            exclude (iterable): Node URLs to avoid, unless nothing else is left.
+        """
+        with self._lock:
+            node = self._pick(exclude)
+            node.in_flight += 1
+            return node.url
+
+    def acquire(self, url):
+        """ Account a request to a specific node, bypassing selection. """
+        with self._lock:
+            node = self._nodes.get(url)
+            if node is None:
+                node = self._nodes[url] = NodeStats(url)
+            node.in_flight += 1
+            return url
+
+    def release(self, url):
+        """ Finish a request without judging the node. """
+        with self._lock:
+            self._nodes[url].in_flight -= 1
+
+    def record_success(self, url, latency):
+        with self._lock:
+            node = self._nodes[url]
+            node.in_flight -= 1
+            node.requests += 1
+            node.consecutive_failures = 0
+            node.last_sample = time.monotonic()
+            node.latency = latency if node.latency is None else \
+                self.alpha * latency + (1 - self.alpha) * node.latency
+            node.error_rate *= 1 - self.alpha
+            if node.state != CLOSED:
+                self._close(node)
+
+    def record_failure(self, url):
+        with self._lock:
+            node = self._nodes[url]
+            node.in_flight -= 1
+            node.requests += 1
+            node.failures += 1
+            node.consecutive_failures += 1
+            node.last_sample = time.monotonic()
+            node.error_rate = self.alpha + (1 - self.alpha) * node.error_rate
+            if node.state == HALF_OPEN or \
+                    node.consecutive_failures >= self.failure_threshold:
+                self._open(node)
+
+    def eject(self, url):
+        """ Take a node out of rotation for one cooldown period. """
+        with self._lock:
+            self._open(self._nodes[url])
+
+    def _open(self, node):
+        if node.state != OPEN:
+            logger.info('Ejecting node %s for %ss', node.url, self.cooldown)
+        node.state = OPEN
+        node.ejected_until = time.monotonic() + self.cooldown
+
+    @staticmethod
+    def _close(node):
+        node.state = CLOSED
+        node.ejected_until = 0.0
+        node.consecutive_failures = 0
+        node.error_rate = 0.0
+
+    def scores(self):
+        """ Snapshot of the per node statistics, keyed by node URL.
+
+        Lower scores win; ``state`` tells whether the circuit breaker
+        currently keeps the node out of rotation.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {url: node.as_dict(self._score(node, now), now)
+                    for url, node in self._nodes.items()}
@@ -0,0 +1,85 @@
+# coding=utf-8
+import threading
+from collections import defaultdict
+
+# Reads that many threads tend to issue at the same moment.
+COALESCE_ENDPOINTS = frozenset([
+    'get_info',
+    'get_account',
+    'get_currency_balance',
+    'get_code_hash',
+    'get_abi',
+])
+
+
+class _Call(object):
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """ Collapses identical concurrent calls into one.
+
+    While a call for a key is in flight, further calls with the same key wait
+    for it and receive its result (or its exception) instead of issuing their
+    own request.
+
+    Args:
+        endpoints (iterable): Endpoints whose calls are coalesced.
+    """
+
+    def __init__(self, endpoints=COALESCE_ENDPOINTS):
+        self.endpoints = frozenset(endpoints)
+
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._saved = defaultdict(int)
+
+    def applies(self, endpoint):
+        return endpoint in self.endpoints
+
+    def do(self, key, fn):
+        """ Run ``fn()`` unless an identical call is already running.
+
+        Args:
+            key (tuple): ``(api, endpoint, body)`` identifying the call.
+            fn (callable): Issues the request.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._saved[key[1]] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """ Requests saved by coalescing, per endpoint. """
+        with self._lock:
+            return dict(
+                saved=sum(self._saved.values()),
+                in_flight=len(self._calls),
+                endpoints=dict(self._saved),
+            )
@@ -0,0 +1,430 @@
+# coding=utf-8
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from eosapi.httpapi.checkpoint import Checkpoint
+from eosapi.httpapi.exceptions import CheckpointMismatch, ForkTooDeep
+from eosapi.httpapi.metrics import Histogram
+from eosbase.abi import AbiError, parse_time
+
+logger = logging.getLogger(__name__)
+
+# Seconds between a block's timestamp and the moment it was yielded.
+PRODUCTION_LAG_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0,
+                          180.0, 600.0)
+
+MODES = {
+    'irreversible': 'last_irreversible_block_num',
+    'head': 'head_block_num',
+}
+
+# Doublings of ``poll_delay`` while polling an idle chain.
+MAX_BACKOFF_STEPS = 16
+
+APPLY = 'apply'
+UNDO = 'undo'
+
+BlockEvent = namedtuple('BlockEvent', 'action block')
+
+
+class BlockStream(object):
+    """ Iterator over blocks, in order, fetched ahead of the consumer.
+
+    Up to ``prefetch`` ``get_block`` calls are kept in flight, spread over
+    the client's nodes by its scheduler; each finished call starts the next
+    one. Fetched blocks wait in a window of at most ``buffer`` blocks; once
+    it is full nothing more is requested until the consumer catches up, so
+    a slow consumer holds back the stream instead of growing memory.
+
+    If fetching a block fails, iteration raises that exception. Iterating
+    again retries the same block, nothing is skipped.
+
+    Once it has caught up, the stream polls ``get_info`` just after the next
+    block is due, going by ``head_block_time`` and ``block_interval``. The
+    difference between the node's clock and ours is learned from the
+    responses, so a skewed clock does not throw the schedule off. Polls that
+    find nothing new back off, up to ``max_poll_interval``, which only
+    happens when the chain stalls.
+
+    With a ``checkpoint`` the stream resumes after the checkpointed block
+    when no ``start_block`` is given, and raises
+    :class:`CheckpointMismatch` if the first block does not link to it. A
+    block counts as processed once the next one is requested, or when
+    :meth:`ack` is called; :meth:`close` writes out the checkpoint.
+
+    .. code-block:: python
+
+       with client.stream_blocks(checkpoint='blocks.ckpt') as blocks:
+           for block in blocks:
+               process(block)
+
+    Args:
+        client (Client): Client the blocks are fetched with.
+        start_block (int): First block to yield. Head (or last irreversible)
+            block if None.
+        mode (str): ``irreversible`` or ``head``.
+        prefetch (int): ``get_block`` calls in flight at once.
+        buffer (int): Blocks fetched ahead of the consumer, ``prefetch`` at
+            least.
+        block_interval (float): Seconds between blocks.
+        poll_delay (float): Seconds to poll after a block is due.
+        max_poll_interval (float): Longest wait between polls of an idle chain.
+        checkpoint (Checkpoint): Where processed blocks are recorded, a
+            :class:`Checkpoint` or the path of its file.
+        fetch (callable): Fetches a block by number, ``client.get_block``
+            if None.
+    """
+
+    def __init__(self, client, start_block=None, mode='irreversible',
+                 prefetch=16, buffer=None, block_interval=0.5,
+                 poll_delay=0.05, max_poll_interval=3.0, checkpoint=None,
+                 fetch=None):
+        if mode not in MODES:
+            raise ValueError('mode must be one of %s' % ', '.join(MODES))
+        self.client = client
+        self.fetch = fetch or client.get_block
+        self.mode = mode
+        self.prefetch = max(1, prefetch)
+        self.buffer = max(self.prefetch, buffer or self.prefetch)
+        self.block_interval = block_interval
+        self.poll_delay = poll_delay
+        self.max_poll_interval = max_poll_interval
+
+        self.polls = 0
+        self.empty_polls = 0
+        self.production_lag = Histogram(PRODUCTION_LAG_BUCKETS)
+        self.last_production_lag = None
+        self._head_time = None
+        self._clock_offset = None
+
+        if isinstance(checkpoint, str):
+            checkpoint = Checkpoint(checkpoint)
+        self.checkpoint = checkpoint
+        self._last = None
+        self._resume_from = None
+        if checkpoint and checkpoint.block_num and not start_block:
+            start_block = checkpoint.block_num + 1
+            self._resume_from = checkpoint.block_id
+
+        # convert block id to block number
+        if type(start_block) == str:
+            start_block = int(start_block[:8], base=16)
+        self.head = 0
+        if not start_block:
+            start_block = self._refresh_head()
+        self.next_block = start_block
+
+        self._window = deque()
+        self._lock = threading.RLock()
+        self._executor = None
+        self._closed = False
+        self._started = time.monotonic()
+        self.fetched = 0
+        self.yielded = 0
+        self.fetch_wait = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._closed:
+            raise StopIteration
+        self.ack()
+        if not self._window:
+            self._wait_for(self.next_block)
+        self._fill()
+
+        block_num, future = self._window[0]
+        start = time.monotonic()
+        try:
+            block = future.result()
+        except Exception:
+            # drop what was fetched ahead, so that the next call retries
+            self._cancel()
+            raise
+        finally:
+            self.fetch_wait += time.monotonic() - start
+
+        if self._resume_from is not None:
+            if block['previous'] != self._resume_from:
+                raise CheckpointMismatch(block_num - 1, self._resume_from,
+                                         block['previous'])
+            self._resume_from = None
+
+        with self._lock:
+            self._window.popleft()
+            self.next_block = block_num + 1
+            self.yielded += 1
+        self._fill()
+
+        produced = _timestamp(block.get('timestamp'))
+        if produced is not None:
+            self.last_production_lag = time.time() - produced
+            self.production_lag.observe(self.last_production_lag)
+        if self.checkpoint:
+            self._last = (block_num, block['id'])
+        return block
+
+    def ack(self):
+        """ Mark the last yielded block as processed. """
+        if self._last is not None:
+            self.checkpoint.mark(*self._last)
+            self._last = None
+
+    def _refresh_head(self):
+        info = self.client.get_info(cached=False)
+        received = time.time()
+        self.polls += 1
+
+        followed = info[MODES[self.mode]]
+        head_time = _timestamp(info.get('head_block_time'))
+        if head_time is not None:
+            # the last irreversible block trails head by a steady margin
+            self._head_time = head_time - \
+                (info['head_block_num'] - followed) * self.block_interval
+            offset = received - head_time
+            if self._clock_offset is None or offset < self._clock_offset:
+                self._clock_offset = offset
+
+        self.head = max(self.head, followed)
+        return self.head
+
+    def _due(self, block_num):
+        """ Local time at which ``block_num`` should be available. """
+        return self._head_time + self._clock_offset + \
+            (block_num - self.head) * self.block_interval
+
+    def _wait_for(self, block_num):
+        """ Block until ``block_num`` is at or below the followed head. """
+        overdue = 0
+        if self.checkpoint:
+            # nothing to process until the next block, a good time to write
+            self.checkpoint.flush()
+        while block_num > self.head:
+            scheduled = self._head_time is not None
+            if scheduled:
+                wait = self._due(block_num) - time.time()
+                if wait > 0:
+                    time.sleep(wait + self.poll_delay)
+
+            if block_num <= self._refresh_head():
+                # the block may have been there for a while, try earlier
+                if scheduled and not overdue:
+                    self._clock_offset -= self.poll_delay / 2
+                return
+            self.empty_polls += 1
+
+            if scheduled and not overdue:
+                # too early, the node publishes blocks later than we thought
+                self._clock_offset += self.poll_delay
+            # late block, or an idle chain; the delay stops doubling long
+            # before the exponent could overflow a float
+            overdue = min(overdue + 1, MAX_BACKOFF_STEPS)
+            time.sleep(min(self.max_poll_interval,
+                           self.poll_delay * 2 ** overdue))
+
+    def _fill(self):
+        """ Request blocks until the window or the in-flight limit is full. """
+        with self._lock:
+            if self._closed:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.prefetch,
+                    thread_name_prefix='eosapi-stream')
+
+            in_flight = sum(1 for _, f in self._window if not f.done())
+            next_num = self._window[-1][0] + 1 if self._window \
+                else self.next_block
+            submitted = []
+            while len(self._window) < self.buffer and \
+                    in_flight < self.prefetch and next_num <= self.head:
+                future = self._executor.submit(self._fetch, next_num)
+                self._window.append((next_num, future))
+                submitted.append(future)
+                next_num += 1
+                in_flight += 1
+
+        # outside the lock: a callback runs right away if the call is done
+        for future in submitted:
+            future.add_done_callback(self._fetched)
+
+    def _fetch(self, block_num):
+        return self.fetch(block_num)
+
+    def _fetched(self, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self.fetched += 1
+        self._fill()
+
+    def _cancel(self):
+        with self._lock:
+            while self._window:
+                self._window.pop()[1].cancel()
+
+    def close(self):
+        """ Drop prefetched blocks, stop the fetch threads and write out
+        the checkpoint. A closed stream yields no more blocks. """
+        if self.checkpoint:
+            self.checkpoint.flush()
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        self._cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        """ Fetch throughput and how far the consumer is behind. """
+        elapsed = time.monotonic() - self._started
+        with self._lock:
+            window = list(self._window)
+        done = sum(1 for _, future in window if future.done())
+        return dict(
+            next_block=self.next_block,
+            head=self.head,
+            lag=max(0, self.head - self.next_block + 1),
+            fetched=self.fetched,
+            yielded=self.yielded,
+            blocks_per_sec=self.fetched / elapsed if elapsed else 0.0,
+            buffered=done,
+            in_flight=len(window) - done,
+            fetch_wait=self.fetch_wait,
+            polls=self.polls,
+            empty_polls=self.empty_polls,
+            last_production_lag=self.last_production_lag,
+            production_lag=self.production_lag.as_dict(),
+        )
+
+
+class ForkAwareStream(object):
+    """ Head block stream that undoes blocks orphaned by a fork.
+
+    Yields :data:`BlockEvent` tuples. Every block is first applied; when a
+    fork replaces blocks that were already applied, they are undone, newest
+    first, before the blocks of the new branch are applied. Replaying the
+    events in order always leaves a consumer on a single linked chain.
+
+    Applied blocks are kept until they become irreversible, but never more
+    than ``window`` of them. A fork deeper than that raises
+    :class:`ForkTooDeep`.
+
+    .. code-block:: python
+
+       for action, block in client.stream_block_events():
+           if action == 'apply':
+               apply(block)
+           else:
+               revert(block)
+
+    Args:
+        client (Client): Client the blocks are fetched with.
+        start_block (int): First block to apply, head block if None.
+        window (int): Reversible blocks kept at most.
+
+    Further keyword arguments are passed on to :class:`BlockStream`.
+    """
+
+    def __init__(self, client, start_block=None, window=1024, **kwargs):
+        self.client = client
+        self.window = window
+        self.blocks = BlockStream(client, start_block=start_block,
+                                  mode='head', **kwargs)
+
+        self.forks = 0
+        self.undone = 0
+        self.deepest_fork = 0
+        self._applied = deque()
+        self._ids = {}
+        self._events = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._events:
+            self._link(next(self.blocks))
+        return self._events.popleft()
+
+    def _link(self, block):
+        if self._applied and block['previous'] != self._applied[-1]['id']:
+            self._switch(block)
+        else:
+            self._apply(block)
+        self._prune()
+
+    def _switch(self, block):
+        """ Undo up to the common ancestor of ``block``, then apply its branch. """
+        branch = [block]
+        while branch[0]['previous'] not in self._ids:
+            if branch[0]['block_num'] <= self._applied[0]['block_num']:
+                raise ForkTooDeep(
+                    'Block %s forks below the %d blocks kept to undo' % (
+                        block['id'], len(self._applied)))
+            branch.insert(0, self.client.get_block(branch[0]['previous']))
+
+        fork_point = self._ids[branch[0]['previous']]
+        depth = 0
+        while self._applied[-1]['block_num'] > fork_point:
+            undone = self._applied.pop()
+            del self._ids[undone['id']]
+            self._events.append(BlockEvent(UNDO, undone))
+            depth += 1
+
+        self.forks += 1
+        self.undone += depth
+        self.deepest_fork = max(self.deepest_fork, depth)
+        logger.info('Fork at block %d, undoing %d blocks', fork_point, depth)
+        for replacement in branch:
+            self._apply(replacement)
+
+    def _apply(self, block):
+        self._applied.append(block)
+        self._ids[block['id']] = block['block_num']
+        self._events.append(BlockEvent(APPLY, block))
+
+    def _prune(self):
+        """ Forget blocks that can not be undone any more. """
+        irreversible = getattr(self.client, 'last_irreversible_block_num', 0)
+        # the last block is kept as the link to the next one
+        while len(self._applied) > 1 and (
+                len(self._applied) > self.window or
+                self._applied[0]['block_num'] < irreversible):
+            del self._ids[self._applied.popleft()['id']]
+
+    def close(self):
+        self.blocks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        return dict(self.blocks.stats(),
+                    forks=self.forks,
+                    undone=self.undone,
+                    deepest_fork=self.deepest_fork,
+                    reversible=len(self._applied))
+
+
+def _timestamp(block_time):
+    """ Unix time of a block timestamp, e.g. ``2018-06-01T12:00:00.500``. """
+    if not block_time:
+        return None
+    try:
+        return parse_time(block_time) / 1e6
+    except AbiError:
+        return None
@@ -0,0 +1,203 @@
+# coding=utf-8
+import logging
+import queue
+import threading
+
+from eosbase.abi import name_to_int, symbol_code_to_int
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY = 2 ** 64
+
+_DONE = object()
+
+
+def key_to_int(value):
+    """ Primary key as an integer, ordered as the node orders rows; like
+    nodes, strings that are not numbers are taken as names, or as symbol
+    codes if they are upper case. """
+    if isinstance(value, int):
+        return value
+    value = str(value)
+    if value.isdigit():
+        return int(value)
+    if value.isupper():
+        return symbol_code_to_int(value)
+    return name_to_int(value)
+
+
+def _key_function(key):
+    if key is None or callable(key):
+        return key
+    return lambda row: key_to_int(row[key])
+
+
+class TableRows(object):
+    """ Iterator over all rows of a table, page by page.
+
+    Follows ``more`` until the table (or the key range) is exhausted. Pages
+    continue from ``next_key`` when the node returns it, and otherwise from
+    the primary key of the last row plus one, which is what ``key``
+    extracts.
+
+    The page size adapts: it doubles while pages come back full, up to
+    ``max_limit``, and drops to what the node managed to return when a node
+    cuts a page short, as nodes do when they run out of time for a call.
+
+    With ``partitions`` > 1 the primary key range is split into that many
+    ranges which are scanned concurrently, and so spread over the nodes.
+    Rows are still yielded in key order; ranges that are ahead wait, a few
+    pages at most, until the ones before them are consumed. Splitting a
+    range evenly only works as well as the keys are spread over it, so
+    give an ``upper_bound`` for small sequential keys.
+
+    Args:
+        client (Client): Client the rows are fetched with.
+        code (str): Contract account.
+        scope (str): Table scope.
+        table (str): Table name.
+        key (str): Row field holding the primary key, a number, a name or
+            a symbol code, or a function that returns the primary key of a row as integer.
+        lower_bound (int|str): Lowest primary key to return.
+        upper_bound (int|str): Primary key to stop before.
+        limit (int): Rows requested by the first page.
+        max_limit (int): Largest page requested.
+        partitions (int): Key ranges scanned concurrently.
+        table_key (str): ``table_key`` passed to the node.
+        json (bool): Ask the node to decode the rows.
+    """
+
+    def __init__(self, client, code, scope, table, key=None, lower_bound=None,
+                 upper_bound=None, limit=100, max_limit=2000, partitions=1,
+                 table_key='', json=True):
+        self.client = client
+        self.code = code
+        self.scope = scope
+        self.table = table
+        self.table_key = table_key
+        self.json = json
+        self.key = _key_function(key)
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.limit = limit
+        self.max_limit = max_limit
+        self.partitions = partitions
+        if partitions > 1 and self.key is None:
+            raise ValueError('Partitioned scans need the primary key of rows')
+
+        self.pages = 0
+        self.rows = 0
+        self._closed = False
+        self._rows = self._scan()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows)
+        self.rows += 1
+        return row
+
+    def _scan(self):
+        if self.partitions <= 1:
+            for rows in self._pages(self.lower_bound, self.upper_bound):
+                yield from rows
+            return
+
+        # one thread per range feeding a bounded queue, drained in order
+        ranges = self._ranges()
+        queues = [queue.Queue(maxsize=4) for _ in ranges]
+        threads = [threading.Thread(target=self._feed, args=(r, q),
+                                    name='eosapi-table-%d' % i, daemon=True)
+                   for i, (r, q) in enumerate(zip(ranges, queues))]
+        for thread in threads:
+            thread.start()
+        try:
+            for q in queues:
+                while True:
+                    rows = q.get()
+                    if rows is _DONE:
+                        break
+                    if isinstance(rows, Exception):
+                        raise rows
+                    yield from rows
+        finally:
+            self._closed = True
+            for q in queues:
+                # unblock feeders stuck on a full queue
+                while not q.empty():
+                    q.get_nowait()
+
+    def _ranges(self):
+        """ ``partitions`` adjacent ranges, fewer if there are fewer keys. """
+        lower = key_to_int(self.lower_bound or 0)
+        upper = key_to_int(self.upper_bound or MAX_KEY)
+        count = max(1, min(self.partitions, upper - lower))
+        step, extra = divmod(upper - lower, count)
+        bounds = [lower + i * step + min(i, extra) for i in range(count)]
+        return list(zip(bounds, bounds[1:] + [upper]))
+
+    def _feed(self, key_range, rows_queue):
+        lower, upper = key_range
+        try:
+            for rows in self._pages(lower, upper if upper < MAX_KEY else None):
+                # the node's upper bound may be inclusive, keep ranges apart
+                self._put(rows_queue, [row for row in rows
+                                       if self.key(row) < upper])
+            self._put(rows_queue, _DONE)
+        except Exception as e:
+            self._put(rows_queue, e)
+
+    def _put(self, rows_queue, item):
+        """ Queue ``item`` unless the consumer went away in the meantime. """
+        while not self._closed:
+            try:
+                rows_queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
+    def _pages(self, lower, upper):
+        """ Pages of rows from ``lower`` on, up to ``upper``. """
+        limit = self.limit
+        while not self._closed:
+            result = self.client.get_table_rows(
+                json=self.json, code=self.code, scope=self.scope,
+                table=self.table, table_key=self.table_key,
+                lower_bound='' if lower is None else str(lower),
+                upper_bound='' if upper is None else str(upper),
+                limit=limit)
+            self.pages += 1
+            rows = result.get('rows') or []
+            if rows:
+                yield rows
+            if not result.get('more'):
+                return
+
+            next_key = result.get('next_key')
+            if next_key not in (None, ''):
+                lower = next_key
+            elif rows and self.key is not None:
+                lower = self.key(rows[-1]) + 1
+            else:
+                raise ValueError('Can not page %s %s without the primary key '
+                                 'of rows' % (self.code, self.table))
+
+            if len(rows) >= limit:
+                limit = min(self.max_limit, limit * 2)
+            else:
+                # the node ran out of time, ask for what it can deliver
+                limit = max(1, len(rows))
+
+    def close(self):
+        self._closed = True
+        self._rows.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        return dict(pages=self.pages, rows=self.rows)
@@ -0,0 +1,323 @@
+# coding=utf-8
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from eosapi.httpapi.codec import get_codec
+
+logger = logging.getLogger(__name__)
+
+# segment number, offset and length of the compressed block, block id
+INDEX_ENTRY = struct.Struct('<IQI32s')
+EMPTY_ID = bytes(32)
+
+
+class _Mapped(object):
+    """ Read-only mmap of a file that keeps growing. """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._lock = threading.Lock()
+
+    def read(self, offset, length):
+        with self._lock:
+            return self._read(offset, offset + length)
+
+    def _read(self, offset, end):
+        if self._map is None or end > len(self._map):
+            size = os.path.getsize(self.path)
+            if end > size:
+                return None
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        return self._map[offset:end]
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+class BlockStore(object):
+    """ Local append-only archive of blocks.
+
+    Blocks are compressed and appended to segment files of about
+    ``segment_size`` bytes. A fixed size index entry per block number points
+    at the segment, offset and length of the block and holds its id, so a
+    lookup by number or by id (which starts with the block number) is a
+    single index read. Both are read through mmap.
+
+    Storing a block again is a no-op; storing a different block under a
+    known number appends it and repoints the index. The segments are never
+    rewritten. Only store irreversible blocks,
+    unless you do not mind a forked block being served.
+
+    .. code-block:: python
+
+       store = BlockStore('/data/blocks')
+       with client.stream_blocks(start_block=1) as blocks:
+           store.import_blocks(blocks, until=1000000)
+
+    Args:
+        path (str): Directory of the store, created if missing.
+        segment_size (int): Bytes after which a new segment is started.
+        compress_level (int): zlib compression level.
+        json_codec (str): JSON codec the blocks are encoded with.
+    """
+
+    def __init__(self, path, segment_size=256 * 1024 * 1024, compress_level=3,
+                 json_codec=None):
+        self.path = path
+        self.segment_size = segment_size
+        self.compress_level = compress_level
+        self.codec = get_codec(json_codec)
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._meta_path = os.path.join(path, 'store.json')
+        self.base = None
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.base = json.load(f)['base']
+
+        self._index_path = os.path.join(path, 'blocks.idx')
+        open(self._index_path, 'ab').close()
+        # unbuffered, so that an entry is never visible half written
+        self._index = open(self._index_path, 'r+b', buffering=0)
+        self._index_map = _Mapped(self._index_path)
+
+        self._segments = {}
+        self._segment = max(
+            [int(name[7:13]) for name in os.listdir(path)
+             if name.startswith('blocks-') and name.endswith('.seg')] or [0])
+        self._writer = open(self._segment_path(self._segment), 'ab')
+        self._recover()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, 'blocks-%06d.seg' % segment)
+
+    def _entry(self, block_num):
+        if self.base is None or block_num < self.base:
+            return None
+        data = self._index_map.read(
+            (block_num - self.base) * INDEX_ENTRY.size, INDEX_ENTRY.size)
+        if data is None:
+            return None
+        entry = INDEX_ENTRY.unpack(data)
+        return entry if entry[3] != EMPTY_ID else None
+
+    def get(self, block_num_or_id):
+        """ A stored block by number or id, None if it is not stored. """
+        block_id = None
+        if type(block_num_or_id) == str and len(block_num_or_id) == 64:
+            block_id = bytes.fromhex(block_num_or_id)
+            block_num = int(block_num_or_id[:8], base=16)
+        else:
+            block_num = int(block_num_or_id)
+
+        with self._lock:
+            entry = self._entry(block_num)
+        if entry is None or (block_id is not None and entry[3] != block_id):
+            self.misses += 1
+            return None
+        segment, offset, length, _ = entry
+        mapped = self._segments.get(segment)
+        if mapped is None:
+            mapped = self._segments.setdefault(
+                segment, _Mapped(self._segment_path(segment)))
+        data = mapped.read(offset, length)
+        if data is None:
+            # the index got ahead of a segment that was not fully written
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.codec.loads(zlib.decompress(data))
+
+    def __contains__(self, block_num_or_id):
+        if type(block_num_or_id) == str and len(block_num_or_id) == 64:
+            with self._lock:
+                entry = self._entry(int(block_num_or_id[:8], base=16))
+            return entry is not None and \
+                entry[3] == bytes.fromhex(block_num_or_id)
+        with self._lock:
+            return self._entry(int(block_num_or_id)) is not None
+
+    def put(self, block):
+        self.put_many([block])
+
+    def put_many(self, blocks):
+        """ Append blocks, with a single flush for all of them.
+
+        The blocks are written to the segment and flushed before the index
+        points at them, so the index never refers past what was written.
+        """
+        entries = []
+        for block in blocks:
+            # readers only wait for one block at a time
+            with self._lock:
+                entry = self._append(block)
+            if entry is not None:
+                entries.append(entry)
+        with self._lock:
+            self._writer.flush()
+            for block_num, entry in entries:
+                # blocks past the end of the index leave a zeroed gap behind
+                self._index.seek((block_num - self.base) * INDEX_ENTRY.size)
+                self._index.write(entry)
+
+    def _append(self, block):
+        """ Write a block to the segment, return its index entry. """
+        block_num = block['block_num']
+        block_id = bytes.fromhex(block['id'])
+        if self.base is None:
+            self._set_base(block_num)
+        elif block_num < self.base:
+            self._rebase(block_num)
+        else:
+            entry = self._entry(block_num)
+            if entry is not None and entry[3] == block_id:
+                return None
+
+        data = zlib.compress(self.codec.dumps(block), self.compress_level)
+        offset = self._writer.tell()
+        if offset and offset + len(data) > self.segment_size:
+            self._writer.flush()
+            self._writer.close()
+            self._segment += 1
+            self._writer = open(self._segment_path(self._segment), 'ab')
+            offset = 0
+        self._writer.write(data)
+        return block_num, INDEX_ENTRY.pack(
+            self._segment, offset, len(data), block_id)
+
+    def _recover(self):
+        """ Drop index entries that point past the end of their segment,
+        left behind by a crash between writing the index and the data. """
+        sizes = {}
+        dropped = 0
+        position = 0
+        self._index.seek(0)
+        while True:
+            chunk = self._index.read(INDEX_ENTRY.size * 16384)
+            if not chunk:
+                break
+            for i, (segment, offset, length, block_id) in enumerate(
+                    INDEX_ENTRY.iter_unpack(
+                        chunk[:len(chunk) - len(chunk) % INDEX_ENTRY.size])):
+                if block_id == EMPTY_ID:
+                    continue
+                if segment not in sizes:
+                    path = self._segment_path(segment)
+                    sizes[segment] = os.path.getsize(path) \
+                        if os.path.exists(path) else 0
+                if offset + length > sizes[segment]:
+                    self._index.seek(position + i * INDEX_ENTRY.size)
+                    self._index.write(bytes(INDEX_ENTRY.size))
+                    dropped += 1
+            position += len(chunk)
+            self._index.seek(position)
+        if dropped:
+            logger.warning('Dropped %d index entries of blocks missing from '
+                           'the segments of %s', dropped, self.path)
+
+    def _set_base(self, base):
+        tmp = self._meta_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(dict(base=base), f)
+        os.replace(tmp, self._meta_path)
+        self.base = base
+
+    def _rebase(self, base):
+        """ Move the start of the index down to ``base``. """
+        logger.info('Extending block store down to block %d', base)
+        self._index.seek(0)
+        entries = self._index.readall()
+
+        tmp = self._index_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(bytes((self.base - base) * INDEX_ENTRY.size))
+            f.write(entries)
+        self._index.close()
+        self._index_map.close()
+        os.replace(tmp, self._index_path)
+        self._index = open(self._index_path, 'r+b', buffering=0)
+        self._set_base(base)
+
+    def import_blocks(self, blocks, until=None, batch=256):
+        """ Store blocks from an iterable such as :meth:`Client.stream_blocks`.
+
+        Args:
+            blocks (iterable): Blocks to store.
+            until (int): Stop after this block number.
+            batch (int): Blocks written per flush.
+
+        Returns:
+            int: Number of blocks stored.
+        """
+        count = 0
+        for chunk in batches(blocks, until=until, size=batch):
+            self.put_many(chunk)
+            count += len(chunk)
+        return count
+
+    def flush(self):
+        """ Make stored blocks durable. """
+        with self._lock:
+            for f in (self._writer, self._index):
+                f.flush()
+                os.fsync(f.fileno())
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._writer.close()
+            self._index.close()
+            self._index_map.close()
+            for mapped in self._segments.values():
+                mapped.close()
+            self._segments.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        segments = self._segment + 1
+        size = sum(os.path.getsize(self._segment_path(s))
+                   for s in range(segments)
+                   if os.path.exists(self._segment_path(s)))
+        return dict(
+            base=self.base,
+            segments=segments,
+            bytes=size,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+
+def batches(blocks, until=None, size=256):
+    """ Group blocks into lists of ``size``, up to block number ``until``. """
+    batch = []
+    for block in blocks:
+        batch.append(block)
+        done = until is not None and block['block_num'] >= until
+        if len(batch) >= size or done:
+            yield batch
+            batch = []
+        if done:
+            return
+    if batch:
+        yield batch
@@ -0,0 +1,415 @@
+# coding=utf-8
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from eosapi.httpapi.tables import key_to_int
+from eosbase.abi import AbiError, format_asset, parse_asset
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EOSSNAP1'
+INT64 = (-2 ** 63, 2 ** 63)
+
+
+class StrColumn(object):
+    """ Dictionary encoded strings: each distinct value is stored once. """
+
+    kind = 'str'
+
+    def __init__(self):
+        self.values = []
+        self.codes = array('I')
+        self._index = {}
+
+    def fits(self, value):
+        return isinstance(value, str)
+
+    def encode(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self.encode(value))
+
+    def get(self, i):
+        return self.values[self.codes[i]]
+
+    def splice(self, i, j, values):
+        self.codes[i:j] = array('I', [self.encode(v) for v in values])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def dump(self):
+        return [self.codes.tobytes(), json.dumps(self.values).encode('utf-8')]
+
+    @classmethod
+    def load(cls, codes, values):
+        column = cls()
+        column.codes.frombytes(codes)
+        column.values = json.loads(values.decode('utf-8'))
+        column._index = {v: code for code, v in enumerate(column.values)}
+        return column
+
+
+class JsonColumn(StrColumn):
+    """ Anything else, stored as dictionary encoded JSON. """
+
+    kind = 'json'
+
+    def fits(self, value):
+        return True
+
+    def encode(self, value):
+        return super().encode(
+            json.dumps(value, separators=(',', ':'), sort_keys=True))
+
+    def get(self, i):
+        return json.loads(super().get(i))
+
+
+class IntColumn(object):
+    kind = 'int'
+    typecode = 'q'
+
+    def __init__(self):
+        self.data = array(self.typecode)
+
+    def fits(self, value):
+        return type(value) is int and INT64[0] <= value < INT64[1]
+
+    def append(self, value):
+        self.data.append(value)
+
+    def get(self, i):
+        return self.data[i]
+
+    def splice(self, i, j, values):
+        self.data[i:j] = array(self.typecode, values)
+
+    def __len__(self):
+        return len(self.data)
+
+    def dump(self):
+        return [self.data.tobytes()]
+
+    @classmethod
+    def load(cls, data):
+        column = cls()
+        column.data.frombytes(data)
+        return column
+
+
+class FloatColumn(IntColumn):
+    kind = 'float'
+    typecode = 'd'
+
+    def fits(self, value):
+        return type(value) is float
+
+
+class AssetColumn(object):
+    """ Assets such as ``1.0000 EOS`` as an integer amount and a symbol. """
+
+    kind = 'asset'
+
+    def __init__(self):
+        self.amounts = array('q')
+        self.symbols = StrColumn()
+
+    def fits(self, value):
+        # only values that read back exactly as they were given
+        if not isinstance(value, str):
+            return False
+        try:
+            return format_asset(*parse_asset(value)) == value
+        except AbiError:
+            return False
+
+    @staticmethod
+    def parse(value):
+        amount, precision, code = parse_asset(value)
+        return amount, '%d,%s' % (precision, code)
+
+    def append(self, value):
+        amount, symbol = self.parse(value)
+        self.amounts.append(amount)
+        self.symbols.append(symbol)
+
+    def get(self, i):
+        precision, code = self.symbols.get(i).split(',')
+        return format_asset(self.amounts[i], int(precision), code)
+
+    def splice(self, i, j, values):
+        parsed = [self.parse(v) for v in values]
+        self.amounts[i:j] = array('q', [amount for amount, _ in parsed])
+        self.symbols.splice(i, j, [symbol for _, symbol in parsed])
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def dump(self):
+        return [self.amounts.tobytes()] + self.symbols.dump()
+
+    @classmethod
+    def load(cls, amounts, codes, values):
+        column = cls()
+        column.amounts.frombytes(amounts)
+        column.symbols = StrColumn.load(codes, values)
+        return column
+
+
+COLUMNS = {c.kind: c for c in (StrColumn, JsonColumn, IntColumn, FloatColumn,
+                               AssetColumn)}
+
+
+def _column_for(value):
+    for kind in (IntColumn, FloatColumn, AssetColumn, StrColumn):
+        column = kind()
+        if column.fits(value):
+            return column
+    return JsonColumn()
+
+
+class TableSnapshot(object):
+    """ Contract table rows of many scopes, stored column by column.
+
+    Rows are kept sorted by scope and primary key. Every field becomes a
+    column of the type its values fit: integers and floats in arrays,
+    assets as an integer amount plus a symbol, strings dictionary encoded so
+    that repeated values are stored once, anything else as dictionary
+    encoded JSON. A token ``accounts`` table takes a few dozen bytes per
+    row this way instead of the better part of a kilobyte as dicts.
+
+    Nodes can not tell what changed in a table, so :meth:`refresh` is told:
+    it refetches the given scopes, or a key range of them, and splices the
+    new rows in place of the old ones. Scopes touched since the snapshot
+    was taken are typically collected with :meth:`Client.stream_actions`
+    starting at :attr:`block_num`.
+
+    .. code-block:: python
+
+       snapshot = client.snapshot_table('eosio.token', 'accounts',
+                                        scopes=holders, key=symbol_code)
+       snapshot.save('accounts.snap')
+       ...
+       snapshot = TableSnapshot.load('accounts.snap')
+       snapshot.refresh(client, scopes=['alice', 'bob'])
+       total = sum(snapshot.column('balance').amounts)
+
+    Args:
+        code (str): Contract account.
+        table (str): Table name.
+        key (str): Row field holding the primary key, a number, a name or
+            a symbol code, or a function that returns the primary key of a
+            row as integer.
+    """
+
+    def __init__(self, code, table, key):
+        self.code = code
+        self.table = table
+        self.key = key
+        self.block_num = None
+        self.scopes = StrColumn()
+        self.keys = array('Q')
+        self.columns = OrderedDict()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _key(self, row):
+        if callable(self.key):
+            return self.key(row)
+        return key_to_int(row[self.key])
+
+    def row(self, i):
+        return {name: column.get(i) for name, column in self.columns.items()}
+
+    def __iter__(self):
+        """ Yield ``(scope, row)`` tuples. """
+        for i in range(len(self)):
+            yield self.scopes.get(i), self.row(i)
+
+    def column(self, name):
+        return self.columns[name]
+
+    def _range(self, scope, lower_bound=None, upper_bound=None):
+        """ Positions ``[start, end)`` of a scope's rows within the bounds,
+        both of which are inclusive, as on the node. """
+        scopes = _Decoded(self.scopes)
+        start = bisect_left(scopes, scope)
+        end = bisect_right(scopes, scope, start)
+        if lower_bound is not None:
+            start = bisect_left(self.keys, key_to_int(lower_bound), start, end)
+        if upper_bound is not None:
+            end = bisect_right(self.keys, key_to_int(upper_bound), start, end)
+        return start, end
+
+    def rows(self, scope):
+        """ Rows of a single scope. """
+        start, end = self._range(scope)
+        return [self.row(i) for i in range(start, end)]
+
+    def replace(self, scope, rows, lower_bound=None, upper_bound=None):
+        """ Replace a scope's rows (within the bounds) by ``rows``. """
+        rows = sorted(rows, key=self._key)
+        start, end = self._range(scope, lower_bound, upper_bound)
+
+        for row in rows:
+            for name in row:
+                if name not in self.columns:
+                    self.columns[name] = self._new_column(row[name])
+        for name, column in self.columns.items():
+            values = [row.get(name) for row in rows]
+            if not all(column.fits(value) for value in values):
+                column = self.columns[name] = self._widen(column)
+            column.splice(start, end, values)
+
+        self.scopes.splice(start, end, [scope] * len(rows))
+        self.keys[start:end] = array('Q', [self._key(row) for row in rows])
+
+    def _new_column(self, value):
+        if not len(self):
+            return _column_for(value)
+        # a field the earlier rows did not have
+        column = JsonColumn()
+        column.splice(0, 0, [None] * len(self))
+        return column
+
+    def _widen(self, column):
+        """ Turn a column into a JSON column that fits any value. """
+        widened = JsonColumn()
+        for i in range(len(column)):
+            widened.append(column.get(i))
+        return widened
+
+    @classmethod
+    def fetch(cls, client, code, table, scopes, key, concurrency=None,
+              **kwargs):
+        """ Snapshot a table over the given scopes.
+
+        Further keyword arguments are passed on to :class:`TableRows`.
+        """
+        snapshot = cls(code, table, key)
+        snapshot.refresh(client, scopes, concurrency=concurrency, **kwargs)
+        return snapshot
+
+    def refresh(self, client, scopes, lower_bound=None, upper_bound=None,
+                concurrency=None, chunk=256, **kwargs):
+        """ Refetch the rows of the given scopes, within the given bounds.
+
+        Nothing is compared: every row of the given scopes within the
+        bounds is fetched again and replaces the rows there, whether it
+        changed or not, and rows that are gone are dropped. Other scopes
+        are left as they were, changed or not.
+
+        Scopes are fetched ``concurrency`` at a time and spliced in
+        ``chunk`` scopes at a time, which bounds the rows held as dicts.
+        """
+        def fetch(scope):
+            return list(client.iter_table_rows(
+                self.code, scope, self.table, key=self.key,
+                lower_bound=lower_bound, upper_bound=upper_bound, **kwargs))
+
+        info = client.get_info()
+        scopes = sorted(set(scopes))
+        for i in range(0, len(scopes), chunk):
+            batch = scopes[i:i + chunk]
+            for scope, rows in zip(batch, client.map(fetch, batch,
+                                                     concurrency)):
+                if isinstance(rows, Exception):
+                    raise rows
+                self.replace(scope, rows, lower_bound, upper_bound)
+        self.block_num = info['head_block_num']
+
+    def save(self, path):
+        """ Write the snapshot to a compressed file, atomically. """
+        blobs = [self.keys.tobytes()] + self.scopes.dump()
+        columns = []
+        for name, column in self.columns.items():
+            parts = column.dump()
+            columns.append([name, column.kind, len(parts)])
+            blobs.extend(parts)
+        header = json.dumps(dict(
+            code=self.code, table=self.table, block_num=self.block_num,
+            key=self.key if isinstance(self.key, str) else None,
+            columns=columns, sizes=[len(blob) for blob in blobs],
+            saved=time.time())).encode('utf-8')
+
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(header)) + header)
+            compressor = zlib.compressobj(6)
+            for blob in blobs:
+                f.write(compressor.compress(blob))
+            f.write(compressor.flush())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """ Read a snapshot written by :meth:`save`.
+
+        Args:
+            key (callable): Primary key function, if the snapshot was taken
+                with one instead of a field name.
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('%s is not a table snapshot' % path)
+            size, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(size).decode('utf-8'))
+            data = zlib.decompress(f.read())
+
+        blobs, offset = [], 0
+        for size in header['sizes']:
+            blobs.append(data[offset:offset + size])
+            offset += size
+
+        snapshot = cls(header['code'], header['table'], key or header['key'])
+        snapshot.block_num = header['block_num']
+        snapshot.keys.frombytes(blobs[0])
+        snapshot.scopes = StrColumn.load(blobs[1], blobs[2])
+        position = 3
+        for name, kind, parts in header['columns']:
+            snapshot.columns[name] = COLUMNS[kind].load(
+                *blobs[position:position + parts])
+            position += parts
+        return snapshot
+
+    def stats(self):
+        nbytes = self.keys.itemsize * len(self.keys) + \
+            self.scopes.codes.itemsize * len(self.scopes)
+        for column in self.columns.values():
+            for data in (getattr(column, 'data', None),
+                         getattr(column, 'amounts', None),
+                         getattr(column, 'codes', None)):
+                if data is not None:
+                    nbytes += data.itemsize * len(data)
+        return dict(rows=len(self), scopes=len(self.scopes.values),
+                    columns={n: c.kind for n, c in self.columns.items()},
+                    array_bytes=nbytes, block_num=self.block_num)
+
+
+class _Decoded(object):
+    """ Sequence view of a :class:`StrColumn` for bisect. """
+
+    def __init__(self, column):
+        self.column = column
+
+    def __len__(self):
+        return len(self.column)
+
+    def __getitem__(self, i):
+        return self.column.get(i)
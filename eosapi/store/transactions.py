@@ -0,0 +1,184 @@
+# coding=utf-8
+import logging
+import mmap
+import os
+import struct
+import threading
+
+from eosapi.store.blocks import batches
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EOSTRXI1'
+HEADER = struct.Struct('<8sQQ')
+# transaction id, block number, position in the block, block id
+SLOT = struct.Struct('<32sII32s')
+EMPTY_ID = bytes(32)
+
+
+def transaction_ids(block):
+    """ Ids of the transactions in a block, in block order. """
+    for receipt in block.get('transactions') or []:
+        trx = receipt.get('trx')
+        # deferred transactions are only referenced by id
+        yield trx['id'] if isinstance(trx, dict) else trx
+
+
+class TransactionIndex(object):
+    """ On-disk hash table from transaction id to the block it is in.
+
+    An open addressing table with linear probing in a single mmapped file.
+    Transaction ids are sha256 hashes, so their first bytes are used as the
+    hash as is. A lookup reads one slot, rarely a few; the table doubles
+    (and is rewritten) once it is ``max_load`` full, so bulk inserts should
+    go through :meth:`add_blocks`, which grows it once per batch.
+
+    .. code-block:: python
+
+       index = TransactionIndex('/data/transactions.idx')
+       with client.stream_blocks(start_block=1) as blocks:
+           index.import_blocks(blocks, until=1000000)
+       index.get(trx_id)  # {'block_num': ..., 'block_id': ..., 'position': ...}
+
+    Args:
+        path (str): Index file, created if missing.
+        capacity (int): Initial number of slots of a new index.
+        max_load (float): Share of used slots that triggers a resize.
+    """
+
+    def __init__(self, path, capacity=1 << 16, max_load=0.7):
+        self.path = path
+        self.max_load = max_load
+
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            self._create(path, capacity)
+        self._open()
+
+    @staticmethod
+    def _create(path, capacity):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, capacity, 0))
+            f.truncate(HEADER.size + capacity * SLOT.size)
+        os.replace(tmp, path)
+
+    def _open(self):
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.capacity, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError('%s is not a transaction index' % self.path)
+
+    def _close(self):
+        self._map.close()
+        self._file.close()
+
+    def _slot(self, trx_id):
+        return _find(self._map, self.capacity, trx_id)
+
+    def get(self, trx_id):
+        """ Location of a transaction, None if it is not indexed. """
+        key = bytes.fromhex(trx_id)
+        with self._lock:
+            offset, found = self._slot(key)
+            if not found:
+                return None
+            _, block_num, position, block_id = SLOT.unpack_from(self._map, offset)
+        return dict(block_num=block_num, block_id=block_id.hex(),
+                    position=position)
+
+    def __contains__(self, trx_id):
+        return self.get(trx_id) is not None
+
+    def __len__(self):
+        return self.count
+
+    def add_block(self, block):
+        self.add_blocks([block])
+
+    def add_blocks(self, blocks):
+        """ Index the transactions of many blocks. """
+        entries = [(bytes.fromhex(trx_id), block['block_num'], position,
+                    bytes.fromhex(block['id']))
+                   for block in blocks
+                   for position, trx_id in enumerate(transaction_ids(block))]
+        with self._lock:
+            self._reserve(self.count + len(entries))
+            for entry in entries:
+                offset, found = self._slot(entry[0])
+                SLOT.pack_into(self._map, offset, *entry)
+                if not found:
+                    self.count += 1
+            HEADER.pack_into(self._map, 0, MAGIC, self.capacity, self.count)
+
+    def _reserve(self, count):
+        """ Grow the table until ``count`` entries stay below ``max_load``. """
+        capacity = self.capacity
+        while count > capacity * self.max_load:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+
+        logger.info('Growing transaction index to %d slots', capacity)
+        tmp = self.path + '.grow'
+        self._create(tmp, capacity)
+        with open(tmp, 'r+b') as f, mmap.mmap(f.fileno(), 0) as grown:
+            for slot in range(self.capacity):
+                entry = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+                if entry[0] != EMPTY_ID:
+                    SLOT.pack_into(grown, _find(grown, capacity, entry[0])[0],
+                                   *entry)
+            HEADER.pack_into(grown, 0, MAGIC, capacity, self.count)
+            grown.flush()
+        self._close()
+        os.replace(tmp, self.path)
+        self._open()
+
+    def import_blocks(self, blocks, until=None, batch=256):
+        """ Index blocks from an iterable such as :meth:`Client.stream_blocks`.
+
+        Returns:
+            int: Number of blocks indexed.
+        """
+        count = 0
+        for chunk in batches(blocks, until=until, size=batch):
+            self.add_blocks(chunk)
+            count += len(chunk)
+        return count
+
+    def flush(self):
+        """ Make indexed transactions durable. """
+        with self._lock:
+            self._map.flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        return dict(
+            transactions=self.count,
+            capacity=self.capacity,
+            load=self.count / self.capacity,
+            bytes=HEADER.size + self.capacity * SLOT.size,
+        )
+
+
+def _find(mapped, capacity, trx_id):
+    """ Offset of the slot holding ``trx_id`` or of the empty slot it would
+    go to, and whether it was found. """
+    slot = int.from_bytes(trx_id[:8], 'little') % capacity
+    while True:
+        offset = HEADER.size + slot * SLOT.size
+        stored = mapped[offset:offset + 32]
+        if stored == trx_id or stored == EMPTY_ID:
+            return offset, stored == trx_id
+        slot = (slot + 1) % capacity
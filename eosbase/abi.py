@@ -0,0 +1,634 @@
+# coding=utf-8
+""" Binary serialization of EOSIO types, driven by a contract ABI. """
+import re
+import struct
+from datetime import datetime, timezone
+
+from eosbase.encoding import (
+    bytes_to_public_key,
+    bytes_to_signature,
+    public_key_to_bytes,
+    signature_to_bytes,
+)
+
+NAME_CHARS = '.12345abcdefghijklmnopqrstuvwxyz'
+_NAME_INDEX = {c: i for i, c in enumerate(NAME_CHARS)}
+
+# block timestamps count half seconds since 2000-01-01
+BLOCK_TIMESTAMP_EPOCH_MS = 946684800000
+BLOCK_INTERVAL_MS = 500
+
+# fc writes integers wider than 32 bits as JSON strings
+_LARGE_INT = 0xffffffff
+
+_ASSET = re.compile(r'^\s*(-?)(\d+)(?:\.(\d*))?\s+([A-Z]{1,7})\s*$')
+
+
+class AbiError(ValueError):
+    """ A value or type that the ABI can not serialize. """
+    pass
+
+
+class UnknownAbiType(AbiError):
+    """ An action, struct or type that the ABI does not define. """
+    pass
+
+
+def name_to_int(name):
+    if len(name) > 13:
+        raise AbiError('Name longer than 13 characters: %r' % name)
+    value = 0
+    for i in range(13):
+        c = 0
+        if i < len(name):
+            try:
+                c = _NAME_INDEX[name[i]]
+            except KeyError:
+                raise AbiError('Invalid character in name %r' % name)
+        if i < 12:
+            value |= c << (64 - 5 * (i + 1))
+        elif c > 0x0f:
+            raise AbiError('Invalid 13th character in name %r' % name)
+        else:
+            value |= c
+    return value
+
+
+def int_to_name(value):
+    chars = []
+    for i in range(13):
+        if i == 0:
+            chars.append(NAME_CHARS[value & 0x0f])
+            value >>= 4
+        else:
+            chars.append(NAME_CHARS[value & 0x1f])
+            value >>= 5
+    return ''.join(reversed(chars)).rstrip('.')
+
+
+def _symbol_code_bytes(code, size):
+    if not code or len(code) > size - 1 or not code.isupper():
+        raise AbiError('Invalid symbol code %r' % code)
+    return code.encode('ascii').ljust(size, b'\0')
+
+
+def symbol_code_to_int(code):
+    """ ``'EOS'`` to the integer a ``symbol_code`` is stored as. """
+    return int.from_bytes(_symbol_code_bytes(code, 8), 'little')
+
+
+def parse_time(text):
+    """ ``'2018-06-01T12:00:00.500'`` to microseconds since the epoch. """
+    text = text.rstrip('Z')
+    for fmt in ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            parsed = datetime.strptime(text, fmt)
+            break
+        except ValueError:
+            continue
+    else:
+        raise AbiError('Invalid time %r' % text)
+    parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp()) * 1000000 + parsed.microsecond
+
+
+def format_time(micros, fraction=True):
+    """ Microseconds since the epoch to the time format of nodes. """
+    seconds, micros = divmod(micros, 1000000)
+    text = datetime.fromtimestamp(seconds, timezone.utc).strftime(
+        '%Y-%m-%dT%H:%M:%S')
+    return text + ('.%03d' % (micros // 1000) if fraction else '')
+
+
+def _int_value(value):
+    if isinstance(value, str):
+        return int(value, 0) if value.startswith(('0x', '-0x')) else int(value)
+    return int(value)
+
+
+def _bool(value):
+    if isinstance(value, str):
+        if value not in ('true', 'false'):
+            raise AbiError('Invalid bool %r' % value)
+        return value == 'true'
+    return bool(value)
+
+
+def _int_json(value):
+    return str(value) if not -_LARGE_INT <= value <= _LARGE_INT else value
+
+
+def pack_varuint32(value, out):
+    if not 0 <= value < 1 << 32:
+        raise AbiError('varuint32 out of range: %r' % value)
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def unpack_varuint32(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 35:
+            raise AbiError('varuint32 too long')
+
+
+def _unpack_size(data, pos):
+    """ Length prefix of ``data[pos:]``, checked against what is left. """
+    size, pos = unpack_varuint32(data, pos)
+    if pos + size > len(data):
+        raise IndexError('%d bytes past the end' % (pos + size - len(data)))
+    return size, pos
+
+
+def _take(data, pos, size):
+    """ The ``size`` bytes at ``pos``, checked against what is left. """
+    end = pos + size
+    if end > len(data):
+        raise IndexError('%d bytes past the end' % (end - len(data)))
+    return bytes(data[pos:end]), end
+
+
+def _fixed(fmt, to_python=None, to_json=None):
+    """ Packer and unpacker of a fixed size struct format. """
+    s = struct.Struct(fmt)
+
+    def pack(value, out):
+        try:
+            out += s.pack(to_python(value) if to_python else value)
+        except struct.error as e:
+            raise AbiError('%s: %r' % (e, value))
+
+    def unpack(data, pos):
+        value, = s.unpack_from(data, pos)
+        return (to_json(value) if to_json else value), pos + s.size
+
+    return pack, unpack
+
+
+def _int128(signed):
+    def pack(value, out):
+        try:
+            out += _int_value(value).to_bytes(16, 'little', signed=signed)
+        except OverflowError as e:
+            raise AbiError('%s: %r' % (e, value))
+
+    def unpack(data, pos):
+        data, pos = _take(data, pos, 16)
+        return str(int.from_bytes(data, 'little', signed=signed)), pos
+
+    return pack, unpack
+
+
+def _varint32():
+    def pack(value, out):
+        value = _int_value(value)
+        if not -(1 << 31) <= value < 1 << 31:
+            raise AbiError('varint32 out of range: %r' % value)
+        pack_varuint32(((value << 1) ^ (value >> 31)) & 0xffffffff, out)
+
+    def unpack(data, pos):
+        value, pos = unpack_varuint32(data, pos)
+        return (value >> 1) ^ -(value & 1), pos
+
+    return pack, unpack
+
+
+def _varuint32():
+    def pack(value, out):
+        pack_varuint32(_int_value(value), out)
+
+    return pack, unpack_varuint32
+
+
+def _bytes():
+    def pack(value, out):
+        data = bytes.fromhex(value) if isinstance(value, str) else bytes(value)
+        pack_varuint32(len(data), out)
+        out += data
+
+    def unpack(data, pos):
+        size, pos = _unpack_size(data, pos)
+        return bytes(data[pos:pos + size]).hex(), pos + size
+
+    return pack, unpack
+
+
+def _string():
+    def pack(value, out):
+        data = value.encode('utf-8')
+        pack_varuint32(len(data), out)
+        out += data
+
+    def unpack(data, pos):
+        size, pos = _unpack_size(data, pos)
+        return bytes(data[pos:pos + size]).decode('utf-8'), pos + size
+
+    return pack, unpack
+
+
+def _checksum(size):
+    def pack(value, out):
+        data = bytes.fromhex(value)
+        if len(data) != size:
+            raise AbiError('Expected %d bytes checksum: %r' % (size, value))
+        out += data
+
+    def unpack(data, pos):
+        data, pos = _take(data, pos, size)
+        return data.hex(), pos
+
+    return pack, unpack
+
+
+def _key(to_bytes, to_text, size):
+    def pack(value, out):
+        out += to_bytes(value)
+
+    def unpack(data, pos):
+        data, pos = _take(data, pos, size)
+        return to_text(data), pos
+
+    return pack, unpack
+
+
+def _symbol():
+    def pack(value, out):
+        precision, code = value.split(',')
+        out.append(int(precision))
+        out += _symbol_code_bytes(code, 7)
+
+    def unpack(data, pos):
+        data, pos = _take(data, pos, 8)
+        code = data[1:].rstrip(b'\0').decode('ascii')
+        return '%d,%s' % (data[0], code), pos
+
+    return pack, unpack
+
+
+def _symbol_code():
+    def pack(value, out):
+        out += _symbol_code_bytes(value, 8)
+
+    def unpack(data, pos):
+        data, pos = _take(data, pos, 8)
+        return data.rstrip(b'\0').decode('ascii'), pos
+
+    return pack, unpack
+
+
+def parse_asset(value):
+    """ ``'1.0000 EOS'`` to ``(10000, 4, 'EOS')``. """
+    match = _ASSET.match(value)
+    if match is None:
+        raise AbiError('Invalid asset %r' % value)
+    sign, whole, fraction, code = match.groups()
+    fraction = fraction or ''
+    amount = int(whole + fraction)
+    return (-amount if sign else amount), len(fraction), code
+
+
+def format_asset(amount, precision, code):
+    sign, amount = ('-' if amount < 0 else ''), abs(amount)
+    if not precision:
+        return '%s%d %s' % (sign, amount, code)
+    whole, fraction = divmod(amount, 10 ** precision)
+    return '%s%d.%0*d %s' % (sign, whole, precision, fraction, code)
+
+
+def _asset():
+    amount_struct = struct.Struct('<q')
+
+    def pack(value, out):
+        amount, precision, code = parse_asset(value)
+        try:
+            out += amount_struct.pack(amount)
+        except struct.error as e:
+            raise AbiError('%s: %r' % (e, value))
+        out.append(precision)
+        out += _symbol_code_bytes(code, 7)
+
+    def unpack(data, pos):
+        data, pos = _take(data, pos, 16)
+        amount, = amount_struct.unpack_from(data)
+        code = data[9:].rstrip(b'\0').decode('ascii')
+        return format_asset(amount, data[8], code), pos
+
+    return pack, unpack
+
+
+_TIME_POINT = struct.Struct('<q')
+_UINT32 = struct.Struct('<I')
+
+
+def _time_point():
+    def pack(value, out):
+        out += _TIME_POINT.pack(parse_time(value))
+
+    def unpack(data, pos):
+        micros, = _TIME_POINT.unpack_from(data, pos)
+        return format_time(micros), pos + 8
+
+    return pack, unpack
+
+
+def _time_point_sec():
+    def pack(value, out):
+        out += _UINT32.pack(parse_time(value) // 1000000)
+
+    def unpack(data, pos):
+        seconds, = _UINT32.unpack_from(data, pos)
+        return format_time(seconds * 1000000, fraction=False), pos + 4
+
+    return pack, unpack
+
+
+def _block_timestamp():
+    def pack(value, out):
+        ms = parse_time(value) // 1000
+        out += _UINT32.pack((ms - BLOCK_TIMESTAMP_EPOCH_MS) // BLOCK_INTERVAL_MS)
+
+    def unpack(data, pos):
+        slot, = _UINT32.unpack_from(data, pos)
+        ms = slot * BLOCK_INTERVAL_MS + BLOCK_TIMESTAMP_EPOCH_MS
+        return format_time(ms * 1000), pos + 4
+
+    return pack, unpack
+
+
+def _invalid_field(struct_name, name, error):
+    """ :class:`AbiError` naming the path of the field that failed to pack,
+    e.g. ``Invalid field transfer.quantity: ...``. """
+    if isinstance(error, AbiError) and getattr(error, 'path', None):
+        path, reason = '%s.%s' % (name, error.path), error.reason
+    else:
+        path, reason = name, error
+    invalid = AbiError('Invalid field %s.%s: %s' % (struct_name, path, reason))
+    invalid.path, invalid.reason = path, reason
+    return invalid
+
+
+BUILTIN_TYPES = {
+    'bool': _fixed('<?', _bool),
+    'int8': _fixed('<b', _int_value),
+    'uint8': _fixed('<B', _int_value),
+    'int16': _fixed('<h', _int_value),
+    'uint16': _fixed('<H', _int_value),
+    'int32': _fixed('<i', _int_value),
+    'uint32': _fixed('<I', _int_value),
+    'int64': _fixed('<q', _int_value, _int_json),
+    'uint64': _fixed('<Q', _int_value, _int_json),
+    'int128': _int128(True),
+    'uint128': _int128(False),
+    'varint32': _varint32(),
+    'varuint32': _varuint32(),
+    'float32': _fixed('<f', float),
+    'float64': _fixed('<d', float),
+    'float128': _checksum(16),
+    'time_point': _time_point(),
+    'time_point_sec': _time_point_sec(),
+    'block_timestamp_type': _block_timestamp(),
+    'name': _fixed('<Q', name_to_int, int_to_name),
+    'bytes': _bytes(),
+    'string': _string(),
+    'checksum160': _checksum(20),
+    'checksum256': _checksum(32),
+    'checksum512': _checksum(64),
+    'public_key': _key(public_key_to_bytes, bytes_to_public_key, 34),
+    'signature': _key(signature_to_bytes, bytes_to_signature, 66),
+    'symbol': _symbol(),
+    'symbol_code': _symbol_code(),
+    'asset': _asset(),
+}
+
+
+class AbiSerializer(object):
+    """ Packs and unpacks the types of one contract ABI.
+
+    Every type is compiled into a pair of functions the first time it is
+    used: structs into a flat list of field packers (base fields first),
+    ``T[]``, ``T?`` and ``T$`` into wrappers around the packer of ``T``. The
+    binary format is the one ``abi_json_to_bin`` produces.
+
+    .. code-block:: python
+
+       abi = AbiSerializer(client.get_abi('eosio.token')['abi'])
+       data = abi.pack_action('transfer', {'from': 'alice', 'to': 'bob',
+                                           'quantity': '1.0000 EOS',
+                                           'memo': ''})
+       abi.unpack_action('transfer', data)
+
+    Args:
+        abi (dict): The ABI, as returned by ``get_abi``.
+    """
+
+    def __init__(self, abi):
+        self.abi = abi
+        self.typedefs = {t['new_type_name']: t['type']
+                         for t in abi.get('types') or ()}
+        self.structs = {s['name']: s for s in abi.get('structs') or ()}
+        self.variants = {v['name']: v['types'] for v in abi.get('variants') or ()}
+        self.actions = {a['name']: a['type'] for a in abi.get('actions') or ()}
+        self.tables = {t['name']: t['type'] for t in abi.get('tables') or ()}
+        self._compiled = {}
+
+    def resolve(self, type_name):
+        seen = set()
+        while type_name in self.typedefs:
+            if type_name in seen:
+                raise AbiError('Circular typedef %r' % type_name)
+            seen.add(type_name)
+            type_name = self.typedefs[type_name]
+        return type_name
+
+    def compile(self, type_name):
+        """ ``(pack, unpack)`` functions of a type. """
+        compiled = self._compiled.get(type_name)
+        if compiled is None:
+            # a placeholder lets recursive types refer to themselves
+            self._compiled[type_name] = (
+                lambda value, out: self._compiled[type_name][0](value, out),
+                lambda data, pos: self._compiled[type_name][1](data, pos))
+            try:
+                compiled = self._compiled[type_name] = self._compile(type_name)
+            except Exception:
+                del self._compiled[type_name]
+                raise
+        return compiled
+
+    def _compile(self, type_name):
+        if type_name.endswith('[]'):
+            return self._array(self.compile(type_name[:-2]))
+        if type_name.endswith('?'):
+            return self._optional(self.compile(type_name[:-1]))
+        if type_name.endswith('$'):
+            # binary extensions only differ where structs end
+            return self.compile(type_name[:-1])
+
+        resolved = self.resolve(type_name)
+        if resolved != type_name:
+            return self.compile(resolved)
+        if type_name in BUILTIN_TYPES:
+            return BUILTIN_TYPES[type_name]
+        if type_name in self.structs:
+            return self._struct(type_name)
+        if type_name in self.variants:
+            return self._variant(type_name)
+        raise UnknownAbiType('Unknown type %r' % type_name)
+
+    @staticmethod
+    def _array(item):
+        pack_item, unpack_item = item
+
+        def pack(value, out):
+            pack_varuint32(len(value), out)
+            for v in value:
+                pack_item(v, out)
+
+        def unpack(data, pos):
+            size, pos = unpack_varuint32(data, pos)
+            values = []
+            for _ in range(size):
+                v, pos = unpack_item(data, pos)
+                values.append(v)
+            return values, pos
+
+        return pack, unpack
+
+    @staticmethod
+    def _optional(item):
+        pack_item, unpack_item = item
+
+        def pack(value, out):
+            if value is None:
+                out.append(0)
+            else:
+                out.append(1)
+                pack_item(value, out)
+
+        def unpack(data, pos):
+            if not data[pos]:
+                return None, pos + 1
+            return unpack_item(data, pos + 1)
+
+        return pack, unpack
+
+    def _fields(self, struct_name):
+        struct_def = self.structs[struct_name]
+        fields = []
+        if struct_def.get('base'):
+            base = self.resolve(struct_def['base'])
+            if base not in self.structs:
+                raise UnknownAbiType('Unknown base %r of %r' % (
+                    base, struct_name))
+            fields.extend(self._fields(base))
+        for field in struct_def['fields']:
+            fields.append((field['name'], field['type'].endswith('$'),
+                           self.compile(field['type'])))
+        return fields
+
+    def _struct(self, struct_name):
+        fields = self._fields(struct_name)
+        names = frozenset(name for name, _, _ in fields)
+
+        def pack(value, out):
+            if not isinstance(value, dict):
+                raise AbiError('Expected a dict for %s: %r' % (
+                    struct_name, value))
+            if not names.issuperset(value):
+                raise AbiError('Unknown fields %s of %s' % (
+                    ', '.join(sorted(map(str, set(value) - names))),
+                    struct_name))
+            for name, extension, (pack_field, _) in fields:
+                if name not in value:
+                    if extension:
+                        # extensions are left out from the first missing one on
+                        return
+                    raise AbiError('Missing field %r of %s' % (name, struct_name))
+                try:
+                    pack_field(value[name], out)
+                except (TypeError, AttributeError, ValueError,
+                        OverflowError, struct.error) as e:
+                    raise _invalid_field(struct_name, name, e)
+
+        def unpack(data, pos):
+            value = {}
+            for name, extension, (_, unpack_field) in fields:
+                if extension and pos >= len(data):
+                    break
+                value[name], pos = unpack_field(data, pos)
+            return value, pos
+
+        return pack, unpack
+
+    def _variant(self, variant_name):
+        types = self.variants[variant_name]
+        compiled = [self.compile(t) for t in types]
+
+        def pack(value, out):
+            type_name, inner = value
+            try:
+                index = types.index(type_name)
+            except ValueError:
+                raise AbiError('%r is not a type of variant %s' % (
+                    type_name, variant_name))
+            pack_varuint32(index, out)
+            compiled[index][0](inner, out)
+
+        def unpack(data, pos):
+            index, pos = unpack_varuint32(data, pos)
+            if index >= len(types):
+                raise AbiError('Invalid index %d of variant %s' % (
+                    index, variant_name))
+            inner, pos = compiled[index][1](data, pos)
+            return [types[index], inner], pos
+
+        return pack, unpack
+
+    def pack(self, type_name, value):
+        """ Serialize ``value`` as ``type_name``, returns bytes. """
+        pack = self.compile(type_name)[0]
+        out = bytearray()
+        try:
+            pack(value, out)
+        except AbiError:
+            raise
+        except (TypeError, AttributeError, ValueError, OverflowError,
+                struct.error) as e:
+            raise AbiError('Invalid %s: %s' % (type_name, e))
+        return bytes(out)
+
+    def unpack(self, type_name, data):
+        """ Deserialize ``type_name`` from bytes or hex. """
+        if isinstance(data, str):
+            data = bytes.fromhex(data)
+        try:
+            value, _ = self.compile(type_name)[1](data, 0)
+        except (IndexError, struct.error) as e:
+            raise AbiError('Truncated %s: %s' % (type_name, e))
+        except UnicodeDecodeError as e:
+            raise AbiError('Invalid %s: %s' % (type_name, e))
+        return value
+
+    def action_type(self, action):
+        try:
+            return self.actions[action]
+        except KeyError:
+            raise UnknownAbiType('Unknown action %r' % action)
+
+    def pack_action(self, action, args):
+        return self.pack(self.action_type(action), args)
+
+    def unpack_action(self, action, data):
+        return self.unpack(self.action_type(action), data)
@@ -0,0 +1,156 @@
+# coding=utf-8
+""" Text formats of EOSIO keys, signatures and transaction ids. """
+import hashlib
+import struct
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_BASE58_INDEX = {c: i for i, c in enumerate(BASE58_ALPHABET)}
+
+# key and signature types, as numbered in the binary format
+KEY_TYPES = ('K1', 'R1')
+
+
+def base58_encode(data):
+    number = int.from_bytes(data, 'big')
+    chars = []
+    while number:
+        number, rem = divmod(number, 58)
+        chars.append(BASE58_ALPHABET[rem])
+    zeros = len(data) - len(data.lstrip(b'\0'))
+    return '1' * zeros + ''.join(reversed(chars))
+
+
+def base58_decode(text):
+    number = 0
+    for c in text:
+        try:
+            number = number * 58 + _BASE58_INDEX[c]
+        except KeyError:
+            raise ValueError('Invalid base58 character %r' % c)
+    zeros = len(text) - len(text.lstrip('1'))
+    data = number.to_bytes((number.bit_length() + 7) // 8, 'big')
+    return b'\0' * zeros + data
+
+
+def ripemd160(data):
+    try:
+        return hashlib.new('ripemd160', data).digest()
+    except ValueError:
+        # OpenSSL 3 builds may leave ripemd160 out
+        return _ripemd160(data)
+
+
+def _checksum(data, suffix=b''):
+    return ripemd160(data + suffix)[:4]
+
+
+def _decode_checked(text, suffix=b''):
+    raw = base58_decode(text)
+    data, checksum = raw[:-4], raw[-4:]
+    if _checksum(data, suffix) != checksum:
+        raise ValueError('Checksum mismatch in %s' % text)
+    return data
+
+
+def public_key_to_bytes(key):
+    """ ``EOS...`` or ``PUB_K1_...`` key to its binary form. """
+    if key.startswith('PUB_'):
+        _, kind, text = key.split('_', 2)
+        return bytes([KEY_TYPES.index(kind)]) + \
+            _decode_checked(text, kind.encode())
+    if key.startswith('EOS'):
+        return b'\0' + _decode_checked(key[3:])
+    raise ValueError('Unknown public key format: %s' % key)
+
+
+def bytes_to_public_key(data):
+    """ Binary public key to its text form, ``EOS...`` for K1 keys. """
+    kind, key = data[0], bytes(data[1:])
+    if kind == 0:
+        return 'EOS' + base58_encode(key + _checksum(key))
+    name = KEY_TYPES[kind]
+    return 'PUB_%s_%s' % (name, base58_encode(key + _checksum(key, name.encode())))
+
+
+def signature_to_bytes(signature):
+    """ ``SIG_K1_...`` signature to its binary form. """
+    _, kind, text = signature.split('_', 2)
+    return bytes([KEY_TYPES.index(kind)]) + _decode_checked(text, kind.encode())
+
+
+def bytes_to_signature(data):
+    kind, sig = KEY_TYPES[data[0]], bytes(data[1:])
+    return 'SIG_%s_%s' % (kind, base58_encode(sig + _checksum(sig, kind.encode())))
+
+
+def transaction_id(packed_transaction):
+    """ Id of a transaction in the packed form ``push_transaction`` takes. """
+    return hashlib.sha256(
+        bytes.fromhex(packed_transaction['packed_trx'])).hexdigest()
+
+
+# pure Python RIPEMD-160, only used when hashlib does not provide it
+
+_R1 = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+       7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+       3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+       1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+       4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13]
+_R2 = [5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+       6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+       15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+       8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+       12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11]
+_S1 = [11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+       7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+       11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+       11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+       9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6]
+_S2 = [8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+       9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+       9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+       15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+       8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11]
+_K1 = [0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E]
+_K2 = [0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000]
+_MASK = 0xFFFFFFFF
+
+
+def _f(j, x, y, z):
+    if j < 16:
+        return x ^ y ^ z
+    if j < 32:
+        return (x & y) | (~x & z)
+    if j < 48:
+        return (x | ~y & _MASK) ^ z
+    if j < 64:
+        return (x & z) | (y & ~z)
+    return x ^ (y | ~z & _MASK)
+
+
+def _rol(x, n):
+    return ((x << n) | (x >> (32 - n))) & _MASK
+
+
+def _ripemd160(data):
+    h = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+    padded = data + b'\x80' + b'\0' * ((55 - len(data)) % 64) + \
+        struct.pack('<Q', len(data) * 8)
+    for block in range(0, len(padded), 64):
+        x = struct.unpack('<16I', padded[block:block + 64])
+        a1, b1, c1, d1, e1 = h
+        a2, b2, c2, d2, e2 = h
+        for j in range(80):
+            t = _rol((a1 + (_f(j, b1, c1, d1) & _MASK) + x[_R1[j]] +
+                      _K1[j // 16]) & _MASK, _S1[j]) + e1
+            a1, e1, d1, c1, b1 = e1, d1, _rol(c1, 10), b1, t & _MASK
+            t = _rol((a2 + (_f(79 - j, b2, c2, d2) & _MASK) + x[_R2[j]] +
+                      _K2[j // 16]) & _MASK, _S2[j]) + e2
+            a2, e2, d2, c2, b2 = e2, d2, _rol(c2, 10), b2, t & _MASK
+        t = (h[1] + c1 + d2) & _MASK
+        h[1] = (h[2] + d1 + e2) & _MASK
+        h[2] = (h[3] + e1 + a2) & _MASK
+        h[3] = (h[4] + a1 + b2) & _MASK
+        h[4] = (h[0] + b1 + c2) & _MASK
+        h[0] = t
+    return struct.pack('<5I', *h)
@@ -0,0 +1,347 @@
+# coding=utf-8
+""" Offline signing of EOSIO transactions. """
+import hashlib
+import hmac
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from eosbase.abi import AbiSerializer
+from eosbase.encoding import (
+    _decode_checked,
+    base58_decode,
+    bytes_to_public_key,
+    bytes_to_signature,
+    transaction_id,
+)
+
+# secp256k1 domain parameters
+P = 2 ** 256 - 2 ** 32 - 977
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+     0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+TRANSACTION_ABI = {
+    'structs': [
+        {'name': 'permission_level', 'base': '', 'fields': [
+            {'name': 'actor', 'type': 'name'},
+            {'name': 'permission', 'type': 'name'}]},
+        {'name': 'action', 'base': '', 'fields': [
+            {'name': 'account', 'type': 'name'},
+            {'name': 'name', 'type': 'name'},
+            {'name': 'authorization', 'type': 'permission_level[]'},
+            {'name': 'data', 'type': 'bytes'}]},
+        {'name': 'extension', 'base': '', 'fields': [
+            {'name': 'type', 'type': 'uint16'},
+            {'name': 'data', 'type': 'bytes'}]},
+        {'name': 'transaction_header', 'base': '', 'fields': [
+            {'name': 'expiration', 'type': 'time_point_sec'},
+            {'name': 'ref_block_num', 'type': 'uint16'},
+            {'name': 'ref_block_prefix', 'type': 'uint32'},
+            {'name': 'max_net_usage_words', 'type': 'varuint32'},
+            {'name': 'max_cpu_usage_ms', 'type': 'uint8'},
+            {'name': 'delay_sec', 'type': 'varuint32'}]},
+        {'name': 'transaction', 'base': 'transaction_header', 'fields': [
+            {'name': 'context_free_actions', 'type': 'action[]'},
+            {'name': 'actions', 'type': 'action[]'},
+            {'name': 'transaction_extensions', 'type': 'extension[]'}]},
+    ],
+}
+
+TRANSACTION_DEFAULTS = dict(max_net_usage_words=0, max_cpu_usage_ms=0,
+                            delay_sec=0, context_free_actions=[],
+                            transaction_extensions=[])
+
+_transactions = AbiSerializer(TRANSACTION_ABI)
+
+
+def _inverse(x, m):
+    return pow(x, m - 2, m)
+
+
+# Jacobian coordinates, (x, y, 0) is the point at infinity
+
+def _double(point):
+    x, y, z = point
+    if not y or not z:
+        return 0, 1, 0
+    yy = y * y % P
+    s = 4 * x * yy % P
+    m = 3 * x * x % P
+    x3 = (m * m - 2 * s) % P
+    return x3, (m * (s - x3) - 8 * yy * yy) % P, 2 * y * z % P
+
+
+def _add_affine(point, affine):
+    """ Jacobian ``point`` plus the affine point ``affine``. """
+    x1, y1, z1 = point
+    if not z1:
+        return affine[0], affine[1], 1
+    zz = z1 * z1 % P
+    h = (affine[0] * zz - x1) % P
+    r = (affine[1] * z1 * zz - y1) % P
+    if not h:
+        return _double(point) if not r else (0, 1, 0)
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    return x3, (r * (v - x3) - y1 * hhh) % P, z1 * h % P
+
+
+def _to_affine(point):
+    x, y, z = point
+    zi = _inverse(z, P)
+    zi2 = zi * zi % P
+    return x * zi2 % P, y * zi2 * zi % P
+
+
+def _all_to_affine(points):
+    """ Many Jacobian points to affine, with a single inversion. """
+    products, product = [], 1
+    for _, _, z in points:
+        product = product * z % P
+        products.append(product)
+    inverse = _inverse(product, P)
+    affine = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        x, y, z = points[i]
+        zi = inverse * products[i - 1] % P if i else inverse
+        inverse = inverse * z % P
+        zi2 = zi * zi % P
+        affine[i] = (x * zi2 % P, y * zi2 * zi % P)
+    return affine
+
+
+_table = []
+
+
+def _base_table():
+    """ ``(j + 1) * 256**i * G`` for every byte position ``i`` and value
+    ``j``, and the negated sum of all ``256**i * G``.
+
+    Built on first use, it turns a multiplication of G into 32 additions.
+    """
+    if not _table:
+        base, offset = G, (0, 1, 0)
+        for _ in range(32):
+            offset = _add_affine(offset, base)
+            points = [(base[0], base[1], 1)]
+            for _ in range(255):
+                points.append(_add_affine(points[-1], base))
+            affine = _all_to_affine(points)
+            _table.append(affine)
+            base = affine[255]
+        x, y = _to_affine(offset)
+        _table.append((x, P - y))
+    return _table
+
+
+def multiply_base(scalar):
+    """ ``scalar * G`` as an affine point.
+
+    Every byte of the scalar, zero or not, costs one addition of a table
+    entry that is never the point at infinity, so the work done does not
+    depend on the value of the scalar. Python integers are not constant
+    time themselves; this only removes the branches on secret bytes.
+    """
+    table = _base_table()
+    data = scalar.to_bytes(32, 'little')
+    # the table holds (byte + 1) multiples, the offset takes the ones out
+    x, y = table[0][data[0]]
+    point = (x, y, 1)
+    for i in range(1, 32):
+        point = _add_affine(point, table[i][data[i]])
+    return _to_affine(_add_affine(point, table[32]))
+
+
+def _nonces(secret, digest, extra):
+    """ Deterministic nonces of RFC 6979, with ``extra`` data mixed in. """
+    x = secret.to_bytes(32, 'big')
+    h = (int.from_bytes(digest, 'big') % N).to_bytes(32, 'big')
+    k, v = b'\0' * 32, b'\1' * 32
+    k = hmac.new(k, v + b'\0' + x + h + extra, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b'\1' + x + h + extra, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    while True:
+        v = hmac.new(k, v, hashlib.sha256).digest()
+        nonce = int.from_bytes(v, 'big')
+        if 0 < nonce < N:
+            yield nonce
+        k = hmac.new(k, v + b'\0', hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+def _is_canonical(r, s):
+    """ Whether nodes accept the signature: r and s of exactly 32 bytes
+    each once DER encoded, i.e. both in ``[2**248, 2**255)``. """
+    return 2 ** 248 <= r < 2 ** 255 and 2 ** 248 <= s < 2 ** 255
+
+
+def sign_digest(secret, digest):
+    """ Canonical compact signature of a 32 byte digest, as ``SIG_K1_...``.
+
+    Like nodes do, nonces are drawn again with a counter mixed in until the
+    signature is canonical, which takes two tries on average.
+    """
+    e = int.from_bytes(digest, 'big')
+    attempt = 0
+    while True:
+        extra = attempt.to_bytes(32, 'big') if attempt else b''
+        attempt += 1
+        k = next(_nonces(secret, digest, extra))
+        x, y = multiply_base(k)
+        r = x % N
+        if not r:
+            continue
+        s = _inverse(k, N) * (e + r * secret) % N
+        if not s:
+            continue
+        recovery = (y & 1) | (2 if x >= N else 0)
+        if s > N // 2:
+            s, recovery = N - s, recovery ^ 1
+        if _is_canonical(r, s):
+            compact = bytes([27 + 4 + recovery]) + r.to_bytes(32, 'big') + \
+                s.to_bytes(32, 'big')
+            return bytes_to_signature(b'\0' + compact)
+
+
+def private_key_to_int(key):
+    """ WIF (``5...``) or ``PVT_K1_...`` private key to its secret. """
+    if key.startswith('PVT_'):
+        _, kind, text = key.split('_', 2)
+        if kind != 'K1':
+            raise ValueError('Only K1 private keys can be used to sign')
+        data = _decode_checked(text, b'K1')
+    else:
+        raw = base58_decode(key)
+        data, checksum = raw[:-4], raw[-4:]
+        digest = hashlib.sha256(hashlib.sha256(data).digest()).digest()
+        if data[:1] != b'\x80' or digest[:4] != checksum:
+            raise ValueError('Invalid private key')
+        data = data[1:]
+    secret = int.from_bytes(data, 'big')
+    if not 0 < secret < N or len(data) != 32:
+        raise ValueError('Invalid private key')
+    return secret
+
+
+def public_key(secret):
+    """ ``EOS...`` public key of a secret. """
+    x, y = multiply_base(secret)
+    return bytes_to_public_key(bytes([0, 2 + (y & 1)]) + x.to_bytes(32, 'big'))
+
+
+def pack_transaction(transaction):
+    """ Binary form of a transaction, action ``data`` given as hex. """
+    out = bytearray()
+    _transactions.compile('transaction')[0](
+        dict(TRANSACTION_DEFAULTS, **transaction), out)
+    return bytes(out)
+
+
+def _sign_digests(secrets, digests):
+    return [[sign_digest(secret, digest) for secret in secrets]
+            for digest in digests]
+
+
+class Signer(object):
+    """ Signs transactions in process, without a wallet.
+
+    Transactions are the usual dicts, with action ``data`` already packed to
+    hex, e.g. by :meth:`Client.transaction`. Signed transactions come back
+    in the packed form ``push_transaction`` and ``push_transactions`` take.
+
+    A signature costs about a millisecond of pure Python. :meth:`sign_many`
+    spreads large batches over a pool of ``processes`` processes, which
+    then hold the private keys too.
+
+    .. code-block:: python
+
+       signer = Signer([wif], chain_id=client.get_info()['chain_id'])
+       trxs = [client.transaction([transfer(i)]) for i in range(10000)]
+       for batch in chunks(signer.sign_many(trxs), 100):
+           client.push_transactions(batch)
+
+    Args:
+        keys (list): Private keys, as WIF or ``PVT_K1_...`` strings.
+        chain_id (str): Id of the chain the transactions are meant for.
+        processes (int): Size of the process pool, the number of CPUs if
+            None.
+    """
+
+    def __init__(self, keys, chain_id, processes=None):
+        if isinstance(keys, str):
+            keys = [keys]
+        self.chain_id = bytes.fromhex(chain_id)
+        self.keys = {}
+        for key in keys:
+            secret = private_key_to_int(key)
+            self.keys[public_key(secret)] = secret
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = None
+
+    @property
+    def public_keys(self):
+        return list(self.keys)
+
+    def _secrets(self, keys):
+        if keys is None:
+            return list(self.keys.values())
+        try:
+            return [self.keys[key] for key in keys]
+        except KeyError as e:
+            raise ValueError('No private key for %s' % e.args[0])
+
+    def digest(self, packed_trx, context_free_data=b''):
+        """ Digest a transaction is signed over. """
+        cfd_digest = hashlib.sha256(context_free_data).digest() \
+            if context_free_data else b'\0' * 32
+        return hashlib.sha256(self.chain_id + packed_trx + cfd_digest).digest()
+
+    @staticmethod
+    def _packed(packed_trx, signatures):
+        return dict(signatures=signatures, compression='none',
+                    packed_context_free_data='', packed_trx=packed_trx.hex())
+
+    def sign(self, transaction, keys=None):
+        """ Sign a transaction with ``keys``, public keys of the signer, all
+        of them if None. """
+        packed_trx = pack_transaction(transaction)
+        signatures = _sign_digests(self._secrets(keys),
+                                   [self.digest(packed_trx)])[0]
+        return self._packed(packed_trx, signatures)
+
+    def sign_many(self, transactions, keys=None, chunk=64):
+        """ Sign transactions in the process pool, ``chunk`` per task.
+
+        Packing stays in this process; digests go to the pool together with
+        the private keys, which are pickled to the worker processes with
+        every task. Use ``processes=1`` to keep keys in this process only.
+        """
+        secrets = self._secrets(keys)
+        packed = [pack_transaction(trx) for trx in transactions]
+        digests = [self.digest(trx) for trx in packed]
+        if len(digests) <= chunk or self.processes <= 1:
+            signatures = _sign_digests(secrets, digests)
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.processes)
+            signatures = []
+            chunks = [digests[i:i + chunk]
+                      for i in range(0, len(digests), chunk)]
+            for result in self._executor.map(
+                    _sign_digests, [secrets] * len(chunks), chunks):
+                signatures.extend(result)
+        return [self._packed(trx, sigs) for trx, sigs in zip(packed, signatures)]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
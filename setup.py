@@ -1,2 +1,14 @@
 #!/usr/bin/env python
-# -*- coding:utf-8 -*
\ No newline at end of file
+# -*- coding:utf-8 -*-
+from setuptools import find_packages, setup
+
+setup(
+    name='pyeos',
+    description='Python EOS Toolkit',
+    packages=find_packages(exclude=('tests', 'benchmarks', 'docs')),
+    install_requires=['certifi', 'urllib3'],
+    extras_require={
+        # AsyncHttpClient and AsyncClient
+        'async': ['aiohttp'],
+    },
+)
@@ -0,0 +1,78 @@
+# coding=utf-8
+""" A chain kept in memory that answers like a client, for stream tests. """
+import threading
+import time
+
+from eosbase.abi import format_time
+
+
+def block_id(block_num, branch=0):
+    return '%08x%056x' % (block_num, branch)
+
+
+class FakeChain(object):
+    """ Blocks ``1..head`` on branch 0; :meth:`fork` replaces the newest.
+
+    Transactions are given by id. With ``timed``, blocks are stamped with the time they were produced and
+    ``get_info`` reports ``head_block_time``.
+
+    .. code-block:: python
+
+       chain = FakeChain(head=10)
+       for block in BlockStream(chain, start_block=1, mode='head'): ...
+    """
+
+    def __init__(self, head=0, irreversible=0, timed=False):
+        self.timed = timed
+        self.blocks = {}
+        self.by_id = {}
+        self.head = 0
+        self.last_irreversible_block_num = irreversible
+        self.infos = 0
+        self.lock = threading.Lock()
+        self.produce(head)
+
+    def _add(self, block_num, branch, transactions=()):
+        block = dict(block_num=block_num,
+                     id=block_id(block_num, branch),
+                     previous=self.blocks[block_num - 1]['id']
+                     if block_num > 1 else block_id(0),
+                     timestamp=format_time(int(time.time() * 1e6))
+                     if self.timed else None,
+                     transactions=[{'status': 'executed', 'trx': trx_id}
+                                   for trx_id in transactions])
+        self.blocks[block_num] = block
+        self.by_id[block['id']] = block
+        self.head = max(self.head, block_num)
+
+    def produce(self, count=1, transactions=()):
+        with self.lock:
+            for _ in range(count):
+                self._add(self.head + 1, 0, transactions)
+
+    def fork(self, block_num, branch, head=None, transactions=()):
+        """ Replace the blocks from ``block_num`` on with those of
+        ``branch``, up to ``head``. """
+        with self.lock:
+            head = head or self.head
+            for num in range(block_num, self.head + 1):
+                self.blocks.pop(num)
+            self.head = block_num - 1
+            for num in range(block_num, head + 1):
+                self._add(num, branch,
+                          transactions if num == block_num else ())
+
+    def get_info(self, cached=True):
+        with self.lock:
+            self.infos += 1
+            return dict(head_block_num=self.head,
+                        last_irreversible_block_num=(
+                            self.last_irreversible_block_num),
+                        head_block_time=self.blocks[self.head]['timestamp']
+                        if self.head else None)
+
+    def get_block(self, block_num_or_id):
+        with self.lock:
+            if isinstance(block_num_or_id, str):
+                return self.by_id[block_num_or_id]
+            return self.blocks[block_num_or_id]
@@ -0,0 +1,78 @@
+# coding=utf-8
+""" A node on localhost that answers with canned results, for tests. """
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.do_POST()
+
+    def do_POST(self):
+        size = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(size) or b'null')
+        endpoint = self.path.rsplit('/', 1)[-1]
+        node = self.server.node
+        with node.lock:
+            node.calls.append((endpoint, body))
+        handler = node.handlers.get(endpoint)
+        if handler is None:
+            answer = (404, {'code': 404, 'message': 'Not Found'})
+        elif callable(handler):
+            answer = handler(body)
+        else:
+            answer = handler
+        status, result = answer[:2]
+        headers = answer[2] if len(answer) > 2 else {}
+
+        data = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeNode(object):
+    """ Answers each endpoint with ``(status, result[, headers])``, or with
+    what a handler called with the request body returns.
+
+    .. code-block:: python
+
+       with FakeNode(get_info=(200, INFO)) as node:
+           Client([node.url]).get_info()
+    """
+
+    def __init__(self, **handlers):
+        self.handlers = handlers
+        self.calls = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.node = self
+        self.url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def count(self, endpoint):
+        with self.lock:
+            return sum(1 for e, _ in self.calls if e == endpoint)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
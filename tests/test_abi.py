@@ -0,0 +1,146 @@
+# coding=utf-8
+import pytest
+
+from eosbase.abi import (
+    AbiError,
+    AbiSerializer,
+    format_asset,
+    format_time,
+    int_to_name,
+    name_to_int,
+    parse_asset,
+    parse_time,
+)
+
+TOKEN_ABI = {
+    'version': 'eosio::abi/1.0',
+    'types': [{'new_type_name': 'account_name', 'type': 'name'}],
+    'structs': [
+        {'name': 'transfer', 'base': '', 'fields': [
+            {'name': 'from', 'type': 'account_name'},
+            {'name': 'to', 'type': 'account_name'},
+            {'name': 'quantity', 'type': 'asset'},
+            {'name': 'memo', 'type': 'string'}]},
+        {'name': 'account', 'base': '', 'fields': [
+            {'name': 'balance', 'type': 'asset'}]},
+    ],
+    'actions': [{'name': 'transfer', 'type': 'transfer',
+                 'ricardian_contract': ''}],
+    'tables': [{'name': 'accounts', 'type': 'account', 'index_type': 'i64',
+                'key_names': [], 'key_types': []}],
+}
+
+TRANSFER = {'from': 'alice', 'to': 'bob', 'quantity': '1.0000 EOS',
+            'memo': 'hi'}
+# as abi_json_to_bin packs it
+TRANSFER_HEX = ('0000000000855c34'  # alice
+                '0000000000000e3d'  # bob
+                '1027000000000000'  # 10000
+                '04' '454f5300000000'  # 4,EOS
+                '02' '6869')  # "hi"
+
+
+@pytest.fixture
+def token():
+    return AbiSerializer(TOKEN_ABI)
+
+
+def test_pack_transfer(token):
+    assert token.pack_action('transfer', TRANSFER).hex() == TRANSFER_HEX
+
+
+def test_unpack_transfer(token):
+    assert token.unpack_action('transfer', TRANSFER_HEX) == TRANSFER
+
+
+def test_names():
+    assert name_to_int('eosio') == 0x5530ea0000000000
+    assert int_to_name(0x5530ea0000000000) == 'eosio'
+    assert int_to_name(name_to_int('eosio.token')) == 'eosio.token'
+    with pytest.raises(AbiError):
+        name_to_int('Alice')
+
+
+@pytest.mark.parametrize('text, parsed', [
+    ('1.0000 EOS', (10000, 4, 'EOS')),
+    ('-0.0100 EOS', (-100, 4, 'EOS')),
+    ('7 ABC', (7, 0, 'ABC')),
+])
+def test_assets(text, parsed):
+    assert parse_asset(text) == parsed
+    assert format_asset(*parsed) == text
+
+
+def test_times():
+    micros = parse_time('2018-06-01T12:00:00.500')
+    assert micros == 1527854400500000
+    assert format_time(micros) == '2018-06-01T12:00:00.500'
+    assert format_time(micros, fraction=False) == '2018-06-01T12:00:00'
+
+
+@pytest.mark.parametrize('type_name, value, data', [
+    ('int64', '-4294967296', '00000000ffffffff'),
+    ('int64', -5, 'fbffffffffffffff'),
+    ('uint64', '18446744073709551615', 'ffffffffffffffff'),
+    ('time_point_sec', '2018-06-01T12:00:00', '4035115b'),
+])
+def test_builtin_round_trip(token, type_name, value, data):
+    assert token.pack(type_name, value).hex() == data
+    assert token.unpack(type_name, data) == value
+
+
+@pytest.mark.parametrize('args', [
+    dict(TRANSFER, memo=5),
+    dict(TRANSFER, quantity=1),
+    dict(TRANSFER, extra=''),
+    {'from': 'alice', 'to': 'bob', 'quantity': '1.0000 EOS'},
+    'alice',
+])
+def test_invalid_args(token, args):
+    with pytest.raises(AbiError):
+        token.pack_action('transfer', args)
+
+
+def test_truncated(token):
+    with pytest.raises(AbiError):
+        token.unpack_action('transfer', TRANSFER_HEX[:-4])
+
+
+def test_out_of_range_values(token):
+    with pytest.raises(AbiError, match='transfer.quantity'):
+        token.pack_action('transfer', dict(
+            TRANSFER, quantity='99999999999999999999.0000 EOS'))
+    for type_name, value in (('uint8', 256), ('int64', 2 ** 63),
+                             ('uint128', -1), ('asset', '1e30 EOS')):
+        with pytest.raises(AbiError):
+            token.pack(type_name, value)
+
+
+def test_nested_field_path():
+    abi = AbiSerializer({'structs': [
+        {'name': 'inner', 'base': '', 'fields': [
+            {'name': 'count', 'type': 'uint16'}]},
+        {'name': 'outer', 'base': '', 'fields': [
+            {'name': 'inner', 'type': 'inner'}]},
+    ]})
+    with pytest.raises(AbiError, match=r'outer\.inner\.count'):
+        abi.pack('outer', {'inner': {'count': 70000}})
+
+
+@pytest.mark.parametrize('type_name, size', [
+    ('checksum160', 20), ('checksum256', 32), ('checksum512', 64),
+    ('public_key', 34), ('signature', 66), ('symbol', 8),
+    ('symbol_code', 8), ('int128', 16), ('uint128', 16), ('asset', 16),
+    ('float128', 16), ('uint64', 8),
+])
+def test_truncated_fixed_size(token, type_name, size):
+    with pytest.raises(AbiError, match='Truncated'):
+        token.unpack(type_name, b'\0' * (size - 1))
+
+
+def test_variant_index():
+    abi = AbiSerializer({'variants': [
+        {'name': 'value', 'types': ['uint8', 'string']}]})
+    assert abi.unpack('value', '0105616c696365') == ['string', 'alice']
+    with pytest.raises(AbiError, match='Invalid index 2 of variant value'):
+        abi.unpack('value', '0200')
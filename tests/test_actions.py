@@ -0,0 +1,57 @@
+# coding=utf-8
+import pytest
+
+from eosapi.httpapi.actions import ActionFilter, ActionStream
+
+
+def _action(account, name, *auths):
+    return {'account': account, 'name': name, 'data': '',
+            'authorization': [dict(zip(('actor', 'permission'),
+                                       auth.split('@')))
+                              for auth in auths]}
+
+
+TRANSFER = _action('eosio.token', 'transfer', 'alice@active')
+ISSUE = _action('eosio.token', 'issue', 'eosio@active')
+VOTE = _action('eosio', 'voteproducer', 'bob@owner')
+FAKE = _action('fake.token', 'transfer', 'alice@active')
+
+BLOCKS = [
+    {'block_num': 1, 'transactions': [
+        {'status': 'executed',
+         'trx': {'id': 'aa', 'transaction': {'actions': [TRANSFER, ISSUE]}}},
+        # deferred, only the id is in the block
+        {'status': 'executed', 'trx': 'bb'},
+    ]},
+    {'block_num': 2, 'transactions': []},
+    {'block_num': 3, 'transactions': [
+        {'status': 'executed',
+         'trx': {'id': 'cc', 'transaction': {'actions': [VOTE, FAKE]}}},
+    ]},
+]
+
+
+@pytest.mark.parametrize('kwargs, matched', [
+    ({}, [TRANSFER, ISSUE, VOTE, FAKE]),
+    (dict(contract='eosio.token'), [TRANSFER, ISSUE]),
+    (dict(action='transfer'), [TRANSFER, FAKE]),
+    (dict(contract='eosio.token', action='transfer'), [TRANSFER]),
+    (dict(authorizer=['bob', 'eosio@active']), [ISSUE, VOTE]),
+    (dict(authorizer='alice@owner'), []),
+    (dict(receiver='eosio'), [VOTE]),
+    (dict(contract='eosio', receiver='eosio.token'), []),
+])
+def test_filters(kwargs, matched):
+    stream = ActionStream(BLOCKS, ActionFilter(**kwargs))
+    assert [m.action for m in stream] == matched
+    assert stream.stats() == dict(actions_scanned=4,
+                                  actions_matched=len(matched))
+
+
+def test_matched_action():
+    stream = ActionStream(BLOCKS, ActionFilter(action='voteproducer'))
+    matched, = list(stream)
+    assert matched.index == 0
+    assert matched.trx_id == 'cc'
+    assert matched.block['block_num'] == 3
+    assert matched.transaction['transaction']['actions'][1] == FAKE
@@ -0,0 +1,47 @@
+# coding=utf-8
+import asyncio
+
+import pytest
+
+from eosapi.httpapi.client import AsyncClient
+from tests.fakenode import FakeNode
+
+INFO = {'head_block_num': 10, 'last_irreversible_block_num': 8}
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(hedge=True), dict(broadcast=2), dict(coalesce=True),
+    dict(rate_limit=10), dict(adaptive_concurrency=True),
+])
+def test_unsupported_features(kwargs):
+    with pytest.raises(TypeError):
+        AsyncClient(['http://localhost:8888'], **kwargs)
+
+
+def test_disabled_features_are_accepted():
+    AsyncClient(['http://localhost:8888'], hedge=False, rate_limit=None)
+
+
+def test_fails_over():
+    async def main(urls):
+        async with AsyncClient(urls, retry_base_delay=0.01) as client:
+            return await asyncio.gather(
+                *(client.get_info() for _ in range(4)))
+
+    with FakeNode(get_info=(503, {})) as down, \
+            FakeNode(get_info=(200, INFO)) as up:
+        assert _run(main([down.url, up.url])) == [INFO] * 4
+        assert up.count('get_info') == 4
+
+
+def test_accepted_push():
+    async def main(url):
+        async with AsyncClient([url]) as client:
+            return await client.push_transaction({'signatures': []})
+
+    with FakeNode(push_transaction=(202, {'transaction_id': 'ab'})) as node:
+        assert _run(main(node.url)) == {'transaction_id': 'ab'}
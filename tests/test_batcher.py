@@ -0,0 +1,68 @@
+# coding=utf-8
+import pytest
+
+from eosapi.httpapi.batcher import _rejection
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.exceptions import TransactionRejected
+from tests.fakenode import FakeNode
+
+SIGNED = {'signatures': [], 'compression': 'none',
+          'packed_context_free_data': ''}
+TRX_ID = '0e501d37ba715c227662703d53f2416e51c60809c6501a89659df614bbf5d715'
+
+
+@pytest.mark.parametrize('result', [
+    {'transaction_id': TRX_ID, 'processed': {'id': TRX_ID}},
+    {'transaction_id': TRX_ID, 'processed': {'except': None, 'error': None}},
+])
+def test_accepted(result):
+    assert _rejection(result) is None
+
+
+@pytest.mark.parametrize('result, reason', [
+    ({'error': {'code': 3040008}}, {'code': 3040008}),
+    ({'transaction_id': TRX_ID, 'processed': {'except': 'expired'}},
+     'expired'),
+    ({'transaction_id': TRX_ID, 'processed': {'error': 'net usage'}},
+     'net usage'),
+    ({'transaction_id': '0' * 64, 'processed': {}}, 'no transaction id'),
+    ({'processed': {}}, 'no transaction id'),
+    (None, 'unexpected result None'),
+])
+def test_rejected(result, reason):
+    assert _rejection(result) == reason
+
+
+def _results(body):
+    return 202, [{'transaction_id': trx['packed_trx'].rjust(64, '1'),
+                  'processed': {}} for trx in body]
+
+
+def test_batches_accepted():
+    with FakeNode(push_transactions=_results) as node:
+        client = Client([node.url])
+        with client.batcher(max_count=10, linger=0.05) as batcher:
+            futures = [batcher.submit(dict(SIGNED, packed_trx='%02x' % i))
+                       for i in range(25)]
+        ids = [f.result(timeout=5)['transaction_id'] for f in futures]
+        assert ids == [('%02x' % i).rjust(64, '1') for i in range(25)]
+        assert node.count('push_transactions') == 3
+        assert batcher.stats()['rejected'] == 0
+
+
+def test_batch_rejects_one():
+    def results(body):
+        status, results = _results(body)
+        results[1]['processed'] = {'except': {'name': 'tx_cpu_usage_exceeded'}}
+        return status, results
+
+    with FakeNode(push_transactions=results) as node:
+        client = Client([node.url])
+        with client.batcher(linger=0.01) as batcher:
+            futures = [batcher.submit(dict(SIGNED, packed_trx='%02x' % i))
+                       for i in range(3)]
+        assert futures[0].result(timeout=5)
+        with pytest.raises(TransactionRejected) as e:
+            futures[1].result(timeout=5)
+        assert e.value.reason == {'name': 'tx_cpu_usage_exceeded'}
+        assert futures[2].result(timeout=5)
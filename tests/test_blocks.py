@@ -0,0 +1,63 @@
+# coding=utf-8
+import hashlib
+import os
+
+from eosapi.store.blocks import BlockStore
+
+
+def _block(num, transactions=2, salt=''):
+    block_id = '%08x' % num + hashlib.sha256(
+        ('%d%s' % (num, salt)).encode()).hexdigest()[8:]
+    return dict(block_num=num, id=block_id, transactions=[
+        {'status': 'executed', 'trx': {'id': hashlib.sha256(
+            ('%d-%d%s' % (num, i, salt)).encode()).hexdigest()}}
+        for i in range(transactions)])
+
+
+def test_block_store_reopen(tmp_path):
+    path = str(tmp_path / 'blocks')
+    blocks = [_block(n) for n in range(100, 150)]
+    with BlockStore(path, segment_size=2048) as store:
+        store.put_many(blocks)
+        assert store.stats()['segments'] > 1
+
+    with BlockStore(path, segment_size=2048) as store:
+        for block in blocks:
+            assert store.get(block['block_num']) == block
+            assert store.get(block['id']) == block
+        assert store.get(99) is None
+        assert store.get(150) is None
+        assert store.get(_block(120, salt='fork')['id']) is None
+
+
+def test_block_store_repoint(tmp_path):
+    path = str(tmp_path / 'blocks')
+    with BlockStore(path) as store:
+        store.put_many([_block(n) for n in range(10, 20)])
+        forked = _block(15, salt='fork')
+        store.put(forked)
+        # blocks below the first one extend the index downwards
+        store.put(_block(5))
+    with BlockStore(path) as store:
+        assert store.get(15) == forked
+        assert store.get(5) == _block(5)
+        assert store.get(7) is None
+        assert store.get(19) == _block(19)
+
+
+def test_block_store_recovery(tmp_path):
+    path = str(tmp_path / 'blocks')
+    with BlockStore(path) as store:
+        store.put_many([_block(n) for n in range(1, 11)])
+
+    # a crash after the index was written, but before the segment was
+    segment = os.path.join(path, 'blocks-000000.seg')
+    with open(segment, 'r+b') as f:
+        f.truncate(os.path.getsize(segment) - 1)
+
+    with BlockStore(path) as store:
+        assert 10 not in store
+        assert store.get(10) is None
+        assert store.get(9) == _block(9)
+        store.put(_block(10))
+        assert store.get(10) == _block(10)
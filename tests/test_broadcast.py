@@ -0,0 +1,42 @@
+# coding=utf-8
+import time
+
+from eosapi.httpapi.client import Client
+from tests.fakenode import FakeNode
+
+SIGNED = {'signatures': [], 'compression': 'none',
+          'packed_context_free_data': '', 'packed_trx': '00'}
+TRX_ID = '6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d'
+ACCEPTED = (202, {'transaction_id': TRX_ID, 'processed': {}})
+DUPLICATE = (500, {'code': 500, 'message': 'Internal Service Error',
+                   'error': {'code': 3040008, 'name': 'tx_duplicate'}})
+
+
+def test_broadcast_accepted():
+    with FakeNode(push_transaction=ACCEPTED) as a, \
+            FakeNode(push_transaction=ACCEPTED) as b:
+        client = Client([a.url, b.url], broadcast=True)
+        assert client.push_transaction(SIGNED)['transaction_id'] == TRX_ID
+        stats = client.broadcast_stats()
+        assert stats['broadcasts'] == 1
+        assert sum(stats['first_acks'].values()) == 1
+
+        # the slower node is recorded once it answers too
+        deadline = time.monotonic() + 2
+        while len(client.broadcast_stats()['outcomes']) < 2 and \
+                time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.broadcast_stats()['outcomes'] == {
+            a.url: {'accepted': 1}, b.url: {'accepted': 1}}
+        assert a.count('push_transaction') == b.count('push_transaction') == 1
+
+
+def test_broadcast_duplicates():
+    with FakeNode(push_transaction=DUPLICATE) as a, \
+            FakeNode(push_transaction=DUPLICATE) as b:
+        client = Client([a.url, b.url], broadcast=True)
+        result = client.push_transaction(SIGNED)
+        assert result == dict(transaction_id=TRX_ID, processed=None,
+                              duplicate=True)
+        assert client.broadcast_stats()['outcomes'] == {
+            a.url: {'duplicate': 1}, b.url: {'duplicate': 1}}
@@ -0,0 +1,68 @@
+# coding=utf-8
+import json
+
+from eosapi.httpapi import cache
+from eosapi.httpapi.cache import ResponseCache
+from eosapi.httpapi.client import Client
+from tests.fakenode import FakeNode
+
+
+def test_lru_by_size():
+    responses = ResponseCache(max_bytes=100)
+    responses.put(('a', 1), 'one', 40)
+    responses.put(('a', 2), 'two', 40)
+    assert responses.get(('a', 1)) == (True, 'one')
+    responses.put(('a', 3), 'three', 40)
+    # the least recently used entry made room
+    assert responses.get(('a', 2)) == (False, None)
+    assert responses.size == 80 and responses.evictions == 1
+    responses.put(('a', 4), 'too large', 101)
+    assert len(responses) == 2
+    assert responses.stats()['endpoints']['a'] == dict(hits=1, misses=1)
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    responses = ResponseCache()
+    responses.put(('get_info', None), {}, 10, ttl=0.5)
+    assert responses.get(('get_info', None))[0]
+    now[0] += 0.5
+    assert not responses.get(('get_info', None))[0]
+    assert responses.size == 0
+
+
+ACCOUNT = {'account_name': 'alice', 'ram_quota': 8192, 'permissions': []}
+
+
+def test_entry_size_is_the_body_size():
+    with FakeNode(get_account=(200, ACCOUNT)) as node:
+        client = Client([node.url], cache=True)
+        assert client.get_account('alice') == ACCOUNT
+        assert client.get_account('alice') == ACCOUNT
+        assert node.count('get_account') == 1
+        assert client.cache.size == len(json.dumps(ACCOUNT))
+
+
+def test_code_is_cached_without_its_abi():
+    abis = [{'version': 'eosio::abi/1.0'}, {'version': 'eosio::abi/1.1'}]
+    code_hash = 'ab' * 32
+
+    def get_code(body):
+        return 200, {'account_name': body['account_name'],
+                     'code_hash': code_hash, 'wasm': '0061736d',
+                     'abi': abis[0]}
+
+    with FakeNode(get_code=get_code,
+                  get_code_hash=(200, {'account_name': 'alice',
+                                       'code_hash': code_hash}),
+                  get_abi=lambda body: (200, {'account_name': 'alice',
+                                              'abi': abis[0]})) as node:
+        client = Client([node.url], cache=True)
+        assert client.get_code('alice')['abi'] == abis[0]
+        abis.pop(0)
+        # same code, new ABI
+        code = client.get_code('alice')
+        assert code['abi'] == abis[0]
+        assert code['wasm'] == '0061736d'
+        assert node.count('get_code') == 1
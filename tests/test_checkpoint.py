@@ -0,0 +1,61 @@
+# coding=utf-8
+import json
+
+import pytest
+
+from eosapi.httpapi.checkpoint import Checkpoint
+from eosapi.httpapi.exceptions import CheckpointMismatch
+from eosapi.httpapi.streaming import BlockStream
+from tests.fakechain import FakeChain, block_id
+
+
+def test_checkpoint_writes(tmpdir):
+    path = str(tmpdir.join('stream.json'))
+    checkpoint = Checkpoint(path, interval=3, max_age=60)
+    checkpoint.mark(1, 'a')
+    checkpoint.mark(2, 'b')
+    assert checkpoint.writes == 0
+    checkpoint.mark(3, 'c')
+    assert checkpoint.writes == 1
+    checkpoint.mark(4, 'd')
+    checkpoint.flush()
+    checkpoint.flush()
+    assert checkpoint.writes == 2
+    with open(path) as f:
+        assert json.load(f)['block_num'] == 4
+    assert Checkpoint(path).load() == (4, 'd')
+    assert not tmpdir.join('stream.json.tmp').exists()
+
+
+def test_resume(tmpdir):
+    path = str(tmpdir.join('stream.json'))
+    chain = FakeChain(head=20)
+    with BlockStream(chain, start_block=1, mode='head',
+                     checkpoint=path) as stream:
+        for block in stream:
+            if block['block_num'] == 7:
+                break
+    # block 7 was yielded but never acknowledged by a next()
+    assert Checkpoint(path).block_num == 6
+
+    with BlockStream(chain, mode='head', checkpoint=path) as stream:
+        assert next(stream)['block_num'] == 7
+
+
+def test_resume_after_fork(tmpdir):
+    path = str(tmpdir.join('stream.json'))
+    chain = FakeChain(head=20)
+    with BlockStream(chain, start_block=1, mode='head',
+                     checkpoint=path) as stream:
+        for _ in range(11):
+            next(stream)
+    assert Checkpoint(path).load() == (10, block_id(10))
+
+    # the checkpointed block was orphaned while the stream was down
+    chain.fork(9, branch=1)
+    with BlockStream(chain, mode='head', checkpoint=path) as stream:
+        with pytest.raises(CheckpointMismatch) as e:
+            next(stream)
+    assert e.value.block_num == 10
+    assert e.value.block_id == block_id(10)
+    assert e.value.previous == block_id(10, 1)
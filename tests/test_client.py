@@ -0,0 +1,44 @@
+# coding=utf-8
+import pytest
+
+from eosapi.httpapi.client import Client
+from eosbase.abi import AbiError
+from tests.fakenode import FakeNode
+from tests.test_abi import TOKEN_ABI, TRANSFER, TRANSFER_HEX
+
+
+def test_local_abi():
+    with FakeNode(get_abi=(200, {'account_name': 'eosio.token',
+                                 'abi': TOKEN_ABI})) as node:
+        client = Client([node.url])
+        assert client.abi_json_to_bin('eosio.token', 'transfer', TRANSFER) \
+            == {'binargs': TRANSFER_HEX}
+        assert client.abi_bin_to_json('eosio.token', 'transfer',
+                                      TRANSFER_HEX) == {'args': TRANSFER}
+        assert node.count('get_abi') == 1
+
+
+def test_bad_values_are_not_retried():
+    with FakeNode(get_abi=(200, {'account_name': 'eosio.token',
+                                 'abi': TOKEN_ABI})) as node:
+        client = Client([node.url])
+        with pytest.raises(AbiError):
+            client.abi_json_to_bin('eosio.token', 'transfer',
+                                   dict(TRANSFER, quantity='1 eos'))
+        with pytest.raises(AbiError):
+            client.abi_bin_to_json('eosio.token', 'transfer',
+                                   TRANSFER_HEX[:-8])
+        assert node.count('get_abi') == 1
+        assert node.count('abi_json_to_bin') == 0
+
+
+def test_unknown_action_asks_the_node():
+    with FakeNode(get_abi=(200, {'account_name': 'eosio.token',
+                                 'abi': TOKEN_ABI}),
+                  abi_json_to_bin=(200, {'binargs': '00'})) as node:
+        client = Client([node.url])
+        assert client.abi_json_to_bin('eosio.token', 'issue', {}) == \
+            {'binargs': '00'}
+        # the ABI may have changed, it is fetched again next time
+        client.abi_json_to_bin('eosio.token', 'transfer', TRANSFER)
+        assert node.count('get_abi') == 2
@@ -0,0 +1,51 @@
+# coding=utf-8
+import json
+
+import pytest
+
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.codec import CODECS, StdlibCodec, get_codec
+from tests.fakenode import FakeNode
+
+BLOCK = {'block_num': 5, 'id': '00000005' + 'ab' * 28,
+         'transactions': [{'status': 'executed', 'trx': {'id': 'cd' * 32}}],
+         'memo': 'héllo', 'ram': 18446744073709551615}
+
+
+@pytest.mark.parametrize('name', sorted(CODECS))
+def test_round_trip(name):
+    codec = CODECS[name]
+    data = codec.dumps(BLOCK)
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == BLOCK
+    assert json.loads(data.decode('utf-8')) == BLOCK
+
+
+@pytest.mark.parametrize('name', sorted(CODECS))
+def test_wide_integers(name):
+    # larger than any 64 bit integer
+    assert CODECS[name].loads(b'{"v":340282366920938463463374607431768211455}'
+                              ) == {'v': 2 ** 128 - 1}
+
+
+def test_get_codec():
+    assert get_codec('json') is StdlibCodec
+    assert get_codec().name in CODECS
+    with pytest.raises(ValueError):
+        get_codec('simplejson')
+
+    class Custom(object):
+        loads = StdlibCodec.loads
+        dumps = StdlibCodec.dumps
+
+    assert get_codec(Custom) is Custom
+
+
+@pytest.mark.parametrize('name', sorted(CODECS))
+def test_client_codec(name):
+    with FakeNode(get_block=lambda body: (200, dict(
+            BLOCK, block_num=int(body['block_num_or_id'])))) as node:
+        client = Client([node.url], json_codec=name)
+        assert client.codec is CODECS[name]
+        assert client.get_block(5) == BLOCK
+        assert node.calls == [('get_block', {'block_num_or_id': 5})]
@@ -0,0 +1,56 @@
+# coding=utf-8
+import threading
+import time
+
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.exceptions import HttpAPIError
+from tests.fakenode import FakeNode
+
+
+class Blocks(object):
+    """ ``get_block`` that counts the calls in flight; block 13 fails. """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.most = 0
+
+    def __call__(self, body):
+        num = int(body['block_num_or_id'])
+        with self.lock:
+            self.in_flight += 1
+            self.most = max(self.most, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        if num == 13:
+            return 400, {'code': 400, 'message': 'unknown block'}
+        return 200, {'block_num': num}
+
+
+def test_exec_many():
+    blocks = Blocks()
+    with FakeNode(get_block=blocks) as node:
+        client = Client([node.url], max_retries=0)
+        results = client.exec_many(
+            [('chain', 'get_block', {'block_num_or_id': n})
+             for n in range(1, 21)] +
+            [dict(api='chain', endpoint='get_block',
+                  body={'block_num_or_id': 21})],
+            concurrency=4)
+    assert len(results) == 21
+    assert isinstance(results[12], HttpAPIError)
+    assert [r['block_num'] for i, r in enumerate(results) if i != 12] == \
+        [n for n in range(1, 22) if n != 13]
+    assert 1 < blocks.most <= 4
+
+
+def test_get_blocks_and_accounts():
+    with FakeNode(get_block=Blocks(),
+                  get_account=lambda body: (200, body)) as node:
+        client = Client([node.url], max_retries=0)
+        assert [b['block_num'] for b in client.get_blocks([3, 1, 2])] == \
+            [3, 1, 2]
+        assert client.get_accounts(['bob', 'alice']) == \
+            [{'account_name': 'bob'}, {'account_name': 'alice'}]
+        assert client.get_blocks([]) == []
@@ -0,0 +1,77 @@
+# coding=utf-8
+import time
+
+import pytest
+
+from eosapi.httpapi.exceptions import TransactionExpired
+from eosapi.httpapi.finality import (
+    EXPIRED,
+    INCLUDED,
+    IRREVERSIBLE,
+    UNDONE,
+    FinalityTracker,
+)
+from tests.fakechain import FakeChain, block_id
+
+TRX_ID = 'ab' * 32
+
+
+def _wait(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_finality_after_an_undo():
+    chain = FakeChain(head=5)
+    events = []
+    with FinalityTracker(chain, start_block=1, poll_delay=0.01,
+                         max_poll_interval=0.02) as tracker:
+        tracked = tracker.track(
+            TRX_ID, callback=lambda event, t: events.append(
+                (event, t.block_num)))
+        chain.produce(transactions=[TRX_ID])
+        assert tracked.included.result(5)['block_id'] == block_id(6)
+
+        # a fork drops block 6, the transaction makes it into block 7
+        chain.fork(6, branch=1, head=6)
+        chain.produce(transactions=[TRX_ID])
+        _wait(lambda: tracked.block_num == 7)
+        assert not tracked.irreversible.done()
+
+        chain.last_irreversible_block_num = 7
+        chain.produce()
+        final = tracked.irreversible.result(5)
+        stats = tracker.stats()
+
+    assert final == dict(transaction_id=TRX_ID, block_num=7,
+                         block_id=block_id(7))
+    # a future resolves once: included still names the undone block
+    assert tracked.included.result()['block_num'] == 6
+    assert events == [(INCLUDED, 6), (UNDONE, None), (INCLUDED, 7),
+                      (IRREVERSIBLE, 7)]
+    assert stats['pending'] == 0
+    assert stats[INCLUDED] == 2 and stats[UNDONE] == 1
+    assert stats['stream']['forks'] == 1
+
+
+def test_expired():
+    chain = FakeChain(head=3, timed=True)
+    with FinalityTracker(chain, start_block=1, poll_delay=0.01,
+                         max_poll_interval=0.02) as tracker:
+        tracked = tracker.track(TRX_ID, expiration=time.time() - 1)
+        chain.produce()
+        with pytest.raises(TransactionExpired):
+            tracked.irreversible.result(5)
+        assert tracker.stats()[EXPIRED] == 1
+
+
+def test_close_cancels():
+    chain = FakeChain(head=3)
+    tracker = FinalityTracker(chain, start_block=1, poll_delay=0.01).start()
+    tracked = tracker.track(TRX_ID)
+    tracker.close()
+    assert tracked.included.cancelled() and tracked.irreversible.cancelled()
+    with pytest.raises(RuntimeError):
+        tracker.track(TRX_ID)
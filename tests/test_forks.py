@@ -0,0 +1,67 @@
+# coding=utf-8
+import pytest
+
+from eosapi.httpapi.exceptions import ForkTooDeep
+from eosapi.httpapi.streaming import APPLY, UNDO, ForkAwareStream
+from tests.fakechain import FakeChain, block_id
+
+
+def _events(stream, count):
+    return [(action, block['id']) for action, block in
+            (next(stream) for _ in range(count))]
+
+
+def test_fork_undo_and_reapply():
+    chain = FakeChain(head=10)
+    with ForkAwareStream(chain, start_block=1, poll_delay=0.01) as stream:
+        assert _events(stream, 10) == \
+            [(APPLY, block_id(n)) for n in range(1, 11)]
+
+        # blocks 8 to 10 are replaced by a longer branch
+        chain.fork(8, branch=1, head=12)
+        assert _events(stream, 8) == [
+            (UNDO, block_id(10)), (UNDO, block_id(9)), (UNDO, block_id(8)),
+            (APPLY, block_id(8, 1)), (APPLY, block_id(9, 1)),
+            (APPLY, block_id(10, 1)), (APPLY, block_id(11, 1)),
+            (APPLY, block_id(12, 1))]
+        stats = stream.stats()
+    assert stats['forks'] == 1
+    assert stats['undone'] == stats['deepest_fork'] == 3
+
+
+def test_replayed_events_link_up():
+    chain = FakeChain(head=6)
+    with ForkAwareStream(chain, start_block=1, poll_delay=0.01) as stream:
+        applied = []
+        for _ in range(6):
+            applied.append(next(stream).block)
+        chain.fork(5, branch=1, head=7)
+        chain.fork(7, branch=2, head=8)
+        while applied[-1]['block_num'] < 8:
+            action, block = next(stream)
+            if action == UNDO:
+                assert applied.pop() == block
+            else:
+                assert block['previous'] == applied[-1]['id']
+                applied.append(block)
+    assert [block['id'] for block in applied] == \
+        [block_id(n) for n in range(1, 5)] + \
+        [block_id(5, 1), block_id(6, 1), block_id(7, 2), block_id(8, 2)]
+
+
+def test_fork_too_deep():
+    chain = FakeChain(head=10)
+    with ForkAwareStream(chain, start_block=1, window=3,
+                         poll_delay=0.01) as stream:
+        _events(stream, 10)
+        assert stream.stats()['reversible'] == 3
+        chain.fork(5, branch=1, head=11)
+        with pytest.raises(ForkTooDeep):
+            next(stream)
+
+
+def test_irreversible_blocks_are_forgotten():
+    chain = FakeChain(head=10, irreversible=7)
+    with ForkAwareStream(chain, start_block=1, poll_delay=0.01) as stream:
+        _events(stream, 10)
+        assert stream.stats()['reversible'] == 4
@@ -0,0 +1,49 @@
+# coding=utf-8
+import time
+
+import pytest
+
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.hedging import HedgePolicy
+from tests.fakenode import FakeNode
+
+INFO = {'head_block_num': 10, 'last_irreversible_block_num': 8}
+
+
+def test_pushes_are_never_hedged():
+    with pytest.raises(ValueError):
+        HedgePolicy(endpoints=['get_info', 'push_transaction'])
+    assert not HedgePolicy().applies('push_transactions')
+
+
+def test_percentile_delay():
+    policy = HedgePolicy(delay='p90', min_samples=20, fallback_delay=0.3)
+    assert policy.delay() == 0.3
+    for i in range(32):
+        policy.observe((i % 10) / 100)
+    # the 29th of 32 sorted latencies
+    assert policy.delay() == 0.08
+    assert HedgePolicy(delay=0.02).delay() == 0.02
+
+
+def test_slow_node_is_hedged():
+    def slow(body):
+        time.sleep(1)
+        return 200, dict(INFO, head_block_num=9)
+
+    with FakeNode(get_info=slow) as slow_node, \
+            FakeNode(get_info=(200, INFO)) as fast_node:
+        client = Client([slow_node.url, fast_node.url], hedge=True,
+                        hedge_delay=0.05)
+        start = time.monotonic()
+        assert client.get_info(cached=False) == INFO
+        assert time.monotonic() - start < 0.8
+        assert slow_node.count('get_info') == fast_node.count('get_info') == 1
+        stats = client.hedging.stats()
+        assert stats['fired'] == stats['wins'] == 1
+
+        # a push goes to one node only
+        with pytest.raises(Exception):
+            client.push_transaction({})
+        assert fast_node.count('push_transaction') + \
+            slow_node.count('push_transaction') == 1
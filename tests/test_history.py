@@ -0,0 +1,65 @@
+# coding=utf-8
+import threading
+
+import pytest
+
+from eosapi.httpapi.history import ActionHistory
+
+
+class Node(object):
+    """ ``get_actions`` of an account with ``count`` actions, returning
+    ``cap`` of them per call at most. """
+
+    def __init__(self, count, cap=None, fail_at=None):
+        self.count = count
+        self.cap = cap
+        self.fail_at = fail_at
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_actions(self, account_name, pos, offset):
+        with self.lock:
+            self.calls.append((pos, offset))
+            if pos == self.fail_at:
+                self.fail_at = None
+                raise IOError('node went away')
+        if pos == -1:
+            first, last = self.count + offset, self.count - 1
+        else:
+            first, last = pos, min(pos + offset, self.count - 1)
+        if self.cap:
+            last = min(last, first + self.cap - 1)
+        return {'actions': [{'account_action_seq': seq}
+                            for seq in range(max(first, 0), last + 1)]}
+
+
+def _seqs(history):
+    return [action['account_action_seq'] for action in history]
+
+
+def test_history():
+    node = Node(250)
+    history = ActionHistory(node, 'alice', window=100, concurrency=2)
+    assert _seqs(history) == list(range(250))
+    assert history.next_seq == 250
+    assert sorted(node.calls) == [(-1, -1), (0, 99), (100, 99), (200, 49)]
+
+
+def test_short_windows():
+    node = Node(250, cap=30)
+    history = ActionHistory(node, 'alice', start=10, window=100)
+    assert _seqs(history) == list(range(10, 250))
+    assert (40, 69) in node.calls
+
+
+def test_resume_after_error():
+    node = Node(300, fail_at=100)
+    history = ActionHistory(node, 'alice', end=199, window=50)
+    seqs = []
+    with pytest.raises(IOError):
+        for action in history:
+            seqs.append(action['account_action_seq'])
+    assert seqs == list(range(100))
+    seqs.extend(_seqs(history))
+    assert seqs == list(range(200))
+    history.close()
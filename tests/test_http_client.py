@@ -0,0 +1,28 @@
+# coding=utf-8
+import pytest
+
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.exceptions import HttpAPIError
+from tests.fakenode import FakeNode
+
+SIGNED = {'signatures': [], 'compression': 'none',
+          'packed_context_free_data': '', 'packed_trx': '00'}
+TRX_ID = '6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d'
+
+
+def test_accepted_push():
+    # nodes answer pushes with 202 Accepted
+    accepted = (202, {'transaction_id': TRX_ID, 'processed': {}})
+    with FakeNode(push_transaction=accepted) as node:
+        client = Client([node.url])
+        assert client.push_transaction(SIGNED)['transaction_id'] == TRX_ID
+        assert node.calls == [('push_transaction', SIGNED)]
+
+
+@pytest.mark.parametrize('status', [400, 500])
+def test_error_status(status):
+    with FakeNode(get_info=(status, {'code': status})) as node:
+        client = Client([node.url], max_retries=0)
+        with pytest.raises(HttpAPIError) as e:
+            client.get_info()
+        assert e.value.status_code == status
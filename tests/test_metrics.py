@@ -0,0 +1,48 @@
+# coding=utf-8
+import json
+
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.metrics import Histogram, Metrics
+from tests.fakenode import FakeNode
+
+INFO = {'head_block_num': 10, 'last_irreversible_block_num': 8}
+
+
+def test_histogram():
+    hist = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value)
+    assert hist.as_dict() == dict(count=4, sum=3.65,
+                                  buckets={0.1: 2, 1.0: 3, '+Inf': 4})
+
+
+def test_prometheus():
+    metrics = Metrics()
+    metrics.observe_request('http://a"b', 'get_info', 0.02, 200, 0, 100)
+    metrics.observe_error('http://a"b', 'get_info', TimeoutError())
+    metrics.observe_retry('get_info')
+    text = metrics.prometheus()
+    assert '# TYPE eosapi_request_duration_seconds histogram' in text
+    assert 'eosapi_request_duration_seconds_bucket{endpoint="get_info",' \
+        'le="0.025"} 1' in text
+    assert 'eosapi_node_errors_total{node="http://a\\"b"} 1' in text
+    assert 'eosapi_errors_total{endpoint="get_info",error="TimeoutError"} 1' \
+        in text
+    assert 'eosapi_retries_total{endpoint="get_info"} 1' in text
+
+
+def test_client_metrics():
+    with FakeNode(get_info=(503, {})) as down, \
+            FakeNode(get_info=(200, INFO)) as up:
+        client = Client([down.url, up.url], retry_base_delay=0.01)
+        client.get_info(cached=False)
+        snapshot = client.metrics_snapshot()
+
+    endpoint = snapshot['endpoints']['get_info']
+    assert endpoint['statuses'] == {503: 1, 200: 1}
+    assert endpoint['retries'] == 1
+    assert endpoint['latency']['count'] == 2
+    assert endpoint['decode']['count'] == 1
+    assert endpoint['response_bytes'] == len(json.dumps(INFO)) + 2
+    assert snapshot['node_switches'] == 1
+    assert snapshot['nodes'][down.url]['switched_away'] == 1
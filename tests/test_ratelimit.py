@@ -0,0 +1,86 @@
+# coding=utf-8
+import pytest
+
+from eosapi.httpapi import ratelimit
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.exceptions import RateLimitTimeout
+from eosapi.httpapi.ratelimit import (
+    SUCCESS,
+    THROTTLED,
+    AIMDLimiter,
+    RateLimiter,
+    TokenBucket,
+)
+from tests.fakenode import FakeNode
+
+
+class Clock(object):
+    """ ``time`` whose sleeps pass instantly, a microsecond at least. """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 1e-6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    return clock
+
+
+def test_token_bucket(clock):
+    bucket = TokenBucket(rate=10, burst=2)
+    start = clock.now
+    for _ in range(12):
+        assert bucket.acquire(expires=clock.now + 1)
+    # two from the burst, then one every 100ms
+    assert clock.now - start == pytest.approx(1.0, abs=1e-4)
+    assert not bucket.acquire(expires=clock.now + 0.05)
+
+
+def test_aimd(clock):
+    limiter = AIMDLimiter(initial=4, maximum=5, decrease_interval=1.0)
+    for _ in range(4):
+        assert limiter.acquire(clock.now + 1)
+    assert not limiter.acquire(clock.now)
+    for _ in range(4):
+        limiter.release(SUCCESS)
+    assert limiter.limit == pytest.approx(4.9, abs=0.05)
+
+    for _ in range(2):
+        limiter.acquire(clock.now)
+        limiter.release(THROTTLED)
+    # a burst of rejections halves the limit once
+    assert limiter.limit == pytest.approx(2.45, abs=0.05)
+    clock.now += 1
+    limiter.acquire(clock.now)
+    limiter.release(THROTTLED)
+    assert limiter.limit == pytest.approx(1.22, abs=0.05)
+
+
+def test_retry_after_blocks_the_node(clock):
+    limiter = RateLimiter(adaptive=False)
+    limiter.acquire('a', clock.now + 1)
+    limiter.release('a', THROTTLED, retry_after=5)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire('a', clock.now + 1)
+    limiter.acquire('a', clock.now + 10)
+    assert limiter.stats()['a']['throttled'] == 1
+
+
+def test_client_honours_retry_after():
+    throttled = (429, {}, {'Retry-After': '0'})
+    with FakeNode(get_info=throttled) as node:
+        client = Client([node.url], rate_limit=100, max_retries=2,
+                        retry_base_delay=0.01)
+        with pytest.raises(Exception):
+            client.get_info()
+        stats = client.rate_limiter.stats()[node.url]
+        assert stats['throttled'] == node.count('get_info') == 3
+        assert stats['rate'] == 100
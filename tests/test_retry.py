@@ -0,0 +1,79 @@
+# coding=utf-8
+import random
+import time
+
+import pytest
+
+from eosapi.httpapi import retry
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.exceptions import HttpAPIError
+from eosapi.httpapi.retry import RetryBudget, RetryPolicy, is_idempotent
+from tests.fakenode import FakeNode
+
+INFO = {'head_block_num': 10, 'last_irreversible_block_num': 8}
+
+
+def test_backoff():
+    random.seed(1)
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+    for attempt, ceiling in ((1, 0.1), (2, 0.2), (4, 0.8), (10, 1.0)):
+        delays = [policy.backoff(attempt) for _ in range(100)]
+        assert 0 <= min(delays) and max(delays) <= ceiling
+        assert max(delays) > ceiling / 2
+
+
+def test_budget(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(retry.time, 'monotonic', lambda: now[0])
+    budget = RetryBudget(ratio=0.5, min_retries_per_sec=0, ttl=10)
+    for _ in range(4):
+        budget.deposit()
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    # the requests slide out of the window
+    now[0] += 10
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    assert budget.stats() == dict(requests=1, retries=1, rejected=2)
+
+
+def test_pushes_are_not_idempotent():
+    assert is_idempotent('get_block')
+    assert not is_idempotent('push_transaction')
+
+
+def test_reads_fail_over():
+    with FakeNode(get_info=(503, {})) as down, \
+            FakeNode(get_info=(200, INFO)) as up:
+        client = Client([down.url, up.url], retry_base_delay=0.01)
+        assert client.get_info() == INFO
+        assert down.count('get_info') == 1
+
+
+def test_pushes_are_not_replayed():
+    with FakeNode(push_transaction=(503, {})) as first, \
+            FakeNode(push_transaction=(503, {})) as second:
+        client = Client([first.url, second.url], retry_base_delay=0.01)
+        with pytest.raises(HttpAPIError):
+            client.push_transaction({})
+        assert first.count('push_transaction') + \
+            second.count('push_transaction') == 1
+
+
+def test_throttled_pushes_are_retried():
+    with FakeNode(push_transaction=(429, {})) as busy, \
+            FakeNode(push_transaction=(202, {'transaction_id': 'ab'})) as idle:
+        client = Client([busy.url, idle.url], retry_base_delay=0.01)
+        assert client.push_transaction({}) == {'transaction_id': 'ab'}
+
+
+def test_deadline():
+    with FakeNode(get_info=(503, {})) as node:
+        client = Client([node.url], retry_base_delay=0.2, retry_max_delay=0.2,
+                        min_retries_per_sec=100)
+        start = time.monotonic()
+        with pytest.raises(HttpAPIError):
+            client.exec('chain', 'get_info', deadline=0.5)
+        assert time.monotonic() - start < 0.6
+        assert 1 < node.count('get_info') < 10
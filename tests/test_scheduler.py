@@ -0,0 +1,93 @@
+# coding=utf-8
+import threading
+
+from eosapi.httpapi import scheduler
+from eosapi.httpapi.scheduler import CLOSED, HALF_OPEN, OPEN, NodeScheduler
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock)
+    return NodeScheduler(['a', 'b'], **kwargs), clock
+
+
+def test_prefers_the_faster_node(monkeypatch):
+    nodes, _ = _scheduler(monkeypatch)
+    nodes.record_success(nodes.select(), 0.5)
+    nodes.record_success(nodes.select(), 0.1)
+    fast = min(nodes.scores().items(), key=lambda item: item[1]['score'])[0]
+    assert [nodes.select() for _ in range(3)][0] == fast
+    # requests in flight make the fast node look slower
+    assert nodes.scores()[fast]['in_flight'] == 3
+
+
+def test_stale_nodes_are_explored(monkeypatch):
+    nodes, clock = _scheduler(monkeypatch, stale_after=10)
+    nodes.record_success(nodes.acquire('a'), 0.1)
+    nodes.record_success(nodes.acquire('b'), 0.5)
+    assert nodes.peek() == 'a'
+    clock.now += 11
+    nodes.record_success(nodes.acquire('a'), 0.1)
+    # b has not been heard of for a while
+    assert nodes.peek() == 'b'
+
+
+def test_circuit_breaker(monkeypatch):
+    nodes, clock = _scheduler(monkeypatch, failure_threshold=2, cooldown=30)
+    for _ in range(2):
+        nodes.record_failure(nodes.acquire('a'))
+    assert nodes.scores()['a']['state'] == OPEN
+    assert [nodes.select() for _ in range(3)] == ['b'] * 3
+    for _ in range(3):
+        nodes.release('b')
+
+    clock.now += 31
+    # half-open: one trial request, a failure ejects the node again
+    assert nodes.select(exclude=['b']) == 'a'
+    assert nodes.scores()['a']['state'] == HALF_OPEN
+    # the trial is in flight, nothing else gets through
+    assert nodes.select() == 'b'
+    nodes.release('b')
+    nodes.record_failure('a')
+    assert nodes.scores()['a']['state'] == OPEN
+
+    clock.now += 31
+    nodes.record_success(nodes.select(exclude=['b']), 0.1)
+    assert nodes.scores()['a']['state'] == CLOSED
+
+
+def test_probe_readmits(monkeypatch):
+    probed = threading.Event()
+
+    def probe(url):
+        probed.set()
+        return True
+
+    nodes, clock = _scheduler(monkeypatch, probe=probe, cooldown=30)
+    nodes.eject('a')
+    clock.now += 31
+    # the probe runs in the background, meanwhile requests go elsewhere
+    assert nodes.peek() == 'b'
+    assert probed.wait(5)
+    for _ in range(100):
+        if nodes.scores()['a']['state'] == CLOSED:
+            break
+        threading.Event().wait(0.01)
+    assert nodes.scores()['a']['state'] == CLOSED
+
+
+def test_all_ejected(monkeypatch):
+    nodes, clock = _scheduler(monkeypatch, cooldown=30)
+    nodes.eject('a')
+    clock.now += 10
+    nodes.eject('b')
+    # the node that comes back first
+    assert nodes.peek() == 'a'
@@ -0,0 +1,132 @@
+# coding=utf-8
+import hashlib
+
+import pytest
+
+from eosapi.httpapi.client import Client
+from eosbase.encoding import public_key_to_bytes, signature_to_bytes
+from eosbase.signer import (
+    G,
+    N,
+    P,
+    Signer,
+    _add_affine,
+    _double,
+    _is_canonical,
+    _nonces,
+    _to_affine,
+    multiply_base,
+    pack_transaction,
+    private_key_to_int,
+    public_key,
+    transaction_id,
+)
+from tests.fakenode import FakeNode
+
+# the well-known development key of eosio
+WIF = '5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3'
+PUBLIC_KEY = 'EOS6MRyAjQq8ud7hVNYcfnVPJqcVpscN5So8BhtHuGYqET5GDW5CV'
+CHAIN_ID = 'aca376f206b8fc25a6ed44dbdc66547c36c6c33e3a119ffbeaef943642f0e906'
+
+TRANSACTION = dict(
+    expiration='2018-06-01T00:08:50',
+    ref_block_num=980,
+    ref_block_prefix=1605943183,
+    actions=[{'account': 'eosio.token', 'name': 'transfer',
+              'authorization': [{'actor': 'alice', 'permission': 'active'}],
+              'data': '0000000000855c340000000000000e3d102700000000000004'
+                      '454f5300000000026869'}],
+)
+
+
+def _multiply(point, scalar):
+    result = (0, 1, 0)
+    for bit in bin(scalar)[2:]:
+        result = _double(result)
+        if bit == '1':
+            result = _add_affine(result, point)
+    return result
+
+
+def _decompress(key):
+    data = public_key_to_bytes(key)[1:]
+    x = int.from_bytes(data[1:], 'big')
+    y = pow((x ** 3 + 7) % P, (P + 1) // 4, P)
+    if y & 1 != data[0] & 1:
+        y = P - y
+    return x, y
+
+
+def _verify(key, digest, signature):
+    compact = signature_to_bytes(signature)[1:]
+    recovery = compact[0] - 31
+    r = int.from_bytes(compact[1:33], 'big')
+    s = int.from_bytes(compact[33:], 'big')
+    w = pow(s, N - 2, N)
+    e = int.from_bytes(digest, 'big')
+    u1 = multiply_base(e * w % N)
+    point = _add_affine(_multiply(_decompress(key), r * w % N), u1)
+    x, y = _to_affine(point)
+    return x % N == r and y & 1 == recovery & 1
+
+
+def test_private_key():
+    assert public_key(private_key_to_int(WIF)) == PUBLIC_KEY
+    with pytest.raises(ValueError):
+        private_key_to_int(WIF[:-1] + '4')
+
+
+def test_multiply_base():
+    assert multiply_base(1) == G
+    for scalar in (7, 0xff << 200 | 5, N - 1):
+        assert multiply_base(scalar) == _to_affine(_multiply(G, scalar))
+
+
+def test_rfc6979_nonce():
+    digest = hashlib.sha256(b'Satoshi Nakamoto').digest()
+    assert next(_nonces(1, digest, b'')) == \
+        0x8f8a276c19f4149656b280621e358cce24f5f52542772691ee69063b74f15d15
+
+
+def test_sign():
+    signer = Signer([WIF], chain_id=CHAIN_ID)
+    assert signer.public_keys == [PUBLIC_KEY]
+
+    signed = signer.sign(TRANSACTION)
+    packed_trx = pack_transaction(TRANSACTION)
+    assert signed['packed_trx'] == packed_trx.hex()
+    assert transaction_id(signed) == hashlib.sha256(packed_trx).hexdigest()
+
+    signature, = signed['signatures']
+    assert _verify(PUBLIC_KEY, signer.digest(packed_trx), signature)
+    assert not _verify(PUBLIC_KEY, signer.digest(packed_trx[:-1]), signature)
+    # signing is deterministic
+    assert signer.sign(TRANSACTION) == signed
+
+
+def test_signatures_are_canonical():
+    signer = Signer([WIF], chain_id=CHAIN_ID, processes=1)
+    transactions = [dict(TRANSACTION, ref_block_num=i) for i in range(20)]
+    for trx, signed in zip(transactions, signer.sign_many(transactions)):
+        compact = signature_to_bytes(signed['signatures'][0])[1:]
+        r = int.from_bytes(compact[1:33], 'big')
+        s = int.from_bytes(compact[33:], 'big')
+        assert _is_canonical(r, s) and s <= N // 2
+        assert _verify(PUBLIC_KEY, signer.digest(pack_transaction(trx)),
+                       signed['signatures'][0])
+
+
+def test_unknown_key():
+    signer = Signer(WIF, chain_id=CHAIN_ID)
+    with pytest.raises(ValueError):
+        signer.sign(TRANSACTION, keys=['EOS5unknown'])
+
+
+def test_push_signed():
+    signed = Signer([WIF], chain_id=CHAIN_ID).sign(TRANSACTION)
+    accepted = (202, {'transaction_id': transaction_id(signed),
+                      'processed': {}})
+    with FakeNode(push_transaction=accepted) as node:
+        result = Client([node.url]).push_transaction(signed)
+        assert result['transaction_id'] == transaction_id(signed)
+        assert node.calls == [('push_transaction', signed)]
@@ -0,0 +1,71 @@
+# coding=utf-8
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.singleflight import SingleFlight
+from tests.fakenode import FakeNode
+
+INFO = {'head_block_num': 10, 'last_irreversible_block_num': 8}
+
+
+def test_concurrent_calls_share_one():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'n': len(calls)}
+
+    key = ('chain', 'get_info', None)
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(flight.do, key, fetch) for _ in range(4)]
+        while flight.stats()['saved'] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result() for f in futures]
+    assert calls == [1]
+    assert results == [{'n': 1}] * 4
+    # the result is not kept once the call is over
+    assert flight.do(key, fetch) == {'n': 2}
+    assert flight.stats() == dict(saved=3, in_flight=0,
+                                  endpoints={'get_info': 3})
+
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise IOError('down')
+
+    key = ('chain', 'get_info', None)
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flight.do, key, fail)
+        started.wait(5)
+        follower = executor.submit(flight.do, key, fail)
+        for future in (leader, follower):
+            with pytest.raises(IOError):
+                future.result()
+
+
+def test_client_coalesces():
+    def slow(body):
+        time.sleep(0.2)
+        return 200, INFO
+
+    with FakeNode(get_info=slow) as node:
+        client = Client([node.url], coalesce=True)
+        with ThreadPoolExecutor(8) as executor:
+            infos = list(executor.map(
+                lambda _: client.get_info(cached=False), range(8)))
+        assert infos == [INFO] * 8
+        assert node.count('get_info') < 8
+        assert not client.single_flight.applies('get_block')
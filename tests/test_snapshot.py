@@ -0,0 +1,72 @@
+# coding=utf-8
+from eosapi.httpapi.client import Client
+from eosapi.httpapi.tables import key_to_int
+from eosapi.store.snapshot import TableSnapshot
+from tests.fakenode import FakeNode
+
+INFO = {'head_block_num': 100, 'last_irreversible_block_num': 90,
+        'chain_id': '00' * 32}
+
+
+class Table(object):
+    """ Rows per scope, answered like ``get_table_rows`` with inclusive
+    bounds. """
+
+    def __init__(self, key, rows):
+        self.key = key
+        self.rows = rows
+
+    def __call__(self, body):
+        lower = key_to_int(body['lower_bound'] or 0)
+        upper = key_to_int(body['upper_bound'] or 2 ** 64 - 1)
+        rows = sorted((row for row in self.rows.get(body['scope'], [])
+                       if lower <= key_to_int(row[self.key]) <= upper),
+                      key=lambda row: key_to_int(row[self.key]))
+        return 200, {'rows': rows, 'more': False}
+
+
+def test_snapshot_and_refresh(tmpdir):
+    table = Table('id', {
+        'alice': [{'id': i, 'value': '%d.0000 EOS' % i} for i in range(10)],
+        'bob': [{'id': 1, 'value': '5.0000 EOS'}],
+    })
+    with FakeNode(get_info=(200, INFO), get_table_rows=table) as node:
+        client = Client([node.url])
+        snapshot = client.snapshot_table('code', 'rows', ['bob', 'alice'],
+                                         key='id')
+        assert len(snapshot) == 11
+        assert snapshot.block_num == 100
+        assert snapshot.column('value').kind == 'asset'
+        assert [scope for scope, _ in snapshot][9:] == ['alice', 'bob']
+
+        table.rows['alice'][5]['value'] = '50.0000 EOS'
+        del table.rows['alice'][3]
+        snapshot.refresh(client, ['alice'], lower_bound=2, upper_bound=5)
+
+    rows = snapshot.rows('alice')
+    assert [row['id'] for row in rows] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert rows[4]['value'] == '50.0000 EOS'
+
+    path = str(tmpdir.join('rows.snap'))
+    snapshot.save(path)
+    loaded = TableSnapshot.load(path)
+    assert list(loaded) == list(snapshot)
+    assert loaded.rows('bob') == [{'id': 1, 'value': '5.0000 EOS'}]
+
+
+def test_name_and_symbol_keys():
+    accounts = TableSnapshot('eosio.token', 'stat', 'currency')
+    rows = [{'currency': code} for code in ('SYS', 'EOS', 'AAA', 'ZZ')]
+    accounts.replace('eosio.token', rows)
+    # the node's order, which is not the alphabetical one
+    assert [row['currency'] for row in accounts.rows('eosio.token')] == \
+        ['ZZ', 'AAA', 'EOS', 'SYS']
+    accounts.replace('eosio.token', [{'currency': 'EOS', 'supply': 1}],
+                     lower_bound='EOS', upper_bound='EOS')
+    assert len(accounts) == 4
+
+    producers = TableSnapshot('eosio', 'producers', 'owner')
+    producers.replace('eosio', [{'owner': name}
+                                for name in ('carol', 'alice', 'bob')])
+    assert [row['owner'] for row in producers.rows('eosio')] == \
+        ['alice', 'bob', 'carol']
@@ -0,0 +1,146 @@
+# coding=utf-8
+import threading
+import time
+
+import pytest
+
+from eosapi.httpapi import streaming
+from eosapi.httpapi.streaming import BlockStream
+from tests.fakechain import FakeChain
+
+
+class _Stalled(Exception):
+    pass
+
+
+def test_idle_chain_backoff(monkeypatch):
+    chain = FakeChain(head=5)
+    sleeps = []
+    monkeypatch.setattr(streaming.time, 'sleep', sleeps.append)
+
+    def get_info(cached=True):
+        if chain.infos > 1200:
+            raise _Stalled()
+        return FakeChain.get_info(chain, cached)
+    chain.get_info = get_info
+
+    stream = BlockStream(chain, start_block=6, mode='head',
+                         poll_delay=0.01, max_poll_interval=2.0)
+    with pytest.raises(_Stalled):
+        stream._wait_for(6)
+    assert stream.empty_polls > 1100
+    assert sleeps[:3] == [0.02, 0.04, 0.08]
+    assert max(sleeps) == sleeps[-1] == 2.0
+
+
+def test_no_fetch_after_close():
+    chain = FakeChain(head=20)
+    release = threading.Event()
+    started = threading.Semaphore(0)
+    fetched = []
+
+    def fetch(block_num):
+        started.release()
+        release.wait(5)
+        fetched.append(block_num)
+        return chain.get_block(block_num)
+
+    stream = BlockStream(chain, start_block=1, mode='head', prefetch=2,
+                         buffer=4, fetch=fetch)
+    stream._refresh_head()
+    stream._fill()
+    assert started.acquire(timeout=5) and started.acquire(timeout=5)
+    stream.close()
+    # the calls in flight finish after close
+    release.set()
+    time.sleep(0.1)
+    assert stream._executor is None
+    assert sorted(fetched) == [1, 2]
+    with pytest.raises(StopIteration):
+        next(stream)
+    assert stream._executor is None
+
+
+def test_blocks_in_order():
+    chain = FakeChain(head=50)
+    delays = [0.01 * (n % 3) for n in range(51)]
+
+    def fetch(block_num):
+        # later blocks often arrive first
+        time.sleep(delays[block_num])
+        return chain.get_block(block_num)
+
+    with BlockStream(chain, start_block=1, mode='head', prefetch=8,
+                     buffer=16, fetch=fetch) as stream:
+        blocks = [next(stream) for _ in range(50)]
+        stats = stream.stats()
+    assert [block['block_num'] for block in blocks] == list(range(1, 51))
+    assert stats['yielded'] == 50 and stats['fetched'] >= 50
+
+
+def test_buffer_bounds_a_slow_consumer():
+    chain = FakeChain(head=100)
+    with BlockStream(chain, start_block=1, mode='head', prefetch=4,
+                     buffer=10) as stream:
+        next(stream)
+        time.sleep(0.1)
+        stats = stream.stats()
+    assert stats['buffered'] + stats['in_flight'] <= 10
+    assert stats['fetched'] <= 11
+
+
+def test_failed_fetch_is_retried():
+    chain = FakeChain(head=10)
+    failures = [5]
+
+    def fetch(block_num):
+        if block_num in failures:
+            failures.remove(block_num)
+            raise IOError('node went away')
+        return chain.get_block(block_num)
+
+    with BlockStream(chain, start_block=1, mode='head', fetch=fetch) as stream:
+        nums = [next(stream)['block_num'] for _ in range(4)]
+        with pytest.raises(IOError):
+            next(stream)
+        nums.extend(next(stream)['block_num'] for _ in range(6))
+    assert nums == list(range(1, 11))
+
+
+def _producer(chain, count, interval, irreversible=False):
+    def produce():
+        for _ in range(count):
+            time.sleep(interval)
+            chain.produce()
+            if irreversible:
+                chain.last_irreversible_block_num = chain.head - 2
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_follows_the_head():
+    chain = FakeChain(head=3, timed=True)
+    producer = _producer(chain, 10, 0.05)
+    with BlockStream(chain, start_block=1, mode='head',
+                     block_interval=0.05, poll_delay=0.01) as stream:
+        nums = [next(stream)['block_num'] for _ in range(13)]
+        stats = stream.stats()
+    producer.join()
+    assert nums == list(range(1, 14))
+    # polls go out when the next block is due, not in a tight loop
+    assert stats['polls'] < 25
+    assert stats['production_lag']['count'] == 13
+
+
+def test_follows_irreversible_blocks():
+    chain = FakeChain(head=5, irreversible=3)
+    producer = _producer(chain, 5, 0.02, irreversible=True)
+    with BlockStream(chain, mode='irreversible', poll_delay=0.01,
+                     max_poll_interval=0.05) as stream:
+        assert next(stream)['block_num'] == 3
+        nums = [next(stream)['block_num'] for _ in range(5)]
+        # nothing above the last irreversible block is fetched
+        assert stream.stats()['head'] <= chain.last_irreversible_block_num
+    producer.join()
+    assert nums == [4, 5, 6, 7, 8]
@@ -0,0 +1,52 @@
+# coding=utf-8
+import pytest
+
+from eosapi.httpapi.tables import (
+    MAX_KEY,
+    TableRows,
+    _key_function,
+    key_to_int,
+)
+from eosbase.abi import AbiError
+
+
+@pytest.mark.parametrize('row, key', [
+    ({'id': 7}, 7),
+    ({'id': '7'}, 7),
+    ({'id': 'eosio'}, 0x5530ea0000000000),
+    ({'id': ''}, 0),
+    ({'id': 'EOS'}, 0x534f45),
+])
+def test_key_function(row, key):
+    assert _key_function('id')(row) == key
+
+
+def test_key_function_passes_functions():
+    assert _key_function(None) is None
+    assert _key_function(len)({'a': 1}) == 1
+    with pytest.raises(AbiError):
+        _key_function('id')({'id': 'Not A Name'})
+
+
+def test_symbol_codes_order():
+    # nodes order rows by the integer, not by the text
+    assert key_to_int('ZZ') < key_to_int('AAA')
+
+
+def _ranges(lower_bound, upper_bound, partitions):
+    rows = TableRows.__new__(TableRows)
+    rows.lower_bound = lower_bound
+    rows.upper_bound = upper_bound
+    rows.partitions = partitions
+    return rows._ranges()
+
+
+@pytest.mark.parametrize('lower, upper, partitions, ranges', [
+    (0, 10, 4, [(0, 3), (3, 6), (6, 8), (8, 10)]),
+    (0, 3, 8, [(0, 1), (1, 2), (2, 3)]),
+    (5, 5, 3, [(5, 5)]),
+    (None, None, 2, [(0, MAX_KEY // 2), (MAX_KEY // 2, MAX_KEY)]),
+    ('alice', 'alice', 2, [(0x345c850000000000, 0x345c850000000000)]),
+])
+def test_ranges(lower, upper, partitions, ranges):
+    assert _ranges(lower, upper, partitions) == ranges
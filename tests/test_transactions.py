@@ -0,0 +1,48 @@
+# coding=utf-8
+import hashlib
+import os
+
+from eosapi.store.transactions import TransactionIndex
+
+
+def _block(num, transactions=2, salt=''):
+    block_id = '%08x' % num + hashlib.sha256(
+        ('%d%s' % (num, salt)).encode()).hexdigest()[8:]
+    return dict(block_num=num, id=block_id, transactions=[
+        {'status': 'executed', 'trx': {'id': hashlib.sha256(
+            ('%d-%d%s' % (num, i, salt)).encode()).hexdigest()}}
+        for i in range(transactions)])
+
+
+def test_transaction_index_reopen(tmp_path):
+    path = str(tmp_path / 'transactions.idx')
+    blocks = [_block(n, transactions=3) for n in range(1, 101)]
+    with TransactionIndex(path, capacity=16) as index:
+        index.add_blocks(blocks)
+        assert len(index) == 300
+        assert index.stats()['capacity'] >= 300 / index.max_load
+
+    with TransactionIndex(path) as index:
+        assert len(index) == 300
+        block = blocks[41]
+        trx_id = block['transactions'][2]['trx']['id']
+        assert index.get(trx_id) == dict(
+            block_num=block['block_num'], block_id=block['id'], position=2)
+        assert hashlib.sha256(b'missing').hexdigest() not in index
+
+
+def test_transaction_index_interrupted_grow(tmp_path):
+    path = str(tmp_path / 'transactions.idx')
+    with TransactionIndex(path, capacity=16) as index:
+        index.add_blocks([_block(n) for n in range(1, 6)])
+
+    # a resize that died before it replaced the index
+    with open(path + '.grow', 'wb') as f:
+        f.write(b'partial')
+
+    with TransactionIndex(path) as index:
+        assert len(index) == 10
+        index.add_blocks([_block(n) for n in range(6, 50)])
+        assert len(index) == 98
+        assert _block(3)['transactions'][1]['trx']['id'] in index
+    assert not os.path.exists(path + '.grow')